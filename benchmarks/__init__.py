@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks offline do Web Scraping Premium (rodar da raiz: python -m benchmarks.<módulo>)."""
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de HTTP/1.1 x HTTP/2 e da compressão, sem rede externa: o catálogo
+é servido em 127.0.0.1 com compressão (server.py em HTTP/1.1, h2server.py em
+HTTP/2 h2c) e cada cliente busca as listagens e todas as páginas de detalhe
+com AsyncFetcher, num processo próprio.
+
+Configurações:
+  http1_gzip  requests/urllib3 anunciando só gzip e deflate (comportamento antigo)
+  http1       requests/urllib3 com o Accept-Encoding que ele decodifica (br com brotli)
+  http2       httpx em HTTP/2 (Http2Adapter, h2c): br/zstd e uma conexão por host
+
+Uso:
+  python -m benchmarks.bench_http2
+  python -m benchmarks.bench_http2 --pages 20 --latency 0.02 --concurrency 32
+"""
+
+import argparse
+import gzip
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .catalog import Catalog
+from .h2server import MockH2Server
+from .server import MockCatalogServer
+
+CONFIGS = ("http1_gzip", "http1", "http2")
+
+
+def _run(name: str, cfg: dict) -> dict:
+    """Executa uma configuração no processo atual (um processo novo por configuração)."""
+    from src.async_fetcher import AsyncFetcher
+    from src.fetcher import HttpClient
+    from src.metrics import RunMetrics
+    from src.ratelimit import RateLimiter
+    from src.utils import DEFAULT_HEADERS
+
+    if name == "http1_gzip":
+        DEFAULT_HEADERS["Accept-Encoding"] = "gzip, deflate"
+    catalog = Catalog(cfg["pages"], cfg["per_page"], cfg["seed"])
+    paths = [catalog.listing_path(p) for p in range(1, catalog.pages + 1)]
+    paths += [
+        catalog.detail_path(p, i) for p in range(1, catalog.pages + 1) for i in range(catalog.per_page)
+    ]
+    urls = [cfg["base_url"] + path for path in paths]
+    metrics = RunMetrics()
+    limiter = RateLimiter(rate=100_000, burst=100_000)
+    concurrency = cfg["concurrency"]
+
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    with HttpClient(pool_maxsize=concurrency, http2="h2c" if name == "http2" else None) as client:
+        with AsyncFetcher(
+            concurrency=concurrency,
+            per_host=concurrency,
+            base_delay=0.05,
+            session=client.session,
+            rate_limiter=limiter,
+            metrics=metrics,
+        ) as fetcher:
+            results = fetcher.fetch_all(urls)
+        conn = client.connection_stats()
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    transfer = metrics.snapshot()["transfer"]
+    return {
+        "config": name,
+        "requests": len(urls),
+        "ok": sum(status == "ok" for _html, status in results),
+        "wall_s": wall,
+        "req_per_s": len(urls) / wall if wall else 0.0,
+        "cpu_ms_per_req": cpu * 1000 / len(urls),
+        "connections": conn["opened"],
+        "wire_mb": transfer["wire_bytes"] / 1e6,
+        "decoded_mb": transfer["decoded_bytes"] / 1e6,
+        "ratio": transfer["compression_ratio"],
+        "encodings": transfer["by_encoding"],
+    }
+
+
+def _compression_table(catalog: Catalog) -> None:
+    """Razão de compressão de cada codificação numa listagem e numa página de detalhe."""
+    from .server import ENCODERS
+
+    pages = {"listagem": catalog.listing_page(1), "detalhe": catalog.detail_page(1, 0)}
+    encoders = {"gzip-6": lambda b: gzip.compress(b, compresslevel=6), **ENCODERS}
+    encoders.pop("gzip")
+    print(f"{'página':<10} {'bytes':>8} " + " ".join(f"{name:>8}" for name in encoders))
+    for label, html in pages.items():
+        body = html.encode("utf-8")
+        ratios = " ".join(f"{len(body) / len(fn(body)):>7.2f}x" for fn in encoders.values())
+        print(f"{label:<10} {len(body):>8,} {ratios}")
+    print()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark HTTP/1.1 x HTTP/2 e compressão")
+    parser.add_argument("--pages", type=int, default=10, help="Páginas de listagem (default: 10)")
+    parser.add_argument("--per-page", type=int, default=20, help="Itens por página (default: 20)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.02, help="Latência do servidor em s")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requisições em voo (default: 16)")
+    parser.add_argument(
+        "--configs", default=",".join(CONFIGS), help="Configurações separadas por vírgula"
+    )
+    args = parser.parse_args()
+
+    names = [c.strip() for c in args.configs.split(",") if c.strip()]
+    unknown = [c for c in names if c not in CONFIGS]
+    if unknown:
+        parser.error(f"configurações desconhecidas: {', '.join(unknown)}")
+
+    catalog = Catalog(args.pages, args.per_page, args.seed)
+    _compression_table(catalog)
+    cfg = {
+        "pages": args.pages,
+        "per_page": args.per_page,
+        "seed": args.seed,
+        "concurrency": args.concurrency,
+    }
+    ctx = multiprocessing.get_context("spawn")
+    print(
+        f"{'config':<12} {'reqs':>6} {'ok':>6} {'tempo':>8} {'req/s':>8} {'CPU/req':>9} "
+        f"{'conexões':>9} {'fio MB':>8} {'decod. MB':>10} {'razão':>7}  codificações"
+    )
+    for name in names:
+        server_cls = MockH2Server if name == "http2" else MockCatalogServer
+        with server_cls(catalog, latency=args.latency, compress=True) as server:
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                r = pool.submit(_run, name, dict(cfg, base_url=server.base_url)).result()
+        ratio = f"{r['ratio']:.2f}x" if r["ratio"] else "-"
+        print(
+            f"{r['config']:<12} {r['requests']:>6} {r['ok']:>6} {r['wall_s']:>7.2f}s "
+            f"{r['req_per_s']:>8.0f} {r['cpu_ms_per_req']:>7.2f}ms {r['connections']:>9} "
+            f"{r['wire_mb']:>8.2f} {r['decoded_mb']:>10.2f} {ratio:>7}  "
+            + ", ".join(f"{k}={n}" for k, n in sorted(r["encodings"].items()))
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
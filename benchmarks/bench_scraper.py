@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de ponta a ponta sem rede externa: catálogo sintético servido em
+127.0.0.1 (latência, 503 e 429 configuráveis) e medição de cada estágio.
+
+Para cada estágio reporta páginas/s, itens/s, CPU por página e pico de RSS.
+Cada estágio roda num processo novo, então o pico de RSS é só dele; o
+servidor fica no processo principal e não entra na conta de CPU.
+
+Uso:
+  python -m benchmarks.bench_scraper
+  python -m benchmarks.bench_scraper --pages 200 --latency 0.01 --error-rate 0.02
+  python -m benchmarks.bench_scraper --stages parser,export_csv --json resultados.json
+  python -m benchmarks.bench_scraper --stages paginate,paginate_stream --footer-kb 500
+"""
+
+import argparse
+import json
+import multiprocessing
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from .catalog import Catalog
+from .server import MockCatalogServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KiB; macOS, bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# --- Estágios ---------------------------------------------------------------
+# Cada estágio recebe a configuração, prepara o que não deve ser medido e
+# retorna uma função sem argumentos que executa o trabalho e devolve
+# (páginas, itens).
+
+
+def _limiter(cfg: dict):
+    from src.ratelimit import RateLimiter
+
+    return RateLimiter(rate=cfg["rate"], burst=cfg["burst"])
+
+
+def stage_fetch(cfg: dict):
+    from src.fetcher import HttpClient, fetch_with_retry
+
+    catalog = Catalog(cfg["pages"], cfg["per_page"], cfg["seed"])
+    urls = [cfg["base_url"] + catalog.listing_path(p) for p in range(1, catalog.pages + 1)]
+    limiter = _limiter(cfg)
+
+    def run():
+        ok = 0
+        with HttpClient() as client:
+            for url in urls:
+                html, status = fetch_with_retry(
+                    url,
+                    base_delay=cfg["base_delay"],
+                    session=client.session,
+                    rate_limiter=limiter,
+                )
+                ok += status == "ok"
+        return ok, 0
+
+    return run
+
+
+def _paginate_run(cfg: dict, concurrency: int, stream: bool = False):
+    from src.async_fetcher import AsyncFetcher
+    from src.fetcher import HttpClient, fetch_with_retry
+    from src.paginator import paginate
+    from src.parser import extract_items, parse_html
+    from src.streaming import StreamReader
+
+    limiter = _limiter(cfg)
+    extract = partial(extract_items, site_type="books_toscrape")
+    reader = StreamReader() if stream else None
+
+    def run():
+        with HttpClient(pool_maxsize=max(concurrency, 1)) as client:
+
+            def fetch(url):
+                return fetch_with_retry(
+                    url,
+                    base_delay=cfg["base_delay"],
+                    session=client.session,
+                    rate_limiter=limiter,
+                    reader=reader,
+                )
+
+            fetcher = None
+            if concurrency > 1:
+                fetcher = AsyncFetcher(
+                    concurrency=concurrency,
+                    per_host=concurrency,
+                    base_delay=cfg["base_delay"],
+                    session=client.session,
+                    rate_limiter=limiter,
+                    reader=reader,
+                )
+            try:
+                pages = paginate(
+                    cfg["start_url"],
+                    fetch_fn=fetch,
+                    extract_fn=extract,
+                    parse_fn=parse_html,
+                    fetch_many_fn=fetcher.fetch_all if fetcher else None,
+                )
+            finally:
+                if fetcher:
+                    fetcher.close()
+        return len(pages), sum(len(items) for _url, _html, items in pages)
+
+    return run
+
+
+def stage_paginate(cfg: dict):
+    return _paginate_run(cfg, 1)
+
+
+def stage_paginate_concurrent(cfg: dict):
+    return _paginate_run(cfg, cfg["concurrency"])
+
+
+def stage_paginate_stream(cfg: dict):
+    return _paginate_run(cfg, 1, stream=True)
+
+
+def _parser_stage(backend: str):
+    def stage(cfg: dict):
+        from src.parser import extract_items, parse_html
+
+        catalog = Catalog(cfg["pages"], cfg["per_page"], cfg["seed"], cfg["footer_kb"])
+        base = "http://127.0.0.1"
+        pages = [(base + path, html) for path, html in catalog.iter_listing_pages()]
+        parse_html("<html></html>", backend=backend)  # falha cedo se o backend faltar
+
+        def run():
+            items = 0
+            for url, html in pages:
+                items += len(extract_items(parse_html(html, backend=backend), url))
+            return len(pages), items
+
+        return run
+
+    return stage
+
+
+def _synthetic_items(catalog: Catalog) -> list:
+    from src.parser import Item
+
+    items = []
+    for page in range(1, catalog.pages + 1):
+        for i in range(catalog.per_page):
+            p = catalog.product(page, i)
+            items.append(
+                Item(
+                    nome=p["title"],
+                    preco=float(p["price"].lstrip("£")),
+                    categoria=p["category"],
+                    descricao=p["description"][:100] + "...",
+                    disponibilidade="In stock",
+                    rating=str("One Two Three Four Five".split().index(p["rating"]) + 1),
+                    link=f"http://127.0.0.1/catalogue/{p['slug']}/index.html",
+                    upc=p["upc"],
+                    estoque=p["stock"],
+                )
+            )
+    return items
+
+
+def _export_stage(writer_name: str):
+    def stage(cfg: dict):
+        from src import exporter
+
+        writer_cls = getattr(exporter, writer_name)
+        catalog = Catalog(cfg["pages"], cfg["per_page"], cfg["seed"])
+        items = _synthetic_items(catalog)
+        out_dir = Path(tempfile.mkdtemp(prefix="bench_export_"))
+        writer_cls.in_dir(out_dir).close()  # falha cedo se a dependência faltar
+
+        def run():
+            with writer_cls.in_dir(out_dir) as writer:
+                writer.write_many(items)
+            return catalog.pages, len(items)
+
+        return run
+
+    return stage
+
+
+STAGES = {
+    "fetch": stage_fetch,
+    "paginate": stage_paginate,
+    "paginate_concurrent": stage_paginate_concurrent,
+    "paginate_stream": stage_paginate_stream,
+    "parser_lxml": _parser_stage("lxml"),
+    "parser_html.parser": _parser_stage("html.parser"),
+    "export_csv": _export_stage("CsvWriter"),
+    "export_json": _export_stage("JsonWriter"),
+    "export_jsonl": _export_stage("JsonLinesWriter"),
+    "export_excel": _export_stage("ExcelWriter"),
+    "export_parquet": _export_stage("ParquetWriter"),
+    "export_arrow": _export_stage("ArrowWriter"),
+}
+
+
+def _measure(name: str, cfg: dict) -> dict:
+    """Executa o estágio no processo atual (um processo novo por estágio)."""
+    try:
+        run = STAGES[name](cfg)
+    except ImportError as e:
+        return {"stage": name, "skipped": str(e)}
+    rss_before = _peak_rss_mb()
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    pages, items = run()
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    rss = _peak_rss_mb()
+    return {
+        "stage": name,
+        "pages": pages,
+        "items": items,
+        "wall_s": wall,
+        "pages_per_s": pages / wall if wall else 0.0,
+        "items_per_s": items / wall if wall else 0.0,
+        "cpu_ms_per_page": cpu * 1000 / pages if pages else 0.0,
+        "peak_rss_mb": rss,
+        "rss_growth_mb": rss - rss_before if rss is not None else None,
+    }
+
+
+def run_stages(names: list[str], cfg: dict) -> list[dict]:
+    """Roda cada estágio num processo 'spawn' isolado, em sequência."""
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for name in names:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            results.append(pool.submit(_measure, name, cfg).result())
+    return results
+
+
+def _print_table(results: list[dict]) -> None:
+    print(
+        f"{'estágio':<20} {'págs':>6} {'itens':>7} {'tempo':>8} {'págs/s':>9} "
+        f"{'itens/s':>10} {'CPU/pág':>10} {'pico RSS':>10}"
+    )
+    for r in results:
+        if "skipped" in r:
+            print(f"{r['stage']:<20} ignorado: {r['skipped']}")
+            continue
+        rss = f"{r['peak_rss_mb']:.1f} MB" if r["peak_rss_mb"] is not None else "n/d"
+        print(
+            f"{r['stage']:<20} {r['pages']:>6} {r['items']:>7} {r['wall_s']:>7.2f}s "
+            f"{r['pages_per_s']:>9.1f} {r['items_per_s']:>10.0f} "
+            f"{r['cpu_ms_per_page']:>8.2f}ms {rss:>10}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark offline do scraper")
+    parser.add_argument("--pages", type=int, default=50, help="Páginas do catálogo (default: 50)")
+    parser.add_argument("--per-page", type=int, default=20, help="Itens por página (default: 20)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="Latência do servidor em s")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de respostas 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fração de respostas 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After dos 429 (s)")
+    parser.add_argument(
+        "--footer-kb", type=int, default=0, help="<script> inline após o rodapé das listagens (KB)"
+    )
+    parser.add_argument("--rate", type=float, default=1000.0, help="Rate limit por domínio (req/s)")
+    parser.add_argument("--burst", type=int, default=1000, help="Rajada do rate limit")
+    parser.add_argument(
+        "--base-delay", type=float, default=0.05, help="Backoff base dos retries (default: 0.05 s)"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="Concorrência de paginate_concurrent (default: 8)"
+    )
+    parser.add_argument(
+        "--stages",
+        default=",".join(STAGES),
+        help="Estágios separados por vírgula (default: todos)",
+    )
+    parser.add_argument("--json", type=Path, default=None, help="Grava os resultados em JSON")
+    args = parser.parse_args()
+
+    names = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in names if s not in STAGES]
+    if unknown:
+        parser.error(f"estágios desconhecidos: {', '.join(unknown)}")
+
+    catalog = Catalog(args.pages, args.per_page, args.seed, args.footer_kb)
+    with MockCatalogServer(
+        catalog,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    ) as server:
+        cfg = {
+            "pages": args.pages,
+            "per_page": args.per_page,
+            "seed": args.seed,
+            "base_url": server.base_url,
+            "start_url": server.start_url,
+            "rate": args.rate,
+            "burst": args.burst,
+            "base_delay": args.base_delay,
+            "concurrency": args.concurrency,
+            "footer_kb": args.footer_kb,
+        }
+        results = run_stages(names, cfg)
+        server_stats = server.stats
+
+    _print_table(results)
+    print(
+        "servidor: %(requests)d requisições, %(throttled)d 429, %(errors)d 503, "
+        "%(bytes)d bytes" % server_stats
+    )
+    if args.json:
+        payload = {"config": vars(args) | {"json": str(args.json)}, "server": server_stats}
+        payload["results"] = results
+        args.json.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Resultados: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de src/store.py: upsert em lotes e consultas numa base grande
+(N itens x D execuções diárias, com uma fração dos preços mudando por dia).
+
+Uso:
+  python -m benchmarks.bench_store
+  python -m benchmarks.bench_store --items 1000000 --days 5 --change-rate 0.05
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from src.parser import Item
+from src.store import ItemStore, parse_since
+
+CATEGORIES = ("Poetry", "Travel", "Mystery", "History", "Science", "Fiction", "Music", "Art")
+BATCH = 500
+
+
+def _item(i: int, preco: float) -> Item:
+    return Item(
+        nome=f"Livro {i}",
+        preco=preco,
+        categoria=CATEGORIES[i % len(CATEGORIES)],
+        descricao=f"Livro {i}",
+        disponibilidade="In stock",
+        rating=str(i % 5 + 1),
+        link=f"https://books.example/catalogue/livro-{i}/index.html",
+    )
+
+
+def _timed_query(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark da base de itens (src/store.py)")
+    parser.add_argument("--items", type=int, default=200_000, help="Itens distintos")
+    parser.add_argument("--days", type=int, default=3, help="Execuções (uma por dia)")
+    parser.add_argument("--change-rate", type=float, default=0.05, help="Fração de preços que muda por dia")
+    parser.add_argument("--db", type=Path, default=None, help="Arquivo da base (default: temporário)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    prices = [round(rng.uniform(5, 60), 2) for _ in range(args.items)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db or Path(tmp) / "items.sqlite3"
+        first_day = datetime.now(timezone.utc) - timedelta(days=args.days - 1)
+        with ItemStore(path) as store:
+            print(f"{'execução':<12} {'itens/s':>10} {'histórico':>10}")
+            for day in range(args.days):
+                if day:
+                    for i in rng.sample(range(args.items), int(args.items * args.change_rate)):
+                        prices[i] = round(prices[i] * rng.uniform(0.8, 1.2), 2)
+                observed_at = (first_day + timedelta(days=day)).strftime("%Y-%m-%d %H:%M:%S")
+                history = 0
+                start = time.perf_counter()
+                for lo in range(0, args.items, BATCH):
+                    batch = [_item(i, prices[i]) for i in range(lo, min(lo + BATCH, args.items))]
+                    history += store.upsert_many(batch, observed_at=observed_at)["history"]
+                elapsed = time.perf_counter() - start
+                print(f"dia {day + 1:<8} {args.items / elapsed:>10,.0f} {history:>10,}")
+
+            counts = store.counts()
+            print(f"\nbase: {counts['items']:,} itens, {counts['history']:,} linhas de histórico, "
+                  f"{path.stat().st_size / 1e6:.0f} MB\n")
+            since = parse_since("1d")
+            link = _item(args.items // 2, 0).link
+            queries = [
+                ("latest (categoria, 100)", lambda: store.latest("Poetry", limit=100)),
+                ("latest (100 mais recentes)", lambda: store.latest(limit=100)),
+                ("changes --since 1d (100)", lambda: store.price_changes(since, limit=100)),
+                ("changes --since 1d (todas)", lambda: store.price_changes(since)),
+                ("history (1 item)", lambda: store.history(link)),
+            ]
+            print(f"{'consulta':<28} {'tempo':>10} {'linhas':>8}")
+            for name, fn in queries:
+                rows = len(fn())
+                print(f"{name:<28} {_timed_query(fn) * 1000:>8.1f}ms {rows:>8,}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
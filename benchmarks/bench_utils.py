@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Microbenchmark de src/utils.py: versões atuais vs. implementações anteriores
+(regex sem compilar, .lower() do documento inteiro, dict recriado a cada chamada).
+
+Uso:
+  python -m benchmarks.bench_utils
+  python -m benchmarks.bench_utils --number 20000
+"""
+
+import argparse
+import re
+import timeit
+
+from src.utils import CAPTCHA_PATTERNS, might_be_captcha, normalize_text, parse_price, parse_rating
+
+
+# --- Implementações anteriores (referência) ---------------------------------
+
+
+def legacy_normalize_text(text):
+    if text is None or not isinstance(text, str):
+        return ""
+    t = text.strip()
+    t = re.sub(r"\s+", " ", t)
+    return t
+
+
+def legacy_parse_price(text):
+    if text is None or not isinstance(text, str):
+        return None
+    cleaned = re.sub(r"[^\d,.]", "", text.strip())
+    cleaned = cleaned.replace(",", ".")
+    try:
+        return float(cleaned) if cleaned else None
+    except ValueError:
+        return None
+
+
+def legacy_parse_rating(classes):
+    if isinstance(classes, str):
+        classes = classes.split()
+    for c in classes:
+        lower = c.lower()
+        if lower in ("one", "two", "three", "four", "five"):
+            return {"one": "1", "two": "2", "three": "3", "four": "4", "five": "5"}.get(lower)
+    return None
+
+
+def legacy_might_be_captcha(html):
+    html_lower = html.lower()
+    for pattern in CAPTCHA_PATTERNS:
+        if re.search(pattern, html_lower):
+            return True
+    return False
+
+
+# --- Entradas ---------------------------------------------------------------
+
+
+def _sample_page(products: int = 20, filler_kb: int = 40) -> str:
+    """Página no formato Books to Scrape, com rodapé/scripts volumosos."""
+    pods = "".join(
+        f'<article class="product_pod"><h3><a href="b{i}.html" title="Livro {i}">Livro {i}</a></h3>'
+        f'<p class="price_color">£{i}.99</p><p class="instock availability">\n  In stock\n</p>'
+        "</article>"
+        for i in range(products)
+    )
+    filler = "<script>var x = 1;</script>" * (filler_kb * 1024 // 28)
+    return f"<html><head><title>All products</title></head><body>{pods}{filler}</body></html>"
+
+
+CASES = [
+    ("normalize_text", legacy_normalize_text, normalize_text, ("\n   In   stock\t (22 available)  \n",)),
+    ("parse_price", legacy_parse_price, parse_price, ("£51.77",)),
+    ("parse_rating", legacy_parse_rating, parse_rating, (["star-rating", "Three"],)),
+    ("might_be_captcha", legacy_might_be_captcha, might_be_captcha, (_sample_page(),)),
+    ("might_be_captcha 400K", legacy_might_be_captcha, might_be_captcha, (_sample_page(filler_kb=400),)),
+]
+
+
+def run(number: int) -> list[tuple[str, float, float]]:
+    results = []
+    for name, legacy, current, args in CASES:
+        assert legacy(*args) == current(*args), name
+        n = max(number // 100, 10) if name.startswith("might_be_captcha") else number
+        t_legacy = min(timeit.repeat(lambda: legacy(*args), number=n, repeat=3)) / n
+        t_current = min(timeit.repeat(lambda: current(*args), number=n, repeat=3)) / n
+        results.append((name, t_legacy, t_current))
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Microbenchmark de src/utils.py")
+    parser.add_argument("--number", type=int, default=100_000, help="Chamadas por medição")
+    args = parser.parse_args()
+
+    print(f"{'função':<22} {'anterior':>12} {'atual':>12} {'ganho':>8}")
+    for name, t_legacy, t_current in run(args.number):
+        print(
+            f"{name:<22} {t_legacy * 1e6:>10.2f}µs {t_current * 1e6:>10.2f}µs "
+            f"{t_legacy / t_current:>7.1f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
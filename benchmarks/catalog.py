@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Catálogo sintético no formato do Books to Scrape: páginas de listagem
+(catalogue/page-N.html, com "Page N of M" e link "next") e páginas de
+detalhe (catalogue/<slug>/index.html). Determinístico para uma mesma seed.
+"""
+
+import random
+from html import escape
+
+RATING_CLASSES = ("One", "Two", "Three", "Four", "Five")
+CATEGORIES = ("Poetry", "Travel", "Mystery", "Historical Fiction", "Science", "Fantasy")
+_WORDS = (
+    "light attic velvet tipping secret shadow river sharp objects soumission "
+    "requiem dream empire garden silent stars winter journey ocean stone"
+).split()
+
+
+class Catalog:
+    """
+    Gera o HTML das páginas sob demanda (nada fica em memória).
+    footer_kb > 0 acrescenta às listagens um <script> inline desse tamanho
+    depois do rodapé (bundle/estado JSON), como em páginas inchadas.
+    """
+
+    def __init__(self, pages: int = 50, per_page: int = 20, seed: int = 0, footer_kb: int = 0):
+        if pages < 1 or per_page < 1:
+            raise ValueError("pages e per_page devem ser >= 1")
+        self.pages = pages
+        self.per_page = per_page
+        self.seed = seed
+        self.footer_kb = footer_kb
+
+    @property
+    def total_items(self) -> int:
+        return self.pages * self.per_page
+
+    def _rng(self, page: int, index: int = -1) -> random.Random:
+        return random.Random(f"{self.seed}:{page}:{index}")
+
+    def product(self, page: int, index: int) -> dict:
+        """Dados do produto `index` da página `page` (mesma fonte da listagem e do detalhe)."""
+        rng = self._rng(page, index)
+        title = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(2, 6))).title()
+        return {
+            "title": f"{title} ({page}-{index})",
+            "slug": f"book-{page}-{index}",
+            "price": f"£{rng.randint(10, 59)}.{rng.randint(0, 99):02d}",
+            "rating": rng.choice(RATING_CLASSES),
+            "category": rng.choice(CATEGORIES),
+            "stock": rng.randint(0, 22),
+            "upc": f"{rng.getrandbits(64):016x}",
+            "description": " ".join(rng.choice(_WORDS) for _ in range(rng.randint(40, 120))),
+        }
+
+    def listing_path(self, page: int) -> str:
+        return f"/catalogue/page-{page}.html"
+
+    def detail_path(self, page: int, index: int) -> str:
+        return f"/catalogue/book-{page}-{index}/index.html"
+
+    def listing_page(self, page: int) -> str | None:
+        """HTML da página de listagem; None fora do intervalo."""
+        if not 1 <= page <= self.pages:
+            return None
+        pods = []
+        for i in range(self.per_page):
+            p = self.product(page, i)
+            title = escape(p["title"])
+            pods.append(
+                '<li class="col-xs-6 col-sm-4 col-md-3 col-lg-3">\n'
+                '<article class="product_pod">\n'
+                f'<div class="image_container"><a href="{p["slug"]}/index.html">'
+                f'<img src="../media/{p["slug"]}.jpg" alt="{title}" class="thumbnail"></a></div>\n'
+                f'<p class="star-rating {p["rating"]}"><i class="icon-star"></i></p>\n'
+                f'<h3><a href="{p["slug"]}/index.html" title="{title}">{title[:20]}...</a></h3>\n'
+                '<div class="product_price">\n'
+                f'<p class="price_color">{p["price"]}</p>\n'
+                '<p class="instock availability"><i class="icon-ok"></i>\n    In stock\n</p>\n'
+                '<form><button type="submit" class="btn btn-primary btn-block">Add to basket</button></form>\n'
+                "</div>\n</article>\n</li>"
+            )
+        pager = f'<li class="current">\n    Page {page} of {self.pages}\n</li>'
+        if page > 1:
+            pager = f'<li class="previous"><a href="page-{page - 1}.html">previous</a></li>' + pager
+        if page < self.pages:
+            pager += f'<li class="next"><a href="page-{page + 1}.html">next</a></li>'
+        sidebar = "".join(
+            f'<li><a href="../category/{c.lower().replace(" ", "-")}/index.html">{c}</a></li>'
+            for c in CATEGORIES
+        )
+        return (
+            "<!DOCTYPE html>\n<html lang=\"en-us\">\n<head>\n"
+            "<title>All products | Books to Scrape - Sandbox</title>\n"
+            '<meta charset="utf-8">\n<link rel="stylesheet" href="../static/css/styles.css">\n'
+            "</head>\n<body>\n"
+            '<header class="header"><a href="../index.html">Books to Scrape</a></header>\n'
+            '<div class="container-fluid page"><div class="row">\n'
+            f'<aside class="sidebar col-sm-4 col-md-3"><ul class="nav nav-list">{sidebar}</ul></aside>\n'
+            '<div class="col-sm-8 col-md-9"><section>\n'
+            f"<div><strong>{self.total_items}</strong> results.</div>\n"
+            '<ol class="row">\n' + "\n".join(pods) + "\n</ol>\n"
+            f'<div><ul class="pager">{pager}</ul></div>\n'
+            "</section></div></div></div>\n"
+            '<footer class="footer container-fluid"></footer>\n'
+            '<script src="../static/js/bootstrap.min.js"></script>\n'
+            f"{self._footer_script()}</body>\n</html>\n"
+        )
+
+    def _footer_script(self) -> str:
+        if not self.footer_kb:
+            return ""
+        entry = '{"id":%d,"track":"impression","slot":"footer-carousel"},'
+        state = "".join(entry % i for i in range(self.footer_kb * 1024 // 50 + 1))
+        return f"<script>window.__STATE__=[{state[: self.footer_kb * 1024]}];</script>\n"
+
+    def detail_page(self, page: int, index: int) -> str | None:
+        """HTML da página de detalhe; None fora do intervalo."""
+        if not (1 <= page <= self.pages and 0 <= index < self.per_page):
+            return None
+        p = self.product(page, index)
+        title = escape(p["title"])
+        availability = f"In stock ({p['stock']} available)" if p["stock"] else "Out of stock"
+        return (
+            "<!DOCTYPE html>\n<html lang=\"en-us\">\n<head>\n"
+            f"<title>{title} | Books to Scrape - Sandbox</title>\n</head>\n<body>\n"
+            '<ul class="breadcrumb"><li><a href="../../index.html">Home</a></li>'
+            '<li><a href="../category/books_1/index.html">Books</a></li>'
+            f'<li><a href="../category/x/index.html">{p["category"]}</a></li>'
+            f'<li class="active">{title}</li></ul>\n'
+            '<article class="product_page"><div class="row">'
+            f'<div class="col-sm-6 product_main"><h1>{title}</h1>'
+            f'<p class="price_color">{p["price"]}</p>'
+            f'<p class="star-rating {p["rating"]}"></p></div></div>\n'
+            '<div id="product_description" class="sub-header"><h2>Product Description</h2></div>\n'
+            f"<p>{escape(p['description'])}</p>\n"
+            '<table class="table table-striped">'
+            f"<tr><th>UPC</th><td>{p['upc']}</td></tr>"
+            "<tr><th>Product Type</th><td>Books</td></tr>"
+            f"<tr><th>Availability</th><td>{availability}</td></tr>"
+            "</table>\n</article>\n</body>\n</html>\n"
+        )
+
+    def iter_listing_pages(self):
+        """(path, html) de todas as páginas de listagem, para benchmarks offline."""
+        for page in range(1, self.pages + 1):
+            yield self.listing_path(page), self.listing_page(page)
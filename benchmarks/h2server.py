@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Servidor HTTP/2 local (h2c: sem TLS, conhecimento prévio) para o mesmo
+Catalog de server.py, com latência e compressão opcionais. Serve para testar
+o Http2Adapter (HttpClient(http2="h2c") / --http2 h2c) e comparar com
+HTTP/1.1 sem rede externa. Requer h2 (incluso em httpx[http2]).
+
+  python -m benchmarks.h2server --port 8766 --latency 0.02 --compress
+  python scraper.py --url http://127.0.0.1:8766/catalogue/page-1.html --http2 h2c
+"""
+
+import argparse
+import asyncio
+import threading
+
+from .catalog import Catalog
+from .server import ENCODERS, negotiate_encoding, render
+
+
+def _import_h2():
+    try:
+        import h2.config
+        import h2.connection
+        import h2.events
+        import h2.exceptions
+    except ImportError:
+        raise ImportError("Para o servidor HTTP/2, instale: pip install h2")
+    return h2
+
+
+class _H2Protocol(asyncio.Protocol):
+    """Uma conexão HTTP/2: cada stream é respondido após `latency`, sem bloquear os outros."""
+
+    def __init__(self, server: "MockH2Server"):
+        self.h2 = _import_h2()
+        self.server = server
+        self.conn = self.h2.connection.H2Connection(
+            self.h2.config.H2Configuration(client_side=False, header_encoding="utf-8")
+        )
+        self.transport: asyncio.Transport | None = None
+        self._pending: dict[int, memoryview] = {}  # corpo à espera de janela (flow control)
+        self._streams: set[int] = set()
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+        self.server.stats["connections"] += 1
+        self.conn.initiate_connection()
+        transport.write(self.conn.data_to_send())
+
+    def connection_lost(self, exc) -> None:
+        self._pending.clear()
+        self._streams.clear()
+
+    def data_received(self, data: bytes) -> None:
+        events = self.h2.events
+        try:
+            received = self.conn.receive_data(data)
+        except self.h2.exceptions.ProtocolError:
+            self.transport.write(self.conn.data_to_send())
+            self.transport.close()
+            return
+        loop = asyncio.get_running_loop()
+        for event in received:
+            if isinstance(event, events.RequestReceived):
+                self._streams.add(event.stream_id)
+                stats = self.server.stats
+                stats["max_streams"] = max(stats["max_streams"], len(self._streams))
+                loop.call_later(self.server.latency, self._respond, event.stream_id, dict(event.headers))
+            elif isinstance(event, events.WindowUpdated):
+                self._flush()
+            elif isinstance(event, events.StreamReset):
+                self._done(event.stream_id)
+            elif isinstance(event, events.ConnectionTerminated):
+                self.transport.close()
+                return
+        self.transport.write(self.conn.data_to_send())
+
+    def _done(self, stream_id: int) -> None:
+        self._pending.pop(stream_id, None)
+        self._streams.discard(stream_id)
+
+    def _respond(self, stream_id: int, headers: dict) -> None:
+        if self.transport.is_closing() or stream_id not in self._streams:
+            return
+        self.server.stats["requests"] += 1
+        html = render(self.server.catalog, headers.get(":path", "/"))
+        response = [(":status", "200" if html is not None else "404")]
+        body = html.encode("utf-8") if html is not None else b""
+        encoding = negotiate_encoding(headers.get("accept-encoding")) if self.server.compress else None
+        if body and encoding:
+            body = ENCODERS[encoding](body)
+            response += [("content-encoding", encoding), ("vary", "accept-encoding")]
+        response += [("content-type", "text/html; charset=utf-8"), ("content-length", str(len(body)))]
+        try:
+            self.conn.send_headers(stream_id, response, end_stream=not body)
+        except self.h2.exceptions.StreamClosedError:
+            self._done(stream_id)
+            return
+        self.server.stats["bytes"] += len(body)
+        if body:
+            self._pending[stream_id] = memoryview(body)
+            self._flush()
+        else:
+            self._done(stream_id)
+        self.transport.write(self.conn.data_to_send())
+
+    def _flush(self) -> None:
+        """Envia o que as janelas de flow control permitirem, stream a stream."""
+        for stream_id in list(self._pending):
+            data = self._pending[stream_id]
+            try:
+                while data:
+                    size = min(
+                        self.conn.local_flow_control_window(stream_id),
+                        self.conn.max_outbound_frame_size,
+                    )
+                    if size <= 0:
+                        break
+                    self.conn.send_data(stream_id, data[:size].tobytes())
+                    data = data[size:]
+                if data:
+                    self._pending[stream_id] = data
+                    continue
+                self.conn.end_stream(stream_id)
+            except self.h2.exceptions.StreamClosedError:
+                pass
+            self._done(stream_id)
+        self.transport.write(self.conn.data_to_send())
+
+
+class MockH2Server:
+    """
+    Sobe o catálogo em HTTP/2 (h2c) em 127.0.0.1, com um event loop numa
+    thread daemon. stats: requests, connections, max_streams (pico de
+    streams simultâneos numa conexão) e bytes (corpos enviados).
+    """
+
+    def __init__(
+        self,
+        catalog: Catalog | None = None,
+        port: int = 0,
+        latency: float = 0.0,
+        compress: bool = False,
+    ):
+        _import_h2()  # falha cedo, antes de subir a thread
+        self.catalog = catalog or Catalog()
+        self.port = port
+        self.latency = latency
+        self.compress = compress
+        self.stats = {"requests": 0, "connections": 0, "max_streams": 0, "bytes": 0}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def start_url(self) -> str:
+        return self.base_url + self.catalog.listing_path(1)
+
+    def start(self) -> "MockH2Server":
+        loop = self._loop = asyncio.new_event_loop()
+        server = loop.run_until_complete(
+            loop.create_server(lambda: _H2Protocol(self), "127.0.0.1", self.port)
+        )
+        self.port = server.sockets[0].getsockname()[1]
+
+        def run():
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_forever()
+            finally:
+                server.close()
+                loop.run_until_complete(server.wait_closed())
+                loop.close()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Catálogo sintético local em HTTP/2 (h2c)")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0, help="Segundos por resposta")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--compress", action="store_true", help="Comprime as respostas (br/zstd/gzip)"
+    )
+    args = parser.parse_args()
+
+    server = MockH2Server(
+        Catalog(args.pages, args.per_page, args.seed),
+        port=args.port,
+        latency=args.latency,
+        compress=args.compress,
+    ).start()
+    print(f"Servindo {server.start_url} em HTTP/2 sem TLS (Ctrl+C para sair)")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Servidor HTTP local que serve um Catalog, com latência, erros 5xx e 429
+injetáveis e compressão opcional (gzip, br, zstd conforme o Accept-Encoding).
+Roda numa thread (MockCatalogServer) ou direto na linha de comando:
+
+  python -m benchmarks.server --port 8765 --pages 50 --latency 0.02 --throttle-rate 0.05
+  python -m benchmarks.server --compress
+"""
+
+import argparse
+import gzip
+import hashlib
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .catalog import Catalog
+
+_LISTING_RE = re.compile(r"/catalogue/page-(\d+)\.html$")
+_DETAIL_RE = re.compile(r"/catalogue/book-(\d+)-(\d+)/index\.html$")
+
+
+def _encoders() -> dict:
+    """Compressores disponíveis no ambiente, com níveis típicos de compressão on-the-fly."""
+    encoders = {"gzip": lambda body: gzip.compress(body, compresslevel=6)}
+    try:
+        import brotli
+
+        encoders["br"] = lambda body: brotli.compress(body, quality=5)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+
+        encoders["zstd"] = lambda body: zstandard.ZstdCompressor(level=3).compress(body)
+    except ImportError:
+        pass
+    return encoders
+
+
+ENCODERS = _encoders()
+# Preferência do servidor entre as codificações aceitas pelo cliente: br
+# comprime melhor o HTML (dicionário embutido); zstd vale para quem não aceita br
+ENCODING_PREFERENCE = ("br", "zstd", "gzip")
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """Melhor codificação aceita pelo cliente e disponível aqui (None: sem compressão)."""
+    if not accept_encoding:
+        return None
+    offered = {token.split(";")[0].strip().lower() for token in accept_encoding.split(",")}
+    return next((e for e in ENCODING_PREFERENCE if e in offered and e in ENCODERS), None)
+
+
+def render(catalog: Catalog, path: str) -> str | None:
+    """HTML da listagem ou do detalhe para o caminho pedido; None se não existe."""
+    path = path.split("?", 1)[0]
+    if m := _LISTING_RE.search(path):
+        return catalog.listing_page(int(m.group(1)))
+    if m := _DETAIL_RE.search(path):
+        return catalog.detail_page(int(m.group(1)), int(m.group(2)))
+    return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers e corpo saem em writes separados: sem isso o Nagle + delayed ACK
+    # somam ~40 ms a cada resposta em keep-alive
+    disable_nagle_algorithm = True
+    server: "_CatalogHTTPServer"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, code: int, body: bytes = b"", headers: dict | None = None) -> None:
+        self.send_response(code)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        srv = self.server
+        srv.count("requests")
+        if srv.latency:
+            time.sleep(srv.latency)
+
+        fault = srv.roll()
+        if fault < srv.throttle_rate:
+            srv.count("throttled")
+            return self._send(429, headers={"Retry-After": str(srv.retry_after)})
+        if fault < srv.throttle_rate + srv.error_rate:
+            srv.count("errors")
+            return self._send(503)
+
+        html = render(srv.catalog, self.path)
+        if html is None:
+            return self._send(404)
+
+        body = html.encode("utf-8")
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            srv.count("not_modified")
+            return self._send(304, headers={"ETag": etag})
+        headers = {"Content-Type": "text/html; charset=utf-8", "ETag": etag}
+        encoding = negotiate_encoding(self.headers.get("Accept-Encoding")) if srv.compress else None
+        if encoding:
+            body = ENCODERS[encoding](body)
+            headers.update({"Content-Encoding": encoding, "Vary": "Accept-Encoding"})
+        srv.count("bytes", len(body))
+        self._send(200, body, headers)
+
+
+class _CatalogHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self, address, catalog, latency, error_rate, throttle_rate, retry_after, seed, compress
+    ):
+        super().__init__(address, _Handler)
+        self.catalog = catalog
+        self.compress = compress
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.stats = {"requests": 0, "throttled": 0, "errors": 0, "not_modified": 0, "bytes": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def handle_error(self, request, client_address) -> None:
+        # Cliente que fecha a conexão no meio (ex.: leitura em streaming
+        # interrompida) não é erro do servidor
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def roll(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    def count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += n
+
+
+class MockCatalogServer:
+    """
+    Sobe o catálogo em 127.0.0.1 numa thread daemon.
+
+    - latency: segundos de espera antes de cada resposta
+    - error_rate: fração de respostas 503
+    - throttle_rate: fração de respostas 429 com Retry-After: retry_after
+    - compress: comprime as respostas 200 (br > zstd > gzip, conforme o
+      Accept-Encoding e os compressores instalados)
+    Use port=0 para uma porta livre; a URL inicial fica em start_url.
+    """
+
+    def __init__(
+        self,
+        catalog: Catalog | None = None,
+        port: int = 0,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: int = 1,
+        seed: int = 0,
+        compress: bool = False,
+    ):
+        self.catalog = catalog or Catalog()
+        self._httpd = _CatalogHTTPServer(
+            ("127.0.0.1", port),
+            self.catalog,
+            latency,
+            error_rate,
+            throttle_rate,
+            retry_after,
+            seed,
+            compress,
+        )
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def start_url(self) -> str:
+        return self.base_url + self.catalog.listing_path(1)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return dict(self._httpd.stats)
+
+    def start(self) -> "MockCatalogServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Atende na thread atual até Ctrl+C (uso pela linha de comando)."""
+        try:
+            self._httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._httpd.server_close()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Catálogo sintético local para benchmarks")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0, help="Segundos por resposta")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fração de 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After dos 429 (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--footer-kb", type=int, default=0, help="<script> inline após o rodapé das listagens (KB)"
+    )
+    parser.add_argument(
+        "--compress", action="store_true", help="Comprime as respostas (br/zstd/gzip)"
+    )
+    args = parser.parse_args()
+
+    server = MockCatalogServer(
+        Catalog(args.pages, args.per_page, args.seed, args.footer_kb),
+        port=args.port,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+        compress=args.compress,
+    )
+    print(f"Servindo {server.start_url} (Ctrl+C para sair)")
+    server.serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
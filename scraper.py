@@ -6,23 +6,148 @@ Uso:
   python scraper.py --url https://books.toscrape.com/catalogue/page-1.html
   python scraper.py --output-dir ./meus_dados
   python scraper.py --max-pages 5
+  python scraper.py --resume
   python scraper.py --json
+  python scraper.py --jsonl
+  python scraper.py --enrich
+  python scraper.py --schema schemas/books_toscrape.json
+  python scraper.py --urls-file seeds.txt --concurrency 8
+  python scraper.py --frontier sqlite:///output/frontier.sqlite3   (em N processos)
+  python scraper.py --merge-shards --json
+  python scraper.py --delta
+  python scraper.py --store          (consultas: python -m src.store_cli output/items.sqlite3 ...)
+  python scraper.py --stream --max-body-mb 2
+  python scraper.py --http2 --concurrency 16
   python scraper.py --excel
+  python scraper.py --parquet
 """
 
 import argparse
 import sys
+import threading
 import time
+from contextlib import ExitStack, nullcontext
+from datetime import datetime
+from functools import partial
 from pathlib import Path
 
-from src.exporter import export_csv, export_excel, export_json
-from src.fetcher import RequestBlocker, fetch_with_retry
-from src.parser import extract_items
+from src.exporter import (
+    ArrowWriter,
+    CsvWriter,
+    ExcelWriter,
+    JsonLinesWriter,
+    JsonWriter,
+    ParquetWriter,
+    iter_jsonl_items,
+)
+from src.async_fetcher import AsyncFetcher
+from src.cache import ResponseCache
+from src.checkpoint import CrawlCheckpoint
+from src.dedup import UrlSeenSet
+from src.enricher import DetailEnricher
+from src.fetcher import HttpClient, RequestBlocker, fetch_with_retry
+from src.fingerprint import DEFAULT_REGIONS, FingerprintStore, PageFingerprinter
+from src.frontier import MAX_ATTEMPTS, SHARD_PREFIX, default_worker_id, open_frontier
+from src.item import DETAIL_FIELDS, FIELDNAMES, LISTING_FIELDNAMES, item_values
+from src.metrics import METRICS_FILE, RunMetrics, serve_metrics, timed
+from src.parser import extract_items, parse_html
+from src.pipeline import ParsePool
+from src.schema import get_extractor, load_schema
+from src.ratelimit import RateLimiter
+from src.retry import CircuitBreaker, RetryBudget
+from src.scheduler import CrawlScheduler, read_seed_file
+from src.store import StoreWriter
+from src.streaming import StreamReader
 from src.utils import setup_logging
 
 DEFAULT_URL = "https://books.toscrape.com/catalogue/page-1.html"
 
 
+def export_fields(args, schema: dict | None = None) -> list[str]:
+    """Colunas exportadas: UPC/estoque só com --enrich ou quando o schema os extrai."""
+    if args.enrich or (schema and any(name in schema["fields"] for name in DETAIL_FIELDS)):
+        return FIELDNAMES
+    return LISTING_FIELDNAMES
+
+
+def open_writers(args, output_dir: Path, logger, fields=None) -> dict:
+    """Writers dos formatos pedidos na linha de comando (CSV sempre)."""
+    writers = {"CSV": CsvWriter.in_dir(output_dir, fields=fields)}
+    if args.json:
+        writers["JSON"] = JsonWriter.in_dir(output_dir, fields=fields)
+    if args.jsonl:
+        writers["JSON Lines"] = JsonLinesWriter.in_dir(output_dir, fields=fields)
+    optional_writers = (
+        (args.excel, "Excel", ExcelWriter),
+        (args.parquet, "Parquet", ParquetWriter),
+        (args.arrow, "Arrow", ArrowWriter),
+    )
+    for enabled, label, writer_cls in optional_writers:
+        if not enabled:
+            continue
+        try:
+            writers[label] = writer_cls.in_dir(output_dir, fields=fields)
+        except ImportError as e:
+            logger.warning("%s não exportado: %s", label, e)
+    if args.store:
+        writers["Base"] = open_store(args, output_dir)
+    return writers
+
+
+def open_store(args, output_dir: Path) -> StoreWriter:
+    """Base de itens do --store (caminho informado ou <output-dir>/items.sqlite3)."""
+    if args.store is True:
+        return StoreWriter.in_dir(output_dir)
+    return StoreWriter(args.store)
+
+
+def log_store(writers: dict, logger) -> None:
+    store = writers.get("Base")
+    if store is not None:
+        logger.info(
+            "Base: %d itens novos, %d atualizados, %d inalterados, %d registros no histórico",
+            store.stats["new"],
+            store.stats["updated"],
+            store.stats["unchanged"],
+            store.stats["history"],
+        )
+
+
+def merge_shards(args, output_dir: Path, logger) -> int:
+    """Junta os shards dos workers em --output-dir numa saída única (sem itens repetidos)."""
+    shards = sorted(output_dir.glob(f"{SHARD_PREFIX}*.jsonl"))
+    if not shards:
+        logger.error("Nenhum shard %s*.jsonl em %s", SHARD_PREFIX, output_dir)
+        return 1
+    # Os shards guardam todos os campos; as colunas seguem os flags do merge
+    writers = open_writers(args, output_dir, logger, export_fields(args))
+    seen: set = set()
+    duplicates = 0
+    with ExitStack() as stack:
+        for writer in writers.values():
+            stack.enter_context(writer)
+        for path in shards:
+            for item in iter_jsonl_items(path):
+                # Página refeita após lease vencido gera os mesmos itens
+                key = item.link or item_values(item)
+                if key in seen:
+                    duplicates += 1
+                    continue
+                seen.add(key)
+                for writer in writers.values():
+                    writer.write(item)
+    logger.info(
+        "Shards mesclados: %d arquivos, %d itens (%d repetidos descartados)",
+        len(shards),
+        len(seen),
+        duplicates,
+    )
+    for label, writer in writers.items():
+        logger.info("%s salvo: %s", label, writer.path)
+    log_store(writers, logger)
+    return 0
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description="Web Scraping Premium - Coleta dados de sites com paginação, retry e exportação limpa."
@@ -32,6 +157,18 @@ def main() -> int:
         default=DEFAULT_URL,
         help="URL inicial para scraping (default: Books to Scrape)",
     )
+    parser.add_argument(
+        "--urls-file",
+        type=Path,
+        default=None,
+        help="Arquivo com várias URLs iniciais (uma por linha); saída única mesclada",
+    )
+    parser.add_argument(
+        "--schema",
+        type=Path,
+        default=None,
+        help="Schema JSON do site (seletores + pós-processadores); default: Books to Scrape",
+    )
     parser.add_argument(
         "--output-dir",
         type=Path,
@@ -44,16 +181,219 @@ def main() -> int:
         default=None,
         help="Máximo de páginas a processar (default: todas)",
     )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Retoma o crawl interrompido a partir do checkpoint em --output-dir",
+    )
     parser.add_argument(
         "--json",
         action="store_true",
         help="Exportar também em JSON",
     )
+    parser.add_argument(
+        "--jsonl",
+        action="store_true",
+        help="Exportar também em JSON Lines",
+    )
     parser.add_argument(
         "--excel",
         action="store_true",
         help="Exportar também em Excel",
     )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=10,
+        help="Máximo de conexões HTTP mantidas por host (default: 10)",
+    )
+    parser.add_argument(
+        "--http2",
+        nargs="?",
+        const="alpn",
+        default=None,
+        choices=("alpn", "h2c"),
+        help="HTTP/2 via httpx, com as requisições de um host multiplexadas numa conexão: "
+        "alpn (https, cai para HTTP/1.1; default) ou h2c (sem TLS, ex.: benchmarks.h2server); "
+        "requer pip install 'httpx[http2]'",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Requisições simultâneas; > 1 busca em paralelo as páginas numeradas descobertas (default: 1)",
+    )
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        default=4,
+        help="Máximo de requisições simultâneas por host (default: 4)",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=1.0,
+        help="Requisições por segundo por domínio (default: 1.0)",
+    )
+    parser.add_argument(
+        "--burst",
+        type=int,
+        default=1,
+        help="Rajada máxima de requisições por domínio (default: 1)",
+    )
+    parser.add_argument(
+        "--retry-budget",
+        type=float,
+        default=0.2,
+        help="Retries por host limitados a esta fração das requisições (default: 0.2)",
+    )
+    parser.add_argument(
+        "--breaker-threshold",
+        type=int,
+        default=5,
+        help="Falhas seguidas (timeout, conexão, 5xx) que abrem o circuit breaker do host; "
+        "0 desativa (default: 5)",
+    )
+    parser.add_argument(
+        "--breaker-reset",
+        type=float,
+        default=30.0,
+        help="Segundos com o circuito aberto até a próxima requisição de sonda (default: 30)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Ativa cache HTTP em disco nesta pasta (revalida com ETag/Last-Modified)",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=3600,
+        help="Segundos em que uma página em cache é usada sem revalidar (default: 3600)",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=500,
+        help="Tamanho máximo do cache em MB; excedente sai por LRU (default: 500)",
+    )
+    parser.add_argument(
+        "--parser",
+        choices=("auto", "lxml", "html.parser"),
+        default="auto",
+        help="Backend de parsing HTML (default: auto = lxml se instalado)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Lê as listagens em streaming: itens e próxima página saem enquanto o corpo "
+        "chega e o download para depois da paginação (layout do Books to Scrape)",
+    )
+    parser.add_argument(
+        "--max-body-mb",
+        type=float,
+        default=5,
+        help="Com --stream, abandona páginas com corpo acima deste tamanho (default: 5)",
+    )
+    parser.add_argument(
+        "--parquet",
+        action="store_true",
+        help="Exportar também em Parquet (schema tipado, requer pyarrow)",
+    )
+    parser.add_argument(
+        "--arrow",
+        action="store_true",
+        help="Exportar também em Arrow IPC (schema tipado, requer pyarrow)",
+    )
+    parser.add_argument(
+        "--enrich",
+        action="store_true",
+        help="Visita a página de detalhe de cada item (categoria, descrição, UPC, estoque)",
+    )
+    parser.add_argument(
+        "--enrich-workers",
+        type=int,
+        default=8,
+        help="Páginas de detalhe buscadas simultaneamente com --enrich (default: 8)",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=0,
+        help="Processos para extração paralela dos itens (default: 0 = no processo principal)",
+    )
+    parser.add_argument(
+        "--store",
+        nargs="?",
+        const=True,
+        default=None,
+        type=Path,
+        metavar="ARQUIVO",
+        help="Grava também numa base SQLite acumulada entre execuções (upsert por link + "
+        "histórico de preço/disponibilidade); default: <output-dir>/items.sqlite3",
+    )
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="Só as mudanças desde a última execução: páginas inalteradas não são "
+        "extraídas e a saída é delta_*.csv (adicionados, alterados, removidos)",
+    )
+    parser.add_argument(
+        "--fingerprint-region",
+        action="append",
+        default=None,
+        metavar="SELETOR",
+        help="Região da página usada no fingerprint do --delta (tag, .classe, tag.classe "
+        f"ou #id; repetível; default: {' '.join(DEFAULT_REGIONS)})",
+    )
+    parser.add_argument(
+        "--bloom-capacity",
+        type=int,
+        default=None,
+        help="URLs esperadas; ativa Bloom filter de memória fixa para as páginas vistas",
+    )
+    parser.add_argument(
+        "--bloom-error-rate",
+        type=float,
+        default=0.001,
+        help="Taxa de falso positivo do Bloom filter (default: 0.001)",
+    )
+    parser.add_argument(
+        "--frontier",
+        default=None,
+        help="Modo worker com frontier compartilhado: sqlite:///arquivo.sqlite3, "
+        "redis://host:6379/0 ou memory; cada worker grava um shard em --output-dir",
+    )
+    parser.add_argument(
+        "--worker-id",
+        default=None,
+        help="Identificador do worker no frontier (default: host-pid)",
+    )
+    parser.add_argument(
+        "--lease",
+        type=float,
+        default=300,
+        help="Segundos até uma página reivindicada voltar à fila se o worker sumir (default: 300)",
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=MAX_ATTEMPTS,
+        help="Falhas de fetch de uma página do frontier antes de desistir dela "
+        f"(default: {MAX_ATTEMPTS})",
+    )
+    parser.add_argument(
+        "--merge-shards",
+        action="store_true",
+        help="Junta os shards dos workers em --output-dir nos formatos pedidos e sai",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Expõe métricas no formato Prometheus em http://127.0.0.1:PORTA/metrics",
+    )
     parser.add_argument(
         "-v",
         "--verbose",
@@ -68,11 +408,74 @@ def main() -> int:
 
     logger = setup_logging(log_file=log_file, verbose=args.verbose)
     logger.info("=== Web Scraping Premium ===")
-    logger.info("URL: %s", args.url)
+    if args.merge_shards:
+        return merge_shards(args, output_dir, logger)
+
+    seeds = read_seed_file(args.urls_file) if args.urls_file else None
+    if seeds is not None:
+        if not seeds:
+            logger.error("Nenhuma URL em %s", args.urls_file)
+            return 1
+        logger.info("Seeds: %d URLs de %s", len(seeds), args.urls_file)
+    else:
+        logger.info("URL: %s", args.url)
     logger.info("Output: %s", output_dir.resolve())
     logger.info("Max páginas: %s", args.max_pages or "ilimitado")
+    logger.info("Rate limit: %.2f req/s por domínio (burst %d)", args.rate, args.burst)
+
+    frontier = None
+    worker_id = args.worker_id or default_worker_id()
+    if args.frontier:
+        frontier = open_frontier(args.frontier)
+        added = frontier.add(seeds or [args.url])
+        logger.info(
+            "Frontier %s: worker %s (%d URLs novas, %s)",
+            args.frontier,
+            worker_id,
+            added,
+            frontier.counts(),
+        )
+
+    metrics = RunMetrics()
+    metrics_server = None
+    if args.metrics_port is not None:
+        metrics_server = serve_metrics(metrics, args.metrics_port)
+        logger.info("Métricas Prometheus: http://127.0.0.1:%d/metrics", args.metrics_port)
 
     blocker = RequestBlocker(cooldown_seconds=1.5)
+    try:
+        client = HttpClient(pool_maxsize=args.pool_size, http2=args.http2)
+        if args.http2:
+            logger.info("HTTP/2 (%s) via httpx", args.http2)
+    except ImportError as e:
+        logger.warning("HTTP/2 indisponível, usando HTTP/1.1: %s", e)
+        client = HttpClient(pool_maxsize=args.pool_size)
+    limiter = RateLimiter(rate=args.rate, burst=args.burst)
+    # Compartilhados por todos os fetchers: o estado de cada host vale para o crawl todo
+    retry_budget = RetryBudget(ratio=args.retry_budget)
+    breaker = None
+    if args.breaker_threshold > 0:
+        breaker = CircuitBreaker(args.breaker_threshold, reset_timeout=args.breaker_reset)
+    cache = None
+    if args.cache_dir:
+        cache = ResponseCache(
+            args.cache_dir, ttl=args.cache_ttl, max_bytes=int(args.cache_max_mb * 1024 * 1024)
+        )
+        logger.info("Cache HTTP: %s (TTL %.0f s)", args.cache_dir, args.cache_ttl)
+
+    # Streaming: itens e próxima página extraídos enquanto o corpo chega
+    reader = None
+    if args.stream and args.schema:
+        logger.warning("--stream só reconhece o layout do Books to Scrape; ignorado com --schema")
+    elif args.stream and args.delta and frontier is None:
+        logger.warning("--stream não se aplica a --delta (o fingerprint usa o HTML inteiro)")
+    elif args.stream:
+        reader = StreamReader(
+            max_bytes=int(args.max_body_mb * 1024 * 1024), logger=logger, metrics=metrics
+        )
+        logger.info("Streaming: corpo de até %.1f MB por página", args.max_body_mb)
+        if cache:
+            logger.info("Com --stream, o cache HTTP vale só para as páginas de detalhe")
 
     def fetch(url: str):
         return fetch_with_retry(
@@ -81,55 +484,354 @@ def main() -> int:
             base_delay=1.0,
             timeout=15,
             blocker=blocker,
+            session=client.session,
+            rate_limiter=limiter,
+            cache=cache,
             logger=logger,
+            metrics=metrics,
+            retry_budget=retry_budget,
+            breaker=breaker,
+            reader=reader,
         )
 
-    def extract(html: str, base_url: str):
-        return extract_items(html, base_url, site_type="books_toscrape")
+    # partial / CompiledExtractor (e não closure) para ser picklable no pool de processos
+    schema = None
+    if args.schema:
+        schema = load_schema(args.schema)
+        extract = get_extractor(schema)
+        logger.info("Schema: %s (%s)", schema["name"], args.schema)
+    else:
+        extract = partial(extract_items, site_type="books_toscrape")
+    parse = partial(parse_html, backend=None if args.parser == "auto" else args.parser)
 
-    from src.paginator import paginate
+    from src.paginator import iter_frontier, iter_pages
 
-    start = time.perf_counter()
-    pages = paginate(
-        args.url,
+    # Modo delta: fingerprints e itens da última execução em --output-dir
+    fingerprints = None
+    if args.delta and frontier is not None:
+        logger.warning("--delta não se aplica a --frontier; exportando tudo")
+    elif args.delta:
+        fingerprints = FingerprintStore.in_dir(
+            output_dir, PageFingerprinter(args.fingerprint_region or DEFAULT_REGIONS)
+        )
+        run = fingerprints.begin_run(resume=args.resume)
+        logger.info("Modo delta: execução %d (%s)", run, fingerprints.path)
+
+    # Writers abertos antes do crawl: itens são gravados conforme chegam
+    if fingerprints is not None:
+        # Só o delta é exportado, no fim da execução (e a base, com --store)
+        writers = {"Base": open_store(args, output_dir)} if args.store else {}
+        if args.store:
+            # Itens de páginas inalteradas não chegam aos writers: renova o last_seen
+            fingerprints.on_unchanged = writers["Base"].touch
+    elif frontier is not None:
+        # Worker: shard JSON Lines próprio; os formatos finais saem no --merge-shards
+        shard = output_dir / f"{SHARD_PREFIX}{worker_id}-{datetime.now():%Y%m%d_%H%M%S}.jsonl"
+        writers = {"Shard": JsonLinesWriter(shard)}
+    else:
+        writers = open_writers(args, output_dir, logger, export_fields(args, schema))
+
+    success_count = 0
+
+    # Checkpoint: páginas visitadas, próxima pendente e itens já emitidos
+    # (só no modo de URL única; no multi-seed e no frontier o estado é outro)
+    checkpoint = None
+    start_url = args.url
+    # Páginas vistas: hashes de 64 bits (ou Bloom filter com --bloom-capacity)
+    seen = UrlSeenSet(capacity=args.bloom_capacity, error_rate=args.bloom_error_rate)
+    if seeds is not None or frontier is not None:
+        if args.resume:
+            logger.warning("--resume não se aplica a --urls-file/--frontier; iniciando do zero")
+    else:
+        checkpoint = CrawlCheckpoint.in_dir(output_dir)
+        if args.resume and checkpoint.start_url == args.url:
+            start_url = checkpoint.pending
+            seen.update(checkpoint.visited())
+            logger.info(
+                "Retomando checkpoint: %d páginas já visitadas, %d itens, próxima: %s",
+                len(seen),
+                checkpoint.item_count(),
+                start_url or "(crawl já concluído)",
+            )
+            for item in checkpoint.iter_items():
+                for writer in writers.values():
+                    writer.write(item)
+                success_count += 1
+        else:
+            if args.resume:
+                logger.warning("Nenhum checkpoint de %s para retomar; iniciando do zero", args.url)
+            checkpoint.reset(args.url)
+
+    fetcher = None
+    if args.concurrency > 1 and seeds is None and frontier is None:
+        fetcher = AsyncFetcher(
+            concurrency=args.concurrency,
+            per_host=args.per_host,
+            max_retries=3,
+            base_delay=1.0,
+            timeout=15,
+            blocker=blocker,
+            session=client.session,
+            rate_limiter=limiter,
+            cache=cache,
+            logger=logger,
+            metrics=metrics,
+            retry_budget=retry_budget,
+            breaker=breaker,
+            reader=reader,
+        )
+        logger.info(
+            "Concorrência: %d requisições (%d por host)", args.concurrency, args.per_host
+        )
+
+    detail_fetcher = None
+    enricher = None
+    if args.enrich:
+        detail_fetcher = AsyncFetcher(
+            concurrency=args.enrich_workers,
+            per_host=args.enrich_workers,
+            max_retries=3,
+            base_delay=1.0,
+            timeout=15,
+            blocker=blocker,
+            session=client.session,
+            rate_limiter=limiter,
+            cache=cache,
+            logger=logger,
+            metrics=metrics,
+            retry_budget=retry_budget,
+            breaker=breaker,
+        )
+        enricher = DetailEnricher(detail_fetcher.fetch_all, parse_fn=parse, logger=logger)
+        logger.info("Enriquecimento de detalhes: %d workers", args.enrich_workers)
+
+    enrich_fn = enricher.enrich if enricher else None
+    if enricher and seeds is not None and frontier is None:
+        # Seeds rodam em threads; o enriquecimento (já paralelo) é serializado
+        enrich_lock = threading.Lock()
+
+        def enrich_fn(items):
+            with enrich_lock:
+                return enricher.enrich(items)
+
+    parse_pool = ParsePool(workers=args.parse_workers) if args.parse_workers > 0 else None
+    if parse_pool:
+        logger.info("Extração paralela: %d processos", parse_pool.workers)
+
+    crawl = partial(
+        iter_pages,
         fetch_fn=fetch,
         extract_fn=extract,
         max_pages=args.max_pages,
+        seen_urls=seen,
         logger=logger,
+        parse_fn=parse,
+        checkpoint=checkpoint,
+        parse_pool=parse_pool,
+        fetch_many_fn=fetcher.fetch_all if fetcher else None,
+        enrich_fn=enrich_fn,
+        metrics=metrics,
+        fingerprints=fingerprints,
     )
-    elapsed = time.perf_counter() - start
+    scheduler = None
+    if frontier is not None:
+        pages = iter_frontier(
+            frontier,
+            worker_id,
+            fetch_fn=fetch,
+            extract_fn=extract,
+            max_pages=args.max_pages,
+            logger=logger,
+            parse_fn=parse,
+            lease=args.lease,
+            enrich_fn=enrich_fn,
+            metrics=metrics,
+            max_attempts=args.max_attempts,
+        )
+    elif seeds is not None:
+        # Um crawl por seed; `seen` compartilhado evita páginas repetidas entre seeds.
+        # Falha de fetch levanta FetchError: a seed conta como falha, não concluída
+        scheduler = CrawlScheduler(
+            partial(crawl, raise_on_error=True), concurrency=args.concurrency, per_domain=args.per_host, logger=logger
+        )
+        scheduler.add_many(seeds)
+        logger.info(
+            "Agendador: %d seeds simultâneas (%d por domínio)", args.concurrency, args.per_host
+        )
+        pages = ((url, items) for _seed, url, items in scheduler.run())
+    else:
+        pages = crawl(start_url)
 
-    all_items: list = []
-    success_count = 0
-    error_count = 0
-    for _url, _html, items in pages:
-        all_items.extend(items)
-        success_count += len(items)
+    start = time.perf_counter()
+    try:
+        with client, checkpoint or nullcontext():
+            for _url, items in pages:
+                with timed(metrics, "export"):
+                    for writer in writers.values():
+                        writer.write_many(items)
+                success_count += len(items)
+    finally:
+        for async_fetcher in (fetcher, detail_fetcher):
+            if async_fetcher:
+                async_fetcher.close()
+        if parse_pool:
+            parse_pool.close()
+        with timed(metrics, "export"):
+            for writer in writers.values():
+                writer.close()
+        if metrics_server:
+            metrics_server.shutdown()
+            metrics_server.server_close()
+        frontier_counts = None
+        if frontier is not None:
+            frontier_counts = frontier.counts()
+            frontier.close()
+    delta = None
+    if fingerprints is not None:
+        with timed(metrics, "export"):
+            delta = fingerprints.finish_run()
+            delta_file = fingerprints.export_changes(output_dir, export_fields(args, schema))
+        fingerprints.close()
+    elapsed = time.perf_counter() - start
+    conn = client.connection_stats()
+    statuses = metrics.status_counts
+    error_count = sum(n for status, n in statuses.items() if status != "ok")
 
-    total_items = len(all_items)
+    total_items = success_count
     logger.info("Total de itens extraídos: %d", total_items)
     logger.info("Tempo de execução: %.1f s", elapsed)
+    logger.info(
+        "Conexões HTTP: %d abertas, %d reutilizadas (%d requisições)",
+        conn["opened"],
+        conn["reused"],
+        conn["requests"],
+    )
+    transfer = metrics.snapshot()["transfer"]
+    if transfer["wire_bytes"]:
+        logger.info(
+            "Tráfego: %.2f MB no fio, %.2f MB decodificados (compressão %.1fx; %s; %s)",
+            transfer["wire_bytes"] / 1e6,
+            transfer["decoded_bytes"] / 1e6,
+            transfer["compression_ratio"],
+            ", ".join(f"{k}={n}" for k, n in sorted(transfer["by_encoding"].items())),
+            ", ".join(f"{k}={n}" for k, n in sorted(transfer["by_http_version"].items())),
+        )
+    # Páginas do frontier que este worker desistiu de buscar (estado FAILED)
+    failed_pages = metrics.counters["frontier_failed"]
+    if frontier_counts:
+        logger.info(
+            "Frontier: %d concluídas, %d com falha, %d na fila, %d em andamento",
+            frontier_counts["done"],
+            frontier_counts["failed"],
+            frontier_counts["queued"],
+            frontier_counts["leased"],
+        )
+    if scheduler:
+        logger.info(
+            "Seeds: %d concluídas, %d com falha (%d páginas)",
+            scheduler.stats["done"],
+            scheduler.stats["failed"],
+            scheduler.stats["pages"],
+        )
+    if enricher:
+        logger.info(
+            "Detalhes: %d buscados, %d falhas, %d reaproveitados",
+            enricher.stats["fetched"],
+            enricher.stats["failed"],
+            enricher.stats["reused"],
+        )
+    if cache:
+        logger.info("Cache HTTP: %s", cache.summary())
+    if breaker and breaker.stats["opened"]:
+        logger.info(
+            "Circuit breaker: aberto %d vezes, %d requisições recusadas, %d sondas%s",
+            breaker.stats["opened"],
+            breaker.stats["rejected"],
+            breaker.stats["probes"],
+            f" (ainda aberto: {', '.join(breaker.open_hosts())})" if breaker.open_hosts() else "",
+        )
+    if retry_budget.denied:
+        logger.info("Retries negados pelo orçamento: %d", retry_budget.denied)
+    logger.info("Requisições: %d ok, %d com falha", statuses.get("ok", 0), error_count)
+    if error_count:
+        logger.info(
+            "Falhas por status: %s",
+            ", ".join(f"{k}={n}" for k, n in sorted(statuses.items()) if k != "ok"),
+        )
+    snapshot = metrics.snapshot()
+    stages = sorted(snapshot["stages"].items(), key=lambda kv: -kv[1]["seconds"])
+    for stage, st in stages:
+        logger.info("Estágio %-16s %8.2f s (%d chamadas)", stage, st["seconds"], st["calls"])
+    for host, d in snapshot["domains"].items():
+        lat = d["latency_s"]
+        logger.info(
+            "Latência %s: p50 %.0f ms, p95 %.0f ms, p99 %.0f ms (%d tentativas)",
+            host,
+            lat["p50"] * 1000,
+            lat["p95"] * 1000,
+            lat["p99"] * 1000,
+            d["requests"],
+        )
+    # Workers do frontier dividem a pasta de saída: um arquivo de métricas cada
+    metrics_name = METRICS_FILE if frontier is None else f"metrics-{worker_id}.json"
+    metrics_file = metrics.write_json(
+        output_dir / metrics_name,
+        items=total_items,
+        wall_s=elapsed,
+        connections=conn,
+        cache=dict(cache.stats) if cache else None,
+        enrich=dict(enricher.stats) if enricher else None,
+        seeds=dict(scheduler.stats) if scheduler else None,
+        frontier=frontier_counts,
+        breaker=dict(breaker.stats, open_hosts=breaker.open_hosts()) if breaker else None,
+        retry_budget_denied=retry_budget.denied,
+        delta=dict(delta, **fingerprints.stats) if delta is not None else None,
+    )
+    logger.info("Métricas: %s", metrics_file.resolve())
     logger.info("Log salvo em: %s", log_file.resolve())
 
-    if not all_items:
+    if delta is not None:
+        logger.info(
+            "Delta: %d adicionados, %d alterados, %d removidos "
+            "(%d páginas inalteradas, %d extraídas)",
+            delta["adicionado"],
+            delta["alterado"],
+            delta["removido"],
+            fingerprints.stats["unchanged"],
+            fingerprints.stats["changed"],
+        )
+        if not fingerprints.complete:
+            logger.info("Crawl parcial: remoções só são apuradas numa execução completa")
+        if delta_file:
+            logger.info("Delta salvo: %s", delta_file)
+        else:
+            logger.info("Nenhuma mudança desde a última execução")
+        log_store(writers, logger)
+        logger.info("=== Concluído ===")
+        return 0
+
+    if not total_items:
+        for label, writer in writers.items():
+            # A base acumula execuções anteriores: nunca é apagada
+            if label != "Base":
+                writer.path.unlink(missing_ok=True)
+        if frontier is not None:
+            # Os outros workers podem ter levado todas as páginas
+            logger.info("Nenhum item neste worker")
+            if failed_pages:
+                logger.error("%d páginas do frontier falharam em todas as tentativas", failed_pages)
+                return 1
+            return 0
         logger.warning("Nenhum item coletado. Verifique a URL e conectividade.")
         return 1
 
-    # Exportar CSV (sempre)
-    csv_path = export_csv(all_items, output_dir)
-    logger.info("CSV salvo: %s", csv_path)
-
-    if args.json:
-        json_path = export_json(all_items, output_dir)
-        logger.info("JSON salvo: %s", json_path)
-
-    if args.excel:
-        try:
-            excel_path = export_excel(all_items, output_dir)
-            logger.info("Excel salvo: %s", excel_path)
-        except ImportError as e:
-            logger.warning("Excel não exportado: %s", e)
+    for label, writer in writers.items():
+        logger.info("%s salvo: %s", label, writer.path)
+    log_store(writers, logger)
 
+    if failed_pages:
+        logger.error("%d páginas do frontier falharam em todas as tentativas", failed_pages)
+        return 1
     logger.info("=== Concluído ===")
     return 0
 
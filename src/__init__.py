@@ -1,27 +1,119 @@
 # -*- coding: utf-8 -*-
 """Web Scraping Premium - Módulos de coleta, parsing e exportação."""
 
-from .exporter import export_csv, export_excel, export_json
-from .fetcher import fetch_html, fetch_with_retry, get_random_headers, RequestBlocker
-from .parser import Item, extract_items, extract_items_books_toscrape
-from .paginator import get_next_page_url, paginate
+from .async_fetcher import AsyncFetcher
+from .cache import ResponseCache
+from .checkpoint import CrawlCheckpoint
+from .enricher import DetailEnricher, parse_detail_page
+from .exporter import (
+    ArrowWriter,
+    CsvWriter,
+    ExcelWriter,
+    ItemWriter,
+    JsonLinesWriter,
+    JsonWriter,
+    ParquetWriter,
+    export_arrow,
+    export_csv,
+    export_excel,
+    export_json,
+    export_jsonl,
+    export_parquet,
+    iter_jsonl_items,
+)
+from .dedup import BloomFilter, HashSet64, UrlSeenSet, normalize_url, url_hash
+from .fetcher import (
+    HttpClient,
+    RequestBlocker,
+    fetch_html,
+    fetch_with_retry,
+    get_random_headers,
+)
+from .http2 import Http2Adapter
+from .item import FIELDNAMES, item_values
+from .metrics import RunMetrics, serve_metrics
+from .fingerprint import FingerprintStore, PageFingerprinter
+from .frontier import MemoryFrontier, RedisFrontier, SqliteFrontier, open_frontier
+from .parser import Item, ItemBatch, extract_items, extract_items_books_toscrape, parse_html
+from .pipeline import ParsePool
+from .ratelimit import RateLimiter
+from .retry import CircuitBreaker, RetryBudget, is_retryable
+from .scheduler import CrawlScheduler, read_seed_file
+from .store import ItemStore, StoreWriter
+from .streaming import BooksStreamExtractor, StreamedPage, StreamReader
+from .schema import compile_schema, extract_with_schema, get_extractor, load_schema
+from .paginator import FetchError, get_next_page_url, iter_frontier, iter_pages, paginate
 from .utils import normalize_text, parse_price, parse_rating, setup_logging
 
 __all__ = [
+    "ArrowWriter",
+    "AsyncFetcher",
+    "BloomFilter",
+    "BooksStreamExtractor",
+    "CircuitBreaker",
+    "CrawlCheckpoint",
+    "CrawlScheduler",
+    "CsvWriter",
+    "DetailEnricher",
+    "ExcelWriter",
+    "FIELDNAMES",
+    "FetchError",
+    "FingerprintStore",
+    "HashSet64",
+    "Http2Adapter",
+    "HttpClient",
     "Item",
+    "ItemStore",
+    "ItemBatch",
+    "ItemWriter",
+    "JsonLinesWriter",
+    "JsonWriter",
+    "MemoryFrontier",
+    "PageFingerprinter",
+    "ParquetWriter",
+    "ParsePool",
+    "RateLimiter",
+    "RedisFrontier",
     "RequestBlocker",
+    "ResponseCache",
+    "RetryBudget",
+    "RunMetrics",
+    "SqliteFrontier",
+    "StoreWriter",
+    "StreamReader",
+    "StreamedPage",
+    "UrlSeenSet",
     "extract_items",
     "extract_items_books_toscrape",
+    "extract_with_schema",
+    "compile_schema",
+    "export_arrow",
     "export_csv",
     "export_excel",
     "export_json",
+    "export_jsonl",
+    "export_parquet",
     "fetch_html",
     "fetch_with_retry",
+    "get_extractor",
     "get_next_page_url",
     "get_random_headers",
+    "is_retryable",
+    "item_values",
+    "iter_frontier",
+    "iter_jsonl_items",
+    "iter_pages",
+    "load_schema",
     "normalize_text",
+    "normalize_url",
+    "open_frontier",
     "paginate",
+    "parse_detail_page",
+    "parse_html",
     "parse_price",
     "parse_rating",
+    "read_seed_file",
+    "serve_metrics",
     "setup_logging",
+    "url_hash",
 ]
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""Módulo de requisições concorrentes: asyncio com limite global e por host."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+
+from .cache import ResponseCache
+from .fetcher import (
+    MAX_RETRY_AFTER,
+    HttpClient,
+    RequestBlocker,
+    _after_attempt,
+    _check_circuit,
+    _request,
+)
+from .metrics import RunMetrics
+from .ratelimit import RateLimiter, default_rate_limiter
+from .retry import CircuitBreaker, RetryBudget
+
+
+class AsyncFetcher:
+    """
+    Executa várias requisições em paralelo mantendo o contrato (html, status).
+
+    Cada GET roda em uma thread do executor (requests é bloqueante), enquanto o
+    asyncio controla quantas requisições ficam em voo: no máximo `concurrency`
+    no total e `per_host` para um mesmo host. Retry/backoff e rotação de
+    User-Agent seguem as mesmas regras de fetch_with_retry (inclusive o
+    orçamento de retries e o circuit breaker, se informados); o slot é liberado
+    durante o backoff e a espera do rate limiter para não travar outras URLs.
+    Com `reader` (ex.: streaming.StreamReader), cada corpo é lido em streaming
+    e o resultado do reader ocupa o lugar do html (sem cache).
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 10,
+        per_host: int = 4,
+        max_retries: int = 3,
+        base_delay: float = 1.0,
+        timeout: int = 15,
+        blocker: RequestBlocker | None = None,
+        session: requests.Session | None = None,
+        rate_limiter: RateLimiter | None = None,
+        cache: ResponseCache | None = None,
+        logger=None,
+        metrics: RunMetrics | None = None,
+        retry_budget: RetryBudget | None = None,
+        breaker: CircuitBreaker | None = None,
+        max_retry_after: float = MAX_RETRY_AFTER,
+        reader=None,
+    ):
+        if concurrency < 1 or per_host < 1:
+            raise ValueError("concurrency e per_host devem ser >= 1")
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.timeout = timeout
+        self.blocker = blocker or RequestBlocker()
+        # Sem sessão externa: pool próprio dimensionado para per_host conexões
+        self._client = None if session else HttpClient(pool_maxsize=per_host)
+        self.session = session or self._client.session
+        self.rate_limiter = rate_limiter or default_rate_limiter
+        self.reader = reader
+        # O cache guarda o HTML inteiro, que o streaming não retém
+        self.cache = cache if reader is None else None
+        self.logger = logger
+        self.metrics = metrics
+        self.retry_budget = retry_budget
+        self.breaker = breaker
+        self.max_retry_after = max_retry_after
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._global: asyncio.Semaphore | None = None
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+
+    def _limits(self, host: str) -> tuple[asyncio.Semaphore, asyncio.Semaphore]:
+        # Semáforos ficam presos ao event loop: recria se mudou (ex.: novo asyncio.run)
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._global = asyncio.Semaphore(self.concurrency)
+            self._hosts = {}
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return self._global, self._hosts[host]
+
+    async def fetch(self, url: str) -> tuple[str | None, str]:
+        """Versão assíncrona de fetch_with_retry. Retorna (html, status)."""
+        loop = asyncio.get_running_loop()
+        global_sem, host_sem = self._limits(urlparse(url).netloc)
+
+        cached = None
+        if self.cache is not None:
+            cached, fresh = await loop.run_in_executor(self._executor, self.cache.lookup, url)
+            if fresh:
+                if self.metrics is not None:
+                    self.metrics.count("cache_hits")
+                return cached.body, "ok"
+
+        wait = self.blocker.remaining(url)
+        if wait > 0:
+            if self.logger:
+                self.logger.debug("URL bloqueada (duplicada): %s", url)
+            await asyncio.sleep(wait)
+            if self.metrics is not None:
+                self.metrics.add_time("dedup_wait", wait)
+
+        last_status = "erro"
+        if self.retry_budget is not None:
+            self.retry_budget.on_request(url)
+        for attempt in range(self.max_retries):
+            if not _check_circuit(self.breaker, url, self.logger, self.metrics):
+                last_status = "circuit_open"
+                break
+            started = loop.time()
+            await self.rate_limiter.acquire_async(url)
+            if self.metrics is not None:
+                self.metrics.add_time("rate_limit_wait", loop.time() - started)
+            async with global_sem, host_sem:
+                html, status, response = await loop.run_in_executor(
+                    self._executor,
+                    _request,
+                    url,
+                    self.timeout,
+                    self.session,
+                    self.logger,
+                    self.cache,
+                    cached,
+                    self.metrics,
+                    self.reader,
+                )
+            delay = _after_attempt(
+                url,
+                status,
+                response,
+                attempt,
+                self.max_retries,
+                self.base_delay,
+                self.rate_limiter,
+                self.retry_budget,
+                self.breaker,
+                self.max_retry_after,
+                self.logger,
+                self.metrics,
+            )
+
+            if status == "ok" and html:
+                self.blocker.register(url)
+                return html, "ok"
+
+            last_status = status
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+            if self.metrics is not None:
+                self.metrics.count("retries")
+                self.metrics.add_time("retry_backoff", delay)
+
+        return None, last_status if last_status != "ok" else "retry"
+
+    async def fetch_many(self, urls: list[str]) -> list[tuple[str | None, str]]:
+        """Busca todas as URLs em paralelo; resultados na mesma ordem da entrada."""
+        return await asyncio.gather(*(self.fetch(u) for u in urls))
+
+    def fetch_all(self, urls: list[str]) -> list[tuple[str | None, str]]:
+        """Atalho síncrono para fetch_many (cria e fecha um event loop)."""
+        return asyncio.run(self.fetch_many(list(urls)))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        if self._client:
+            self._client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
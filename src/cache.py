@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""Módulo de cache HTTP em disco: TTL, revalidação condicional (ETag/Last-Modified) e LRU."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass
+class CacheEntry:
+    """Resposta armazenada em cache."""
+
+    url: str
+    body: str
+    stored_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class ResponseCache:
+    """
+    Cache de respostas em disco (um arquivo JSON por URL).
+
+    - Entradas com menos de `ttl` segundos são servidas sem tocar a rede.
+    - Entradas vencidas são revalidadas com If-None-Match/If-Modified-Since;
+      um 304 conta como acerto e renova a entrada.
+    - Quando o total passa de `max_bytes`, as menos usadas recentemente são
+      removidas (a ordem de uso sobrevive entre execuções via mtime).
+    """
+
+    def __init__(self, directory: Path, ttl: float = 3600, max_bytes: int = 500 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0}
+        self._lock = threading.Lock()
+        self._index: OrderedDict[str, int] = OrderedDict()
+        self._size = 0
+        files = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            size = path.stat().st_size
+            self._index[path.stem] = size
+            self._size += size
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, url: str) -> CacheEntry | None:
+        """Lê a entrada (fresca ou não) e marca como usada recentemente."""
+        key = self._key(url)
+        path = self._path(key)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            if key in self._index:
+                self._index.move_to_end(key)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return CacheEntry(**data)
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return (time.time() - entry.stored_at) < self.ttl
+
+    def lookup(self, url: str) -> tuple[CacheEntry | None, bool]:
+        """Retorna (entrada, fresca). Conta acerto quando fresca."""
+        entry = self.get(url)
+        fresh = entry is not None and self.is_fresh(entry)
+        if fresh:
+            with self._lock:
+                self.stats["hits"] += 1
+        return entry, fresh
+
+    @staticmethod
+    def conditional_headers(entry: CacheEntry | None) -> dict[str, str]:
+        """Headers de revalidação para uma entrada vencida."""
+        headers: dict[str, str] = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(self, url: str, body: str, etag: str | None = None, last_modified: str | None = None):
+        """Grava resposta nova (miss) e aplica o limite de tamanho."""
+        entry = CacheEntry(url, body, time.time(), etag, last_modified)
+        self._save(entry)
+        with self._lock:
+            self.stats["misses"] += 1
+
+    def revalidate(self, entry: CacheEntry) -> None:
+        """Servidor respondeu 304: renova a entrada e conta como acerto."""
+        entry.stored_at = time.time()
+        self._save(entry)
+        with self._lock:
+            self.stats["revalidated"] += 1
+
+    def _save(self, entry: CacheEntry) -> None:
+        key = self._key(entry.url)
+        path = self._path(key)
+        payload = json.dumps(entry.__dict__, ensure_ascii=False)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        os.replace(tmp, path)
+        size = path.stat().st_size
+        with self._lock:
+            self._size += size - self._index.pop(key, 0)
+            self._index[key] = size
+            while self._size > self.max_bytes and len(self._index) > 1:
+                old_key, old_size = self._index.popitem(last=False)
+                self._size -= old_size
+                self._path(old_key).unlink(missing_ok=True)
+
+    def summary(self) -> str:
+        s = self.stats
+        return "%d acertos (%d revalidados via 304), %d misses" % (
+            s["hits"] + s["revalidated"],
+            s["revalidated"],
+            s["misses"],
+        )
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""Módulo de checkpoint: retomada de crawl após falha (SQLite no diretório de saída)."""
+
+import json
+import sqlite3
+from pathlib import Path
+
+from .item import FIELDNAMES, Item, item_values
+
+CHECKPOINT_FILE = "checkpoint.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS visited (url TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    page_url TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+"""
+
+
+class CrawlCheckpoint:
+    """
+    Registra, a cada página, a URL visitada, os itens emitidos e a próxima
+    URL pendente — tudo na mesma transação, então o estado em disco é sempre
+    consistente. Com ele, uma execução interrompida continua exatamente de
+    onde parou, sem buscar de novo as páginas já concluídas.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @classmethod
+    def in_dir(cls, output_dir: Path) -> "CrawlCheckpoint":
+        return cls(Path(output_dir) / CHECKPOINT_FILE)
+
+    def _get(self, key: str) -> str | None:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key: str, value: str | None) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def reset(self, start_url: str) -> None:
+        """Descarta o estado anterior e inicia um crawl novo a partir de start_url."""
+        with self._conn:
+            self._conn.execute("DELETE FROM meta")
+            self._conn.execute("DELETE FROM visited")
+            self._conn.execute("DELETE FROM items")
+            self._set("start_url", start_url)
+            self._set("pending", start_url)
+
+    @property
+    def start_url(self) -> str | None:
+        return self._get("start_url")
+
+    @property
+    def pending(self) -> str | None:
+        """Próxima URL a processar; None quando o crawl terminou."""
+        return self._get("pending")
+
+    def visited(self) -> set[str]:
+        return {row[0] for row in self._conn.execute("SELECT url FROM visited")}
+
+    def item_count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def record_page(self, url: str, items: list[Item], next_url: str | None) -> None:
+        """Marca a página como concluída, guarda os itens e avança a pendente."""
+        rows = [
+            (url, json.dumps(item_values(item), ensure_ascii=False))
+            for item in items
+        ]
+        with self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO visited (url) VALUES (?)", (url,))
+            self._conn.executemany("INSERT INTO items (page_url, data) VALUES (?, ?)", rows)
+            self._set("pending", next_url)
+
+    def iter_items(self):
+        """Itens já emitidos, na ordem em que foram coletados."""
+        for (data,) in self._conn.execute("SELECT data FROM items ORDER BY id"):
+            yield Item(**dict(zip(FIELDNAMES, json.loads(data))))
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""Módulo de deduplicação de URLs: normalização, hashes compactos e Bloom filter."""
+
+import math
+import threading
+from array import array
+from hashlib import blake2b
+from urllib.parse import urlsplit, urlunsplit
+
+_DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Forma canônica para comparação: esquema e host em minúsculas, sem porta
+    padrão, sem fragmento (#...), parâmetros da query em ordem e caminho
+    vazio como "/". O caminho e a codificação dos parâmetros não mudam.
+    """
+    scheme, netloc, path, query, _fragment = urlsplit(url.strip())
+    scheme = scheme.lower()
+    if "@" in netloc or "[" in netloc:
+        # Usuário ou IPv6: caminho lento, com o parsing completo do netloc
+        parts = urlsplit(f"//{netloc}")
+        host = (parts.hostname or "").lower()
+        if ":" in host:
+            host = f"[{host}]"
+        if parts.port is not None and str(parts.port) != _DEFAULT_PORTS.get(scheme):
+            host = f"{host}:{parts.port}"
+        if parts.username:
+            host = f"{parts.username}@{host}"
+        netloc = host
+    else:
+        netloc = netloc.lower()
+        default = _DEFAULT_PORTS.get(scheme)
+        if default and netloc.endswith(f":{default}"):
+            netloc = netloc[: -len(default) - 1]
+    if "&" in query:
+        query = "&".join(sorted(query.split("&")))
+    return urlunsplit((scheme, netloc, path or "/", query, ""))
+
+
+def url_hash(url: str) -> int:
+    """Hash estável de 64 bits da URL normalizada (8 bytes no lugar da string)."""
+    digest = blake2b(normalize_url(url).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class BloomFilter:
+    """
+    Bloom filter em bytearray: memória fixa para `capacity` itens com taxa
+    de falso positivo `error_rate`. Nunca dá falso negativo; acima da
+    capacidade a taxa de falso positivo sobe gradualmente.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError("capacity deve ser >= 1 e 0 < error_rate < 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.num_hashes = max(round(self.num_bits / capacity * math.log(2)), 1)
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        # Double hashing (Kirsch-Mitzenmacher): k posições a partir de 2 hashes
+        digest = blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def add(self, key: str) -> bool:
+        """Adiciona; retorna True se a chave (provavelmente) já estava presente."""
+        present = True
+        bits = self._bits
+        for pos in self._positions(key):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                present = False
+                bits[byte] |= mask
+        if not present:
+            self.count += 1
+        return present
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+
+class HashSet64:
+    """
+    Conjunto de inteiros de 64 bits em array('Q') com endereçamento aberto
+    (sondagem linear): 8 bytes por posição, em vez de um objeto int de 32
+    bytes mais a entrada de um set por elemento. Cresce ao passar de 2/3
+    de ocupação. O valor 0 marca posição vazia e é guardado à parte.
+    Não é thread-safe sozinho (UrlSeenSet protege leituras e escritas).
+    """
+
+    def __init__(self, initial: int = 1024):
+        size = 8
+        while size * 2 < initial * 3:
+            size *= 2
+        self._slots = array("Q", bytes(8 * size))
+        self._mask = size - 1
+        self._count = 0
+        self._has_zero = False
+
+    def _find(self, value: int) -> int:
+        slots, mask = self._slots, self._mask
+        i = value & mask
+        while slots[i] and slots[i] != value:
+            i = (i + 1) & mask
+        return i
+
+    def add(self, value: int) -> bool:
+        """Adiciona; retorna True se o valor já estava presente."""
+        if not value:
+            present, self._has_zero = self._has_zero, True
+            self._count += not present
+            return present
+        i = self._find(value)
+        if self._slots[i]:
+            return True
+        self._slots[i] = value
+        self._count += 1
+        if self._count * 3 > len(self._slots) * 2:
+            self._grow()
+        return False
+
+    def _grow(self) -> None:
+        # A tabela nova é preenchida antes da troca: quem lê nunca a vê vazia
+        slots = array("Q", bytes(16 * len(self._slots)))
+        mask = len(slots) - 1
+        for value in self._slots:
+            if value:
+                i = value & mask
+                while slots[i]:
+                    i = (i + 1) & mask
+                slots[i] = value
+        self._slots, self._mask = slots, mask
+
+    def __contains__(self, value: int) -> bool:
+        if not value:
+            return self._has_zero
+        return self._slots[self._find(value)] != 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._slots) * 8
+
+
+class UrlSeenSet:
+    """
+    Conjunto de URLs visitadas com memória limitada, compatível com o uso
+    de `set` no crawl (in, add, update, len).
+
+    - Padrão: guarda o hash de 64 bits da URL normalizada num HashSet64
+      (8 a 24 bytes por URL, em vez da string inteira).
+    - Com `capacity`: Bloom filter de tamanho fixo com `error_rate` de falso
+      positivo (uma URL nova pode, raramente, ser tratada como já vista).
+    Thread-safe (compartilhado entre seeds no modo multi-seed).
+    """
+
+    def __init__(self, urls=(), capacity: int | None = None, error_rate: float = 0.001):
+        self._lock = threading.Lock()
+        self._bloom = BloomFilter(capacity, error_rate) if capacity else None
+        self._hashes = HashSet64()
+        self.update(urls)
+
+    def __contains__(self, url: str) -> bool:
+        if self._bloom is not None:
+            key = normalize_url(url)
+            with self._lock:
+                return key in self._bloom
+        h = url_hash(url)
+        with self._lock:
+            return h in self._hashes
+
+    def add(self, url: str) -> None:
+        if self._bloom is not None:
+            key = normalize_url(url)
+            with self._lock:
+                self._bloom.add(key)
+        else:
+            h = url_hash(url)
+            with self._lock:
+                self._hashes.add(h)
+
+    def update(self, urls) -> None:
+        for url in urls:
+            self.add(url)
+
+    def __len__(self) -> int:
+        return len(self._bloom) if self._bloom is not None else len(self._hashes)
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""Módulo de documento: parse único do HTML com BeautifulSoup (lxml quando instalado)."""
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401
+
+    DEFAULT_PARSER = "lxml"
+except ImportError:
+    DEFAULT_PARSER = "html.parser"
+
+
+def parse_html(html: str, backend: str | None = None) -> BeautifulSoup:
+    """
+    Faz o parse do HTML uma única vez.
+    backend: 'lxml' (mais rápido, se instalado), 'html.parser' ou None (auto).
+    """
+    backend = backend or DEFAULT_PARSER
+    if backend == "lxml" and DEFAULT_PARSER != "lxml":
+        raise ImportError("Para usar o parser lxml, instale: pip install lxml")
+    return BeautifulSoup(html, backend)
+
+
+def as_soup(doc: str | BeautifulSoup) -> BeautifulSoup:
+    """Aceita HTML bruto ou documento já parseado (evita parse duplicado)."""
+    return doc if isinstance(doc, BeautifulSoup) else parse_html(doc)
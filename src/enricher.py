@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""Módulo de enriquecimento: completa os itens com dados da página de detalhe."""
+
+import re
+from collections import OrderedDict
+
+from bs4 import BeautifulSoup
+
+from .parser import Item, as_soup
+from .utils import normalize_text
+
+# Detalhes mantidos para links repetidos entre páginas (LRU); produtos
+# recorrentes costumam reaparecer em páginas próximas da listagem
+DETAIL_CACHE_SIZE = 4096
+
+STOCK_RE = re.compile(r"\((\d+)\s+(?:available|dispon[ií]ve(?:l|is))\)", re.IGNORECASE)
+
+
+def parse_detail_page(html: str | BeautifulSoup) -> dict:
+    """
+    Extrai categoria, descrição, UPC e estoque da página de detalhe
+    (layout Books to Scrape). Campos ausentes não entram no dicionário.
+    """
+    soup = as_soup(html)
+    details: dict = {}
+
+    # Categoria: último link do breadcrumb (o item ativo não tem link)
+    crumbs = soup.select("ul.breadcrumb li a")
+    if len(crumbs) >= 2:
+        details["categoria"] = normalize_text(crumbs[-1].get_text())
+
+    desc_el = soup.select_one("#product_description + p") or soup.select_one(
+        'meta[name="description"]'
+    )
+    if desc_el:
+        text = desc_el.get("content") if desc_el.name == "meta" else desc_el.get_text()
+        descricao = normalize_text(text)
+        if descricao:
+            details["descricao"] = descricao
+
+    for row in soup.select("table tr"):
+        th, td = row.find("th"), row.find("td")
+        if not th or not td:
+            continue
+        label = normalize_text(th.get_text()).lower()
+        value = normalize_text(td.get_text())
+        if label == "upc":
+            details["upc"] = value
+        elif label == "availability":
+            match = STOCK_RE.search(value)
+            if match:
+                details["estoque"] = int(match.group(1))
+
+    if "estoque" not in details:
+        avail_el = soup.select_one(".instock.availability")
+        match = STOCK_RE.search(avail_el.get_text()) if avail_el else None
+        if match:
+            details["estoque"] = int(match.group(1))
+
+    return details
+
+
+class DetailEnricher:
+    """
+    Busca as páginas de detalhe (campo `link`) em paralelo e preenche
+    categoria, descrição, UPC e estoque dos itens.
+
+    `fetch_many_fn(urls) -> [(html, status)]` define a concorrência — use
+    AsyncFetcher.fetch_all com a sessão do HttpClient para limitar os workers
+    e reaproveitar conexões. Links repetidos são buscados uma única vez no lote
+    e, entre páginas diferentes da listagem, enquanto estiverem entre os
+    `cache_size` detalhes usados mais recentemente.
+    """
+
+    def __init__(
+        self, fetch_many_fn, parse_fn=None, logger=None, cache_size: int = DETAIL_CACHE_SIZE
+    ):
+        self.fetch_many_fn = fetch_many_fn
+        self.parse_fn = parse_fn
+        self.logger = logger
+        self.cache_size = cache_size
+        self.stats = {"fetched": 0, "failed": 0, "reused": 0}
+        self._details: OrderedDict[str, dict | None] = OrderedDict()
+
+    def _remember(self, link: str, details: dict | None) -> None:
+        self._details[link] = details
+        if len(self._details) > self.cache_size:
+            self._details.popitem(last=False)
+
+    def enrich(self, items: list[Item]) -> list[Item]:
+        # Detalhes deste lote à parte: a remoção do LRU não pode afetá-lo
+        batch: dict[str, dict | None] = {}
+        todo = []
+        for link in dict.fromkeys(i.link for i in items if i.link):
+            if link in self._details:
+                self._details.move_to_end(link)
+                batch[link] = self._details[link]
+            else:
+                todo.append(link)
+        self.stats["reused"] += sum(1 for i in items if i.link) - len(todo)
+
+        if todo:
+            for link, (html, status) in zip(todo, self.fetch_many_fn(todo)):
+                if not html or status != "ok":
+                    self.stats["failed"] += 1
+                    details = None
+                    if self.logger:
+                        self.logger.warning("Detalhe não obtido: %s (status=%s)", link, status)
+                else:
+                    doc = self.parse_fn(html) if self.parse_fn else html
+                    details = parse_detail_page(doc)
+                    self.stats["fetched"] += 1
+                batch[link] = details
+                self._remember(link, details)
+
+        for item in items:
+            details = batch.get(item.link)
+            if details:
+                for field, value in details.items():
+                    setattr(item, field, value)
+        return items
@@ -1,81 +1,362 @@
 # -*- coding: utf-8 -*-
-"""Módulo de exportação: CSV, Excel, JSON."""
+"""Módulo de exportação: CSV, Excel, JSON, JSON Lines e Parquet/Arrow (também em streaming)."""
 
 import csv
 import json
+import math
 from datetime import datetime
+from functools import partial
+from json.encoder import encode_basestring
+from operator import attrgetter
 from pathlib import Path
 
-from .parser import Item
+from .item import FIELDNAMES, Item
 
+# Serialização JSON direto da tupla de valores, sem dict por item; mesmo
+# texto do json.dumps(..., ensure_ascii=False)
+def _json_float(value: float) -> str:
+    return float.__repr__(value) if math.isfinite(value) else json.dumps(value)
 
-def _item_to_row(item: Item) -> dict[str, str | float | None]:
-    """Converte Item para dicionário flat."""
-    return {
-        "nome": item.nome,
-        "preco": item.preco,
-        "categoria": item.categoria,
-        "descricao": item.descricao,
-        "disponibilidade": item.disponibilidade,
-        "rating": item.rating,
-        "link": item.link,
-    }
 
+_JSON_SCALARS = {
+    str: encode_basestring,
+    float: _json_float,
+    int: int.__repr__,
+    type(None): lambda _value: "null",
+}
+_json_default = partial(json.dumps, ensure_ascii=False)
 
-def export_csv(items: list[Item], output_dir: Path) -> Path:
-    """Exporta para CSV. Nome: scraped_YYYYMMDD_HHMMSS.csv"""
+
+def _output_path(output_dir: Path, extension: str) -> Path:
+    """Cria a pasta de saída e retorna scraped_YYYYMMDD_HHMMSS.<extension>."""
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    path = output_dir / f"scraped_{timestamp}.csv"
-
-    if not items:
-        with open(path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["nome", "preco", "categoria", "descricao", "disponibilidade", "rating", "link"])
-        return path
-
-    fieldnames = list(_item_to_row(items[0]).keys())
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
+    return output_dir / f"scraped_{timestamp}.{extension}"
+
+
+class ItemWriter:
+    """
+    Writer incremental: abre o arquivo uma vez, recebe itens conforme chegam
+    do crawl, faz flush a cada `flush_every` itens e fecha ao final.
+    `fields` escolhe as colunas, na ordem de FIELDNAMES (default: todas).
+    Use como context manager ou chame close() explicitamente.
+    """
+
+    extension = ""
+    default_flush_every = 100
+
+    def __init__(self, path: Path, flush_every: int | None = None, fields=None):
+        unknown = set(fields or ()) - set(FIELDNAMES)
+        if unknown:
+            raise ValueError(f"Campos desconhecidos: {sorted(unknown)}")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_every = flush_every or self.default_flush_every
+        self.fields = [name for name in FIELDNAMES if name in fields] if fields else FIELDNAMES
+        self._values = attrgetter(*self.fields)
+        self._json_keys = [encode_basestring(name) + ": " for name in self.fields]
+        self.count = 0
+        self._pending = 0
+        self._closed = False
+        self._open()
+
+    @classmethod
+    def in_dir(cls, output_dir: Path, flush_every: int | None = None, fields=None) -> "ItemWriter":
+        """Cria o writer em output_dir com o nome padrão timestampado."""
+        return cls(_output_path(output_dir, cls.extension), flush_every=flush_every, fields=fields)
+
+    def _json_members(self, item: Item) -> list[str]:
+        """'"campo": valor' de cada coluna, serializados direto da tupla de valores."""
+        return [
+            key + _JSON_SCALARS.get(type(value), _json_default)(value)
+            for key, value in zip(self._json_keys, self._values(item))
+        ]
+
+    def write(self, item: Item) -> None:
+        self._write(item)
+        self.count += 1
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    def write_many(self, items) -> None:
         for item in items:
-            row = _item_to_row(item)
-            for k, v in row.items():
-                if v is None:
-                    row[k] = ""
-            writer.writerow(row)
+            self.write(item)
+
+    def flush(self) -> None:
+        self._flush()
+        self._pending = 0
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # Implementados pelas subclasses
+    def _open(self) -> None:
+        raise NotImplementedError
+
+    def _write(self, item: Item) -> None:
+        raise NotImplementedError
+
+    def _flush(self) -> None:
+        pass
+
+    def _close(self) -> None:
+        pass
+
+
+class CsvWriter(ItemWriter):
+    """CSV com cabeçalho fixo; None vira célula vazia."""
+
+    extension = "csv"
+
+    def _open(self) -> None:
+        self._file = open(self.path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.fields)
+
+    def _write(self, item: Item) -> None:
+        self._writer.writerow(["" if v is None else v for v in self._values(item)])
+
+    def _flush(self) -> None:
+        self._file.flush()
+
+    def _close(self) -> None:
+        self._file.close()
+
+
+class JsonWriter(ItemWriter):
+    """Array JSON (indent=2) escrito item a item, idêntico ao json.dump da lista."""
+
+    extension = "json"
+
+    def _open(self) -> None:
+        self._file = open(self.path, "w", encoding="utf-8")
+
+    def _write(self, item: Item) -> None:
+        # Mesmo layout do json.dump(indent=2) da lista inteira
+        block = "  {\n    " + ",\n    ".join(self._json_members(item)) + "\n  }"
+        self._file.write(("[\n" if self.count == 0 else ",\n") + block)
+
+    def _flush(self) -> None:
+        self._file.flush()
+
+    def _close(self) -> None:
+        self._file.write("[]" if self.count == 0 else "\n]")
+        self._file.close()
+
+
+class JsonLinesWriter(ItemWriter):
+    """JSON Lines: um objeto por linha, ideal para streaming e append."""
+
+    extension = "jsonl"
+
+    def _open(self) -> None:
+        self._file = open(self.path, "w", encoding="utf-8")
+
+    def _write(self, item: Item) -> None:
+        self._file.write("{" + ", ".join(self._json_members(item)) + "}\n")
+
+    def _flush(self) -> None:
+        self._file.flush()
+
+    def _close(self) -> None:
+        self._file.close()
+
+
+class ExcelWriter(ItemWriter):
+    """Excel via openpyxl em modo write-only (linhas não ficam em memória)."""
+
+    extension = "xlsx"
 
-    return path
+    def _open(self) -> None:
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise ImportError("Para exportar Excel, instale: pip install openpyxl")
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet("Sheet1")
+        self._sheet.append(self.fields)
 
+    def _write(self, item: Item) -> None:
+        self._sheet.append(self._values(item))
 
-def export_json(items: list[Item], output_dir: Path) -> Path:
+    def _close(self) -> None:
+        self._workbook.save(self.path)
+
+
+def _arrow_schema(fields=FIELDNAMES):
+    """Schema tipado derivado de Item (preço float64, rating int8, categorias em dicionário)."""
+    import pyarrow as pa
+
+    categorical = pa.dictionary(pa.int32(), pa.string())
+    schema = pa.schema(
+        [
+            ("nome", pa.string()),
+            ("preco", pa.float64()),
+            ("categoria", categorical),
+            ("descricao", pa.string()),
+            ("disponibilidade", categorical),
+            ("rating", pa.int8()),
+            ("link", pa.string()),
+            ("upc", pa.string()),
+            ("estoque", pa.int32()),
+        ]
+    )
+    return pa.schema([schema.field(name) for name in fields])
+
+
+class _ArrowBatchWriter(ItemWriter):
+    """
+    Base colunar: acumula itens em colunas e grava um record batch a cada
+    `flush_every` itens (um row group no Parquet), com schema fixo.
+
+    As colunas em dicionário usam um dicionário único por arquivo, que só
+    cresce: cada valor mantém o seu índice em todos os batches (o Arrow IPC
+    não aceita trocar o dicionário no meio do arquivo, só acrescentar).
+    """
+
+    default_flush_every = 10_000
+
+    def _open(self) -> None:
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("Para exportar Parquet/Arrow, instale: pip install pyarrow")
+        self._pa = pa
+        self._schema = _arrow_schema(self.fields)
+        self._reset_columns()
+        self._dictionaries: dict[str, dict[str, int]] = {
+            field.name: {} for field in self._schema if pa.types.is_dictionary(field.type)
+        }
+        self._open_sink()
+
+    def _reset_columns(self) -> None:
+        self._columns: dict[str, list] = {name: [] for name in self.fields}
+        self._column_lists = list(self._columns.values())
+
+    def _write(self, item: Item) -> None:
+        for column, value in zip(self._column_lists, self._values(item)):
+            column.append(value)
+
+    def _flush(self) -> None:
+        if not self._column_lists[0]:
+            return
+        pa = self._pa
+        arrays = [self._array(field) for field in self._schema]
+        self._write_batch(pa.record_batch(arrays, schema=self._schema))
+        self._reset_columns()
+
+    def _array(self, field):
+        pa = self._pa
+        values = self._columns[field.name]
+        if field.name == "rating":
+            values = [int(v) if v else None for v in values]
+        dictionary = self._dictionaries.get(field.name)
+        if dictionary is None:
+            return pa.array(values, type=field.type)
+        indices = [
+            None if value is None else dictionary.setdefault(value, len(dictionary))
+            for value in values
+        ]
+        return pa.DictionaryArray.from_arrays(
+            pa.array(indices, type=field.type.index_type),
+            pa.array(list(dictionary), type=field.type.value_type),
+        )
+
+    def _close(self) -> None:
+        self._flush()
+        self._sink.close()
+
+    def _open_sink(self) -> None:
+        raise NotImplementedError
+
+    def _write_batch(self, batch) -> None:
+        raise NotImplementedError
+
+
+class ParquetWriter(_ArrowBatchWriter):
+    """Parquet com row groups gravados em lote (compressão zstd)."""
+
+    extension = "parquet"
+
+    def _open_sink(self) -> None:
+        import pyarrow.parquet as pq
+
+        self._sink = pq.ParquetWriter(self.path, self._schema, compression="zstd")
+
+    def _write_batch(self, batch) -> None:
+        self._sink.write_batch(batch)
+
+
+class ArrowWriter(_ArrowBatchWriter):
+    """Arrow IPC (formato de arquivo), leitura zero-copy em pyarrow/polars."""
+
+    extension = "arrow"
+
+    def _open_sink(self) -> None:
+        # Valores novos de categoria/disponibilidade saem como delta do dicionário
+        options = self._pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+        self._sink = self._pa.ipc.new_file(str(self.path), self._schema, options=options)
+
+    def _write_batch(self, batch) -> None:
+        self._sink.write_batch(batch)
+
+
+def iter_jsonl_items(path: Path):
+    """Lê de volta um arquivo do JsonLinesWriter (ex.: shards de workers)."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield Item(**json.loads(line))
+
+
+def export_csv(items: list[Item], output_dir: Path, fields=None) -> Path:
+    """Exporta para CSV. Nome: scraped_YYYYMMDD_HHMMSS.csv"""
+    with CsvWriter.in_dir(output_dir, fields=fields) as writer:
+        writer.write_many(items)
+    return writer.path
+
+
+def export_json(items: list[Item], output_dir: Path, fields=None) -> Path:
     """Exporta para JSON."""
-    output_dir = Path(output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    path = output_dir / f"scraped_{timestamp}.json"
+    with JsonWriter.in_dir(output_dir, fields=fields) as writer:
+        writer.write_many(items)
+    return writer.path
 
-    data = [_item_to_row(item) for item in items]
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
 
-    return path
+def export_jsonl(items: list[Item], output_dir: Path, fields=None) -> Path:
+    """Exporta para JSON Lines (um item por linha)."""
+    with JsonLinesWriter.in_dir(output_dir, fields=fields) as writer:
+        writer.write_many(items)
+    return writer.path
 
 
-def export_excel(items: list[Item], output_dir: Path) -> Path:
+def export_excel(items: list[Item], output_dir: Path, fields=None) -> Path:
     """Exporta para Excel (requer openpyxl)."""
-    try:
-        import pandas as pd
-    except ImportError:
-        raise ImportError("Para exportar Excel, instale: pip install pandas openpyxl")
+    with ExcelWriter.in_dir(output_dir, fields=fields) as writer:
+        writer.write_many(items)
+    return writer.path
+
+
+def export_parquet(items: list[Item], output_dir: Path, fields=None) -> Path:
+    """Exporta para Parquet com schema tipado (requer pyarrow)."""
+    with ParquetWriter.in_dir(output_dir, fields=fields) as writer:
+        writer.write_many(items)
+    return writer.path
 
-    output_dir = Path(output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    path = output_dir / f"scraped_{timestamp}.xlsx"
 
-    data = [_item_to_row(item) for item in items]
-    df = pd.DataFrame(data)
-    df.to_excel(path, index=False, engine="openpyxl")
-    return path
+def export_arrow(items: list[Item], output_dir: Path, fields=None) -> Path:
+    """Exporta para Arrow IPC com schema tipado (requer pyarrow)."""
+    with ArrowWriter.in_dir(output_dir, fields=fields) as writer:
+        writer.write_many(items)
+    return writer.path
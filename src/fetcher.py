@@ -2,30 +2,181 @@
 """Módulo de requisições HTTP: headers, retry, fallback, rotação de User-Agent."""
 
 import random
+import threading
 import time
+from collections import OrderedDict
+from urllib.parse import urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import Timeout, ConnectionError as ReqConnectionError
-from requests.exceptions import HTTPError
+from requests.exceptions import ChunkedEncodingError, HTTPError
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 
+from .cache import CacheEntry, ResponseCache
+from .dedup import url_hash
+from .metrics import RunMetrics, timed
+from .ratelimit import RateLimiter, default_rate_limiter, parse_retry_after
+from .retry import CircuitBreaker, RetryBudget, is_host_failure, is_retryable
 from .utils import DEFAULT_HEADERS, USER_AGENTS, might_be_captcha
 
 
 class RequestBlocker:
-    """Evita requisições duplicadas para a mesma URL em curto período."""
+    """
+    Evita requisições duplicadas para a mesma URL em curto período.
+
+    Guarda o hash da URL normalizada em ordem de registro; entradas mais
+    velhas que o cooldown saem pela frente a cada registro, então a memória
+    acompanha só as URLs dos últimos `cooldown` segundos.
+    """
 
     def __init__(self, cooldown_seconds: float = 2.0):
-        self._last: dict[str, float] = {}
+        self._last: OrderedDict[int, float] = OrderedDict()
+        self._lock = threading.Lock()
         self.cooldown = cooldown_seconds
 
     def is_blocked(self, url: str) -> bool:
-        now = time.time()
-        if url in self._last and (now - self._last[url]) < self.cooldown:
-            return True
-        return False
+        return self.remaining(url) > 0
+
+    def remaining(self, url: str) -> float:
+        """Segundos que faltam para a URL sair do cooldown (0 se liberada)."""
+        with self._lock:
+            last = self._last.get(url_hash(url))
+        if last is None:
+            return 0.0
+        return max(self.cooldown - (time.monotonic() - last), 0.0)
 
     def register(self, url: str) -> None:
-        self._last[url] = time.time()
+        key = url_hash(url)
+        now = time.monotonic()
+        with self._lock:
+            self._last[key] = now
+            self._last.move_to_end(key)
+            # Expira em ordem de tempo: a mais antiga está sempre na frente
+            while self._last:
+                oldest_key, oldest = next(iter(self._last.items()))
+                if now - oldest < self.cooldown:
+                    break
+                del self._last[oldest_key]
+
+    def __len__(self) -> int:
+        return len(self._last)
+
+
+# Segundos gastos abrindo conexões (DNS + TCP + TLS) na requisição corrente da thread
+_connect_clock = threading.local()
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_clock.seconds = getattr(_connect_clock, "seconds", 0.0) + (
+                time.perf_counter() - start
+            )
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    connect = _TimedHTTPConnection.connect
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class HttpClient:
+    """
+    Sessão HTTP de longa duração com pool de conexões por host.
+
+    Deve ser criada uma vez por execução (CLI) e compartilhada entre as
+    requisições, para que o keep-alive reaproveite conexões TCP/TLS.
+    `pool_connections` é o número de hosts mantidos em cache e `pool_maxsize`
+    o máximo de conexões abertas por host.
+    Com `http2` ('alpn' ou 'h2c'), as requisições vão pelo httpx em HTTP/2
+    (http2.Http2Adapter): várias requisições em voo dividem uma conexão.
+    """
+
+    def __init__(
+        self, pool_connections: int = 10, pool_maxsize: int = 10, http2: str | None = None
+    ):
+        self.session = requests.Session()
+        self._adapters: list[HTTPAdapter] = []
+        self._closed_stats = {"opened": 0, "requests": 0}
+        self.http2 = http2
+        if http2:
+            from .http2 import Http2Adapter
+
+            # Um adapter para os dois esquemas: as conexões (e streams) são compartilhadas
+            adapter = Http2Adapter(http2, max_connections=pool_connections * pool_maxsize)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+            self._adapters.append(adapter)
+            return
+        for prefix in ("http://", "https://"):
+            adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+            # Pools descartados por LRU levam seus contadores; acumula antes de fechar
+            adapter.poolmanager.pools.dispose_func = self._dispose_pool
+            # Conexões cronometradas: separa o tempo de conexão nas métricas
+            adapter.poolmanager.pool_classes_by_scheme = {
+                "http": _TimedHTTPConnectionPool,
+                "https": _TimedHTTPSConnectionPool,
+            }
+            self.session.mount(prefix, adapter)
+            self._adapters.append(adapter)
+
+    def _dispose_pool(self, pool) -> None:
+        self._closed_stats["opened"] += pool.num_connections
+        self._closed_stats["requests"] += pool.num_requests
+        pool.close()
+
+    def connection_stats(self) -> dict[str, int]:
+        """Retorna conexões abertas, reutilizadas e total de requisições."""
+        opened = self._closed_stats["opened"]
+        total = self._closed_stats["requests"]
+        for adapter in self._adapters:
+            if not isinstance(adapter, HTTPAdapter):
+                stats = adapter.connection_stats()
+                opened += stats["opened"]
+                total += stats["requests"]
+                continue
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    opened += pool.num_connections
+                    total += pool.num_requests
+        return {"opened": opened, "reused": max(total - opened, 0), "requests": total}
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# Códigos HTTP em que o servidor pede para reduzir o ritmo
+THROTTLE_CODES = (429, 503)
+
+# Retry-After acima disso: desiste da URL em vez de segurar o worker
+MAX_RETRY_AFTER = 120.0
+
+# urllib3.HTTPResponse.version (e Http2Adapter) -> rótulo nas métricas
+HTTP_VERSIONS = {10: "HTTP/1.0", 11: "HTTP/1.1", 20: "HTTP/2"}
+
+
+def backoff_delay(attempt: int, base_delay: float) -> float:
+    """Delay exponencial com jitter para a tentativa `attempt` (0-based)."""
+    return base_delay * (2**attempt) + random.uniform(0, 1)
 
 
 def get_random_headers() -> dict[str, str]:
@@ -35,42 +186,216 @@ def get_random_headers() -> dict[str, str]:
     return h
 
 
-def fetch_html(
+def _request(
     url: str,
     timeout: int = 15,
     session: requests.Session | None = None,
     logger=None,
-) -> tuple[str | None, str]:
+    cache: ResponseCache | None = None,
+    cached: CacheEntry | None = None,
+    metrics: RunMetrics | None = None,
+    reader=None,
+) -> tuple[str | None, str, requests.Response | None]:
     """
-    Faz requisição GET e retorna (html, status).
-    status: 'ok', 'erro', 'timeout', 'connection_error', 'http_error', 'captcha'.
+    Igual a fetch_html, mas também retorna a Response (None se não houve).
+    Com `cache`, envia headers condicionais para `cached` (entrada vencida),
+    trata 304 como acerto e grava respostas novas.
+    Com `metrics`, registra a tentativa (status, código, latência e fases).
+    Com `reader(response, url) -> (resultado, status)`, o corpo é baixado em
+    streaming e lido pelo reader (ex.: streaming.StreamReader), sem cache.
     """
+    if metrics is None:
+        return _send(url, timeout, session, logger, cache, cached, reader)
+    _connect_clock.seconds = 0.0
+    start = time.perf_counter()
+    html, status, response = _send(url, timeout, session, logger, cache, cached, reader)
+    if response is not None:
+        wire, decoded = _body_sizes(response, html, streamed=reader is not None)
+        metrics.observe_transfer(
+            wire,
+            decoded,
+            encoding=response.headers.get("Content-Encoding") or "identity",
+            http_version=HTTP_VERSIONS.get(getattr(response.raw, "version", None)),
+        )
+    metrics.observe_request(
+        url,
+        status,
+        time.perf_counter() - start,
+        code=response.status_code if response is not None else None,
+        connect=_connect_clock.seconds,
+        ttfb=response.elapsed.total_seconds() if response is not None else None,
+    )
+    return html, status, response
+
+
+def _body_sizes(response: requests.Response, body, streamed: bool) -> tuple[int, int]:
+    """Bytes do corpo no fio (antes da descompressão) e decodificados."""
+    try:
+        wire = response.raw.tell()
+    except (AttributeError, OSError):
+        wire = 0
+    if streamed:
+        # Leitura em streaming: o reader contou o que decodificou
+        return wire, getattr(body, "bytes_read", 0)
+    return wire, len(response.content)
+
+
+def _send(
+    url: str,
+    timeout: int,
+    session: requests.Session | None,
+    logger,
+    cache: ResponseCache | None,
+    cached: CacheEntry | None,
+    reader=None,
+) -> tuple[str | None, str, requests.Response | None]:
     sess = session or requests.Session()
     headers = get_random_headers()
+    if cache is not None and reader is None:
+        headers.update(cache.conditional_headers(cached))
     try:
-        r = sess.get(url, headers=headers, timeout=timeout)
+        r = sess.get(url, headers=headers, timeout=timeout, stream=reader is not None)
         r.raise_for_status()
+        if reader is not None:
+            page, status = reader(r, url)
+            if status == "captcha" and logger:
+                logger.warning("Possível CAPTCHA detectado na página: %s", url)
+            return page, status, r
+        if r.status_code == 304 and cached is not None:
+            cache.revalidate(cached)
+            return cached.body, "ok", r
         html = r.text
         if might_be_captcha(html) and logger:
             logger.warning("Possível CAPTCHA detectado na página: %s", url)
-            return html, "captcha"
-        return html, "ok"
+            return html, "captcha", r
+        if cache is not None:
+            cache.store(url, html, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+        return html, "ok", r
     except Timeout:
         if logger:
             logger.warning("Timeout em %s", url)
-        return None, "timeout"
-    except ReqConnectionError:
+        return None, "timeout", None
+    except (ReqConnectionError, ChunkedEncodingError):
+        # ChunkedEncodingError: conexão caiu no meio do corpo
         if logger:
             logger.warning("Erro de conexão em %s", url)
-        return None, "connection_error"
+        return None, "connection_error", None
     except HTTPError as e:
+        if reader is not None and e.response is not None:
+            e.response.close()  # corpo de erro não lido (streaming)
         if logger:
-            logger.warning("HTTP %s em %s", e.response.status_code if e.response else "?", url)
-        return None, "http_error"
+            # Response 4xx/5xx é falsy: comparar com None, não pelo valor booleano
+            code = e.response.status_code if e.response is not None else "?"
+            logger.warning("HTTP %s em %s", code, url)
+        return None, "http_error", e.response
     except Exception as e:
         if logger:
             logger.exception("Erro inesperado em %s", url)
-        return None, "erro"
+        return None, "erro", None
+
+
+def fetch_html(
+    url: str,
+    timeout: int = 15,
+    session: requests.Session | None = None,
+    logger=None,
+) -> tuple[str | None, str]:
+    """
+    Faz requisição GET e retorna (html, status).
+    status: 'ok', 'erro', 'timeout', 'connection_error', 'http_error', 'captcha'.
+    """
+    html, status, _ = _request(url, timeout=timeout, session=session, logger=logger)
+    return html, status
+
+
+def _report_to_limiter(
+    limiter: RateLimiter,
+    url: str,
+    status: str,
+    response: requests.Response | None,
+    max_retry_after: float = MAX_RETRY_AFTER,
+) -> float | None:
+    """
+    Informa o limiter do resultado da tentativa; retorna Retry-After (s) se
+    houver. A pausa do domínio fica limitada a `max_retry_after`: acima
+    disso a URL é abandonada, mas as próximas do host não esperam o prazo todo.
+    """
+    if status == "ok":
+        limiter.on_success(url)
+        return None
+    if response is not None and response.status_code in THROTTLE_CODES:
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        pause = min(retry_after, max_retry_after) if retry_after is not None else None
+        limiter.on_throttle(url, pause)
+        return retry_after
+    return None
+
+
+def _check_circuit(breaker: CircuitBreaker | None, url: str, logger, metrics) -> bool:
+    """False (e registra) se o circuit breaker do host recusa a requisição agora."""
+    if breaker is None or breaker.allow(url):
+        return True
+    if logger:
+        logger.debug("Circuit breaker aberto, requisição recusada: %s", url)
+    if metrics is not None:
+        metrics.count("circuit_rejected")
+    return False
+
+
+def _after_attempt(
+    url: str,
+    status: str,
+    response: requests.Response | None,
+    attempt: int,
+    max_retries: int,
+    base_delay: float,
+    limiter: RateLimiter,
+    budget: RetryBudget | None,
+    breaker: CircuitBreaker | None,
+    max_retry_after: float,
+    logger,
+    metrics: RunMetrics | None,
+) -> float | None:
+    """
+    Processa o resultado de uma tentativa (limiter, circuit breaker) e, se
+    falhou, decide o retry: segundos de backoff antes da próxima, ou None
+    para desistir (sucesso, erro definitivo, última tentativa, Retry-After
+    longo demais ou orçamento de retries esgotado).
+    """
+    code = response.status_code if response is not None else None
+    retry_after = _report_to_limiter(limiter, url, status, response, max_retry_after)
+    if breaker is not None:
+        if is_host_failure(status, code):
+            if breaker.record_failure(url) and logger:
+                logger.warning(
+                    "Circuit breaker aberto para %s: falhas seguidas; nova sonda em %.0fs",
+                    urlparse(url).netloc,
+                    breaker.reset_timeout,
+                )
+        elif status != "erro":
+            breaker.record_success(url)
+
+    if status == "ok" or attempt >= max_retries - 1:
+        return None
+    if not is_retryable(status, code):
+        if metrics is not None:
+            metrics.count("not_retried")
+        return None
+    if retry_after is not None and retry_after > max_retry_after:
+        if logger:
+            logger.warning("Retry-After de %.0fs em %s; desistindo da URL", retry_after, url)
+        return None
+    if budget is not None and not budget.try_spend(url):
+        if logger:
+            logger.debug("Orçamento de retries esgotado para %s", urlparse(url).netloc)
+        if metrics is not None:
+            metrics.count("retry_budget_denied")
+        return None
+    # Com Retry-After o limiter já segura o domínio pelo prazo pedido
+    delay = 0.0 if retry_after is not None else backoff_delay(attempt, base_delay)
+    if logger:
+        logger.info("Retry %d/%d em %.1fs para %s", attempt + 1, max_retries, delay, url)
+    return delay
 
 
 def fetch_with_retry(
@@ -79,39 +404,101 @@ def fetch_with_retry(
     base_delay: float = 1.0,
     timeout: int = 15,
     blocker: RequestBlocker | None = None,
+    session: requests.Session | None = None,
+    rate_limiter: RateLimiter | None = None,
+    cache: ResponseCache | None = None,
     logger=None,
+    metrics: RunMetrics | None = None,
+    retry_budget: RetryBudget | None = None,
+    breaker: CircuitBreaker | None = None,
+    max_retry_after: float = MAX_RETRY_AFTER,
+    reader=None,
 ) -> tuple[str | None, str]:
     """
     Requisição com retry e backoff exponencial.
-    Retorna (html, status). Status: 'ok', 'erro', 'retry'.
+    Retorna (html, status). Status: 'ok' ou o da última tentativa
+    ('timeout', 'connection_error', 'http_error', 'captcha', 'erro'), ou
+    'circuit_open' quando o circuit breaker do host recusou a requisição.
+    Só repete o que pode dar certo na próxima (is_retryable): timeout,
+    conexão, 5xx, 408 e 429; Retry-After é respeitado até `max_retry_after`.
+    Passe `session` (ex.: HttpClient.session) para reaproveitar conexões.
+    O ritmo por domínio vem de `rate_limiter` (default: ~1 req/s compartilhado).
+    Com `cache`, entradas frescas não vão à rede e as vencidas são revalidadas.
+    Com `metrics` (RunMetrics), registra tentativas, esperas e backoff.
+    Com `retry_budget` (RetryBudget), os retries ficam limitados a uma
+    fração das requisições do host; com `breaker` (CircuitBreaker), host
+    com falhas seguidas falha na hora até a próxima sonda.
+    Com `reader` (ex.: streaming.StreamReader), o corpo é lido em streaming
+    e o retorno é (resultado do reader, status); o cache não é usado.
     """
+    cached = None
+    if reader is not None:
+        cache = None  # o cache guarda o HTML inteiro, que o streaming não retém
+    if cache is not None:
+        cached, fresh = cache.lookup(url)
+        if fresh:
+            if logger:
+                logger.debug("Cache hit: %s", url)
+            if metrics is not None:
+                metrics.count("cache_hits")
+            return cached.body, "ok"
+
     blocker = blocker or RequestBlocker()
-    if blocker.is_blocked(url):
+    limiter = rate_limiter or default_rate_limiter
+    wait = blocker.remaining(url)
+    if wait > 0:
         if logger:
             logger.debug("URL bloqueada (duplicada): %s", url)
-        time.sleep(blocker.cooldown)
+        time.sleep(wait)
+        if metrics is not None:
+            metrics.add_time("dedup_wait", wait)
 
-    sess = requests.Session()
+    sess = session or requests.Session()
     last_status = "erro"
+    if retry_budget is not None:
+        retry_budget.on_request(url)
 
     for attempt in range(max_retries):
-        html, status = fetch_html(url, timeout=timeout, session=sess, logger=logger)
+        if not _check_circuit(breaker, url, logger, metrics):
+            last_status = "circuit_open"
+            break
+        with timed(metrics, "rate_limit_wait"):
+            limiter.acquire(url)
+        html, status, response = _request(
+            url,
+            timeout=timeout,
+            session=sess,
+            logger=logger,
+            cache=cache,
+            cached=cached,
+            metrics=metrics,
+            reader=reader,
+        )
+        delay = _after_attempt(
+            url,
+            status,
+            response,
+            attempt,
+            max_retries,
+            base_delay,
+            limiter,
+            retry_budget,
+            breaker,
+            max_retry_after,
+            logger,
+            metrics,
+        )
 
         if status == "ok" and html:
             blocker.register(url)
-            # Sleep aleatório entre requisições (0.5 a 2.0 segundos)
-            time.sleep(random.uniform(0.5, 2.0))
             return html, "ok"
 
         last_status = status
-
-        # 429 ou timeout: aplicar backoff
-        if status in ("timeout", "http_error") and attempt < max_retries - 1:
-            delay = base_delay * (2**attempt) + random.uniform(0, 1)
-            if logger:
-                logger.info("Retry %d/%d em %.1fs para %s", attempt + 1, max_retries, delay, url)
-            time.sleep(delay)
-        else:
+        if delay is None:
             break
+        time.sleep(delay)
+        if metrics is not None:
+            metrics.count("retries")
+            metrics.add_time("retry_backoff", delay)
 
     return None, last_status if last_status != "ok" else "retry"
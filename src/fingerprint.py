@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+"""Módulo de fingerprint: detecta páginas inalteradas entre execuções e exporta só o delta."""
+
+import csv
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from functools import lru_cache
+from hashlib import blake2b
+from itertools import chain
+from operator import attrgetter
+from pathlib import Path
+
+from .item import FIELDNAMES, Item, item_values
+from .utils import normalize_text
+
+FINGERPRINT_FILE = "fingerprints.sqlite3"
+
+# Região de produtos do Books to Scrape: cards + paginação (a próxima página
+# guardada no banco só vale enquanto o link "next" estiver dentro da região)
+DEFAULT_REGIONS = ("article.product_pod", "ul.pager")
+
+# Tipos de mudança no arquivo delta
+ADDED, CHANGED, REMOVED = "adicionado", "alterado", "removido"
+
+# Comentários, <script> e <style>: ruído que muda sem o conteúdo mudar
+_NOISE_RE = re.compile(r"<!--.*?-->|<(script|style)\b.*?</\1\s*>", re.S | re.I)
+_SELECTOR_RE = re.compile(r"([a-zA-Z][\w-]*)?((?:[.#][\w-]+)*)")
+_ATTR_RE = r"""\b{}\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))"""
+_CLASS_RE = re.compile(_ATTR_RE.format("class"), re.I)
+_ID_RE = re.compile(_ATTR_RE.format("id"), re.I)
+
+
+@lru_cache(maxsize=None)
+def _tag_re(tag: str) -> re.Pattern:
+    return re.compile(rf"<(/?){re.escape(tag)}\b[^>]*?(/?)>", re.I)
+
+
+def _attr(pattern: re.Pattern, attrs: str) -> str | None:
+    m = pattern.search(attrs)
+    return next(g for g in m.groups() if g is not None) if m else None
+
+
+class _Region:
+    """Seletor simples (tag, .classe, tag.classe.outra, #id) casado no HTML bruto."""
+
+    def __init__(self, selector: str):
+        m = _SELECTOR_RE.fullmatch(selector.strip())
+        if not m or not any(m.groups()):
+            raise ValueError(f"Região não suportada: {selector!r} (use tag, .classe, tag.classe ou #id)")
+        tag, rest = m.groups()
+        self.classes = set(re.findall(r"\.([\w-]+)", rest or ""))
+        ids = re.findall(r"#([\w-]+)", rest or "")
+        self.id = ids[0] if ids else None
+        name = re.escape(tag) if tag else r"[a-zA-Z][\w-]*"
+        self._open = re.compile(rf"<({name})\b([^>]*)>", re.I)
+
+    def _matches(self, attrs: str) -> bool:
+        if self.id is not None and _attr(_ID_RE, attrs) != self.id:
+            return False
+        if self.classes:
+            classes = _attr(_CLASS_RE, attrs)
+            return classes is not None and self.classes.issubset(classes.split())
+        return True
+
+    def find_all(self, html: str):
+        """Gera o trecho de HTML de cada elemento (com filhos) que casa com o seletor."""
+        pos = 0
+        while True:
+            m = self._open.search(html, pos)
+            if m is None:
+                return
+            if not self._matches(m.group(2)):
+                pos = m.end()
+                continue
+            # Fecha no </tag> do mesmo nível (conta aberturas aninhadas da mesma tag)
+            depth, end = 1, len(html)
+            for t in _tag_re(m.group(1).lower()).finditer(html, m.end()):
+                if t.group(1):
+                    depth -= 1
+                elif not t.group(2):
+                    depth += 1
+                if depth == 0:
+                    end = t.end()
+                    break
+            yield html[m.start() : end]
+            pos = end
+
+
+class PageFingerprinter:
+    """
+    Fingerprint da região de produtos de uma página, sem parse completo.
+
+    As regiões (seletores simples) são recortadas do HTML bruto por regex,
+    sem comentários, <script> e <style>, e o texto passa por normalize_text:
+    mudanças só de espaço/indentação ou fora da região (banner, rodapé,
+    token CSRF) não alteram o fingerprint. Sem nenhuma região encontrada,
+    usa a página inteira.
+    """
+
+    def __init__(self, regions=DEFAULT_REGIONS):
+        self.regions = [_Region(selector) for selector in regions]
+
+    def __call__(self, html: str) -> str:
+        html = _NOISE_RE.sub(" ", html)
+        parts = [part for region in self.regions for part in region.find_all(html)]
+        text = normalize_text("\n".join(parts) if parts else html)
+        return blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    next_url TEXT,
+    run INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    key TEXT PRIMARY KEY,
+    page_url TEXT NOT NULL,
+    data TEXT NOT NULL,
+    run INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_page ON items (page_url);
+CREATE INDEX IF NOT EXISTS items_run ON items (run);
+CREATE TABLE IF NOT EXISTS changes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run INTEGER NOT NULL,
+    change TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+"""
+
+
+_LINK = FIELDNAMES.index("link")
+
+
+def _item_key(values: tuple) -> str:
+    row = dict(zip(FIELDNAMES, values))
+    return row["link"] or row["nome"]
+
+
+class FingerprintStore:
+    """
+    Fingerprints e itens da última execução, num SQLite no diretório de saída.
+
+    A cada execução (begin_run/finish_run):
+    - check(url, fp): página com o mesmo fingerprint da execução anterior é
+      marcada como vista (ela e seus itens) e devolve a próxima URL guardada;
+      o crawl não parseia nem extrai essa página. `on_unchanged(links)`, se
+      definido, recebe os links dos itens dela (ex.: StoreWriter.touch, para
+      a base do --store saber que continuam no site).
+    - record(url, fp, next_url, items): página nova ou alterada; cada item é
+      comparado pela chave (link, ou nome sem link) com o estado guardado e
+      vira "adicionado" ou "alterado" na tabela de mudanças.
+    - finish_run(): se o crawl foi completo, itens não vistos nesta execução
+      viram "removido". Crawl parcial (limite de páginas, falha de fetch)
+      não gera remoções.
+    Thread-safe (modo multi-seed).
+    """
+
+    def __init__(
+        self, path: Path, fingerprinter: PageFingerprinter | None = None, on_unchanged=None
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fingerprint = fingerprinter or PageFingerprinter()
+        self.on_unchanged = on_unchanged
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.run = int(self._get("run") or 0)
+        self.complete = True
+        self.stats = {"unchanged": 0, "changed": 0}
+
+    @classmethod
+    def in_dir(cls, output_dir: Path, fingerprinter: PageFingerprinter | None = None):
+        return cls(Path(output_dir) / FINGERPRINT_FILE, fingerprinter)
+
+    def _get(self, key: str) -> str | None:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key: str, value) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def begin_run(self, resume: bool = False) -> int:
+        """Abre uma execução; com resume, continua a execução interrompida (se houver)."""
+        with self._lock, self._conn:
+            if not (resume and self._get("open") == "1"):
+                self.run += 1
+                self._conn.execute("DELETE FROM changes WHERE run < ?", (self.run,))
+                self._set("run", self.run)
+                self._set("open", 1)
+        return self.run
+
+    def mark_incomplete(self) -> None:
+        """O crawl não visitou todas as páginas: finish_run não marcará remoções."""
+        self.complete = False
+
+    def check(self, url: str, fingerprint: str) -> tuple[bool, str | None]:
+        """(True, next_url guardada) se a página não mudou; (False, None) se mudou ou é nova."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint, next_url FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None or row[0] != fingerprint:
+                return False, None
+            with self._conn:
+                self._conn.execute("UPDATE pages SET run = ? WHERE url = ?", (self.run, url))
+                self._conn.execute("UPDATE items SET run = ? WHERE page_url = ?", (self.run, url))
+            self.stats["unchanged"] += 1
+            links = None
+            if self.on_unchanged is not None:
+                links = [
+                    json.loads(data)[_LINK]
+                    for (data,) in self._conn.execute(
+                        "SELECT data FROM items WHERE page_url = ?", (url,)
+                    )
+                ]
+        if links:
+            self.on_unchanged(links)
+        return True, row[1]
+
+    def record(self, url: str, fingerprint: str, next_url: str | None, items: list[Item]) -> None:
+        """Guarda a página alterada/nova e registra as mudanças dos seus itens."""
+        rows = {}
+        for item in items:
+            values = item_values(item)
+            rows[_item_key(values)] = json.dumps(values, ensure_ascii=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, fingerprint, next_url, run) VALUES (?, ?, ?, ?)",
+                (url, fingerprint, next_url, self.run),
+            )
+            changes = []
+            for key, data in rows.items():
+                old = self._conn.execute("SELECT data FROM items WHERE key = ?", (key,)).fetchone()
+                if old is None:
+                    changes.append((self.run, ADDED, data))
+                elif old[0] != data:
+                    changes.append((self.run, CHANGED, data))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO items (key, page_url, data, run) VALUES (?, ?, ?, ?)",
+                [(key, url, data, self.run) for key, data in rows.items()],
+            )
+            self._conn.executemany(
+                "INSERT INTO changes (run, change, data) VALUES (?, ?, ?)", changes
+            )
+            self.stats["changed"] += 1
+
+    def finish_run(self) -> dict[str, int]:
+        """Fecha a execução (remoções só em crawl completo); retorna contagem por tipo."""
+        with self._lock, self._conn:
+            if self.complete:
+                self._conn.execute(
+                    "INSERT INTO changes (run, change, data) "
+                    "SELECT ?, ?, data FROM items WHERE run < ? ORDER BY rowid",
+                    (self.run, REMOVED, self.run),
+                )
+                self._conn.execute("DELETE FROM items WHERE run < ?", (self.run,))
+                self._conn.execute("DELETE FROM pages WHERE run < ?", (self.run,))
+            self._set("open", 0)
+            rows = self._conn.execute(
+                "SELECT change, COUNT(*) FROM changes WHERE run = ? GROUP BY change", (self.run,)
+            ).fetchall()
+        counts = dict.fromkeys((ADDED, CHANGED, REMOVED), 0)
+        counts.update(rows)
+        return counts
+
+    def iter_changes(self):
+        """(tipo, Item) de cada mudança da execução atual, na ordem em que ocorreram."""
+        for change, data in self._conn.execute(
+            "SELECT change, data FROM changes WHERE run = ? ORDER BY id", (self.run,)
+        ):
+            yield change, Item(**dict(zip(FIELDNAMES, json.loads(data))))
+
+    def export_changes(self, output_dir: Path, fields=FIELDNAMES) -> Path | None:
+        """Grava delta_YYYYMMDD_HHMMSS.csv (coluna `alteracao` + `fields`); None sem mudanças."""
+        changes = self.iter_changes()
+        first = next(changes, None)
+        if first is None:
+            return None
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        path = output_dir / f"delta_{datetime.now():%Y%m%d_%H%M%S}.csv"
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["alteracao", *fields])
+            values = attrgetter(*fields)
+            for change, item in chain([first], changes):
+                writer.writerow([change, *("" if v is None else v for v in values(item))])
+        return path
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
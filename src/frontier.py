@@ -0,0 +1,494 @@
+# -*- coding: utf-8 -*-
+"""Módulo de frontier: fila de URLs compartilhada entre workers (memória, SQLite, Redis)."""
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+# Estados de uma URL no frontier
+QUEUED, LEASED, DONE, FAILED = 0, 1, 2, 3
+
+# Tentativas de uma URL (fetch com falha) antes de ela ir para FAILED
+MAX_ATTEMPTS = 3
+
+# Abertura do SQLite com vários workers subindo juntos: a troca para WAL
+# e o schema podem dar "database is locked"; tenta de novo com backoff
+SQLITE_INIT_ATTEMPTS = 5
+SQLITE_INIT_BACKOFF = 0.1
+
+# Cada worker grava seus itens em <output-dir>/shard-<worker>-<timestamp>.jsonl
+SHARD_PREFIX = "shard-"
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class Frontier:
+    """
+    Fila de URLs a visitar com deduplicação e claim/ack atômicos.
+
+    - add(urls): enfileira só as URLs nunca vistas (nem na fila, nem em
+      andamento, nem concluídas).
+    - claim(worker, n, lease): entrega até n URLs com lease de `lease`
+      segundos; leases vencidos (worker morto) voltam para o início da fila
+      antes da entrega.
+    - ack(url, worker): URL concluída. release(url, worker): devolve para a
+      fila. Os dois só valem para o worker que ainda detém o lease e
+      retornam False caso contrário: um lease vencido pode já ter voltado à
+      fila ou ido para outro worker, e um ack tardio não pode tirá-lo de lá.
+    - fail(url, worker, max_attempts): o fetch falhou; a URL volta à fila
+      ('retry') até somar `max_attempts` falhas e então fica em FAILED
+      ('failed'), fora da fila, sem travar is_finished. None se o worker
+      não detém mais o lease.
+    """
+
+    def add(self, urls) -> int:
+        raise NotImplementedError
+
+    def claim(self, worker: str, n: int = 1, lease: float = 300) -> list[str]:
+        raise NotImplementedError
+
+    def ack(self, url: str, worker: str) -> bool:
+        raise NotImplementedError
+
+    def release(self, url: str, worker: str) -> bool:
+        raise NotImplementedError
+
+    def fail(self, url: str, worker: str, max_attempts: int = MAX_ATTEMPTS) -> str | None:
+        raise NotImplementedError
+
+    def seen(self, url: str) -> bool:
+        raise NotImplementedError
+
+    def counts(self) -> dict[str, int]:
+        """{'queued', 'leased', 'done', 'failed'}."""
+        raise NotImplementedError
+
+    def is_finished(self) -> bool:
+        """Nada na fila e nada em andamento em nenhum worker."""
+        c = self.counts()
+        return c["queued"] == 0 and c["leased"] == 0
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class MemoryFrontier(Frontier):
+    """Frontier em memória (um processo, várias threads)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: dict[str, int] = {}
+        self._queue: deque[str] = deque()
+        self._leases: dict[str, tuple[str, float]] = {}  # url -> (worker, vencimento)
+        self._attempts: dict[str, int] = {}
+
+    def add(self, urls) -> int:
+        added = 0
+        with self._lock:
+            for url in urls:
+                if url not in self._state:
+                    self._state[url] = QUEUED
+                    self._queue.append(url)
+                    added += 1
+        return added
+
+    def _requeue_expired(self, now: float) -> None:
+        expired = [url for url, (_worker, until) in self._leases.items() if until < now]
+        for url in expired:
+            del self._leases[url]
+            self._state[url] = QUEUED
+            self._queue.appendleft(url)
+
+    def claim(self, worker: str, n: int = 1, lease: float = 300) -> list[str]:
+        now = time.time()
+        with self._lock:
+            self._requeue_expired(now)
+            claimed = []
+            while self._queue and len(claimed) < n:
+                url = self._queue.popleft()
+                if self._state.get(url) != QUEUED:
+                    continue
+                self._state[url] = LEASED
+                self._leases[url] = (worker, now + lease)
+                claimed.append(url)
+            return claimed
+
+    def _drop_lease(self, url: str, worker: str) -> bool:
+        lease = self._leases.get(url)
+        if lease is None or lease[0] != worker:
+            return False
+        del self._leases[url]
+        return True
+
+    def ack(self, url: str, worker: str) -> bool:
+        with self._lock:
+            if not self._drop_lease(url, worker):
+                return False
+            self._state[url] = DONE
+            return True
+
+    def release(self, url: str, worker: str) -> bool:
+        with self._lock:
+            if not self._drop_lease(url, worker):
+                return False
+            self._state[url] = QUEUED
+            self._queue.appendleft(url)
+            return True
+
+    def fail(self, url: str, worker: str, max_attempts: int = MAX_ATTEMPTS) -> str | None:
+        with self._lock:
+            if not self._drop_lease(url, worker):
+                return None
+            attempts = self._attempts[url] = self._attempts.get(url, 0) + 1
+            if attempts >= max_attempts:
+                self._state[url] = FAILED
+                return "failed"
+            self._state[url] = QUEUED
+            self._queue.appendleft(url)
+            return "retry"
+
+    def seen(self, url: str) -> bool:
+        with self._lock:
+            return url in self._state
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            by_state = Counter(self._state.values())
+            return {
+                "queued": by_state[QUEUED],
+                "leased": len(self._leases),
+                "done": by_state[DONE],
+                "failed": by_state[FAILED],
+            }
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL UNIQUE,
+    state INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS frontier_state ON frontier (state, seq);
+"""
+
+
+class SqliteFrontier(Frontier):
+    """
+    Frontier num arquivo SQLite (WAL), compartilhado por vários processos
+    na mesma máquina. O claim roda em BEGIN IMMEDIATE: dois workers nunca
+    recebem a mesma URL. A ordem de entrega é a de inserção.
+    """
+
+    def __init__(self, path: Path, timeout: float = 30.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        for attempt in range(SQLITE_INIT_ATTEMPTS):
+            try:
+                self._init_db()
+                break
+            except sqlite3.OperationalError:
+                if attempt == SQLITE_INIT_ATTEMPTS - 1:
+                    raise
+                time.sleep(SQLITE_INIT_BACKOFF * 2**attempt)
+
+    def _init_db(self):
+        """WAL + schema; idempotente, pode ser repetido após "database is locked"."""
+        mode = self._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        if mode.lower() != "wal":
+            # Só o primeiro worker troca o modo; os demais já encontram WAL
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SQLITE_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(frontier)")}
+        if "attempts" not in columns:
+            # Frontier criado antes do contador de tentativas
+            self._conn.execute(
+                "ALTER TABLE frontier ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0"
+            )
+
+    def _transaction(self, fn):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def add(self, urls) -> int:
+        rows = [(url,) for url in urls]
+        if not rows:
+            return 0
+        return self._transaction(
+            lambda c: c.executemany("INSERT OR IGNORE INTO frontier (url) VALUES (?)", rows).rowcount
+        )
+
+    def claim(self, worker: str, n: int = 1, lease: float = 300) -> list[str]:
+        def claim(c):
+            now = time.time()
+            # Leases vencidos voltam à fila (mantêm o seq, então saem primeiro)
+            c.execute(
+                "UPDATE frontier SET state = ?, worker = NULL, lease_until = NULL "
+                "WHERE state = ? AND lease_until < ?",
+                (QUEUED, LEASED, now),
+            )
+            rows = c.execute(
+                "SELECT seq, url FROM frontier WHERE state = ? ORDER BY seq LIMIT ?",
+                (QUEUED, n),
+            ).fetchall()
+            c.executemany(
+                "UPDATE frontier SET state = ?, worker = ?, lease_until = ? WHERE seq = ?",
+                [(LEASED, worker, now + lease, seq) for seq, _url in rows],
+            )
+            return [url for _seq, url in rows]
+
+        return self._transaction(claim)
+
+    def _finish_lease(self, url: str, worker: str, state: int) -> bool:
+        """Sai do lease para `state`, se `worker` ainda o detém."""
+        return self._transaction(
+            lambda c: c.execute(
+                "UPDATE frontier SET state = ?, worker = NULL, lease_until = NULL "
+                "WHERE url = ? AND state = ? AND worker = ?",
+                (state, url, LEASED, worker),
+            ).rowcount
+            == 1
+        )
+
+    def ack(self, url: str, worker: str) -> bool:
+        return self._finish_lease(url, worker, DONE)
+
+    def release(self, url: str, worker: str) -> bool:
+        return self._finish_lease(url, worker, QUEUED)
+
+    def fail(self, url: str, worker: str, max_attempts: int = MAX_ATTEMPTS) -> str | None:
+        def fail(c):
+            row = c.execute(
+                "SELECT attempts FROM frontier WHERE url = ? AND state = ? AND worker = ?",
+                (url, LEASED, worker),
+            ).fetchone()
+            if row is None:
+                return None
+            attempts = row[0] + 1
+            state = FAILED if attempts >= max_attempts else QUEUED
+            c.execute(
+                "UPDATE frontier SET state = ?, worker = NULL, lease_until = NULL, attempts = ? "
+                "WHERE url = ?",
+                (state, attempts, url),
+            )
+            return "failed" if state == FAILED else "retry"
+
+        return self._transaction(fail)
+
+    def seen(self, url: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM frontier WHERE url = ?", (url,)).fetchone()
+        return row is not None
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT state, COUNT(*) FROM frontier GROUP BY state"
+            ).fetchall()
+        by_state = dict(rows)
+        return {
+            "queued": by_state.get(QUEUED, 0),
+            "leased": by_state.get(LEASED, 0),
+            "done": by_state.get(DONE, 0),
+            "failed": by_state.get(FAILED, 0),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Scripts Lua: cada operação roda atômica no servidor Redis
+_REDIS_ADD = """
+local added = 0
+for i, url in ipairs(ARGV) do
+    if redis.call('SADD', KEYS[1], url) == 1 then
+        redis.call('RPUSH', KEYS[2], url)
+        added = added + 1
+    end
+end
+return added
+"""
+
+_REDIS_CLAIM = """
+local now, untl, n = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', '(' .. now)
+for i = #expired, 1, -1 do
+    redis.call('ZREM', KEYS[2], expired[i])
+    redis.call('HDEL', KEYS[3], expired[i])
+    redis.call('LPUSH', KEYS[1], expired[i])
+end
+local claimed = {}
+while #claimed < n do
+    local url = redis.call('LPOP', KEYS[1])
+    if not url then break end
+    redis.call('ZADD', KEYS[2], untl, url)
+    redis.call('HSET', KEYS[3], url, ARGV[4])
+    claimed[#claimed + 1] = url
+end
+return claimed
+"""
+
+# ack (ARGV[2] = 'done') ou release ('queue'), só para o dono do lease
+_REDIS_FINISH = """
+if redis.call('HGET', KEYS[3], ARGV[1]) ~= ARGV[3] then
+    return 0
+end
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+if ARGV[2] == 'done' then
+    redis.call('SADD', KEYS[4], ARGV[1])
+else
+    redis.call('LPUSH', KEYS[1], ARGV[1])
+end
+return 1
+"""
+
+# Falha de fetch do dono do lease: volta à fila até ARGV[3] tentativas, depois :failed
+_REDIS_FAIL = """
+if redis.call('HGET', KEYS[3], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+if redis.call('HINCRBY', KEYS[4], ARGV[1], 1) >= tonumber(ARGV[3]) then
+    redis.call('SADD', KEYS[5], ARGV[1])
+    return 2
+end
+redis.call('LPUSH', KEYS[1], ARGV[1])
+return 1
+"""
+
+
+class RedisFrontier(Frontier):
+    """
+    Frontier em Redis (ou servidor compatível), compartilhado entre máquinas.
+    Chaves com o prefixo `prefix`: :seen (set), :queue (lista), :leases
+    (sorted set por vencimento), :owners (hash URL -> worker do lease),
+    :attempts (hash URL -> falhas), :done e :failed (sets). Passe `client` para usar um
+    cliente já criado (ex.: fakeredis em testes locais).
+    """
+
+    def __init__(self, url: str = "redis://localhost:6379/0", prefix: str = "frontier", client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError("Para usar o frontier Redis, instale: pip install redis")
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self._r = client
+        self.prefix = prefix
+        self._seen_key = f"{prefix}:seen"
+        self._queue_key = f"{prefix}:queue"
+        self._leases_key = f"{prefix}:leases"
+        self._owners_key = f"{prefix}:owners"
+        self._done_key = f"{prefix}:done"
+        self._attempts_key = f"{prefix}:attempts"
+        self._failed_key = f"{prefix}:failed"
+        self._add = client.register_script(_REDIS_ADD)
+        self._claim = client.register_script(_REDIS_CLAIM)
+        self._finish = client.register_script(_REDIS_FINISH)
+        self._fail = client.register_script(_REDIS_FAIL)
+
+    @staticmethod
+    def _text(value) -> str:
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def add(self, urls) -> int:
+        urls = list(urls)
+        if not urls:
+            return 0
+        return int(self._add(keys=[self._seen_key, self._queue_key], args=urls))
+
+    def claim(self, worker: str, n: int = 1, lease: float = 300) -> list[str]:
+        now = time.time()
+        claimed = self._claim(
+            keys=[self._queue_key, self._leases_key, self._owners_key],
+            args=[now, now + lease, n, worker],
+        )
+        return [self._text(url) for url in claimed]
+
+    def _finish_lease(self, url: str, worker: str, target: str) -> bool:
+        keys = [self._queue_key, self._leases_key, self._owners_key, self._done_key]
+        return int(self._finish(keys=keys, args=[url, target, worker])) == 1
+
+    def ack(self, url: str, worker: str) -> bool:
+        return self._finish_lease(url, worker, "done")
+
+    def release(self, url: str, worker: str) -> bool:
+        return self._finish_lease(url, worker, "queue")
+
+    def fail(self, url: str, worker: str, max_attempts: int = MAX_ATTEMPTS) -> str | None:
+        keys = [
+            self._queue_key,
+            self._leases_key,
+            self._owners_key,
+            self._attempts_key,
+            self._failed_key,
+        ]
+        result = int(self._fail(keys=keys, args=[url, worker, max_attempts]))
+        return {1: "retry", 2: "failed"}.get(result)
+
+    def seen(self, url: str) -> bool:
+        return bool(self._r.sismember(self._seen_key, url))
+
+    def counts(self) -> dict[str, int]:
+        pipe = self._r.pipeline()
+        pipe.llen(self._queue_key)
+        pipe.zcard(self._leases_key)
+        pipe.scard(self._done_key)
+        pipe.scard(self._failed_key)
+        queued, leased, done, failed = pipe.execute()
+        return {"queued": queued, "leased": leased, "done": done, "failed": failed}
+
+    def close(self) -> None:
+        self._r.close()
+
+
+def open_frontier(uri: str) -> Frontier:
+    """
+    Abre o frontier pela URI:
+      memory                          -> MemoryFrontier
+      sqlite:///caminho/frontier.db   -> SqliteFrontier (ou só o caminho do arquivo;
+                                         sqlite:////abs/frontier.db para caminho absoluto)
+      redis://host:6379/0?prefix=nome -> RedisFrontier
+    """
+    if uri == "memory":
+        return MemoryFrontier()
+    if "://" not in uri:
+        return SqliteFrontier(Path(uri))
+    parsed = urlparse(uri)
+    if parsed.scheme in ("redis", "rediss", "unix"):
+        prefix = parse_qs(parsed.query).get("prefix", ["frontier"])[0]
+        url = parsed._replace(query="").geturl()
+        return RedisFrontier(url, prefix=prefix)
+    if parsed.scheme == "sqlite":
+        return SqliteFrontier(Path(uri[len("sqlite:///") :]))
+    raise ValueError(f"Frontier não suportado: {uri}")
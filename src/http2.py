@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""Módulo HTTP/2: transport adapter do requests sobre httpx (multiplexação, br/zstd)."""
+
+import email.message
+import threading
+import time
+from types import SimpleNamespace
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.cookies import extract_cookies_to_jar
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from .fetcher import _connect_clock
+
+# Headers de conexão: proibidos no HTTP/2 e geridos pelo próprio httpx no 1.1
+_HOP_BY_HOP = ("connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade")
+
+# Mesma codificação de versão de urllib3.HTTPResponse.version
+_HTTP_VERSIONS = {"HTTP/1.0": 10, "HTTP/1.1": 11, "HTTP/2": 20}
+
+# Modos de --http2: ALPN no TLS (cai para HTTP/1.1 se o servidor não
+# oferecer h2) ou h2c, HTTP/2 direto sem TLS ("prior knowledge")
+HTTP2_MODES = ("alpn", "h2c")
+
+
+def _import_httpx():
+    try:
+        import httpx
+        import h2  # noqa: F401
+    except ImportError:
+        raise ImportError("Para usar HTTP/2, instale: pip install 'httpx[http2]'")
+    return httpx
+
+
+class _HttpxRaw:
+    """Corpo de uma resposta httpx com a interface que requests.Response espera de `raw`."""
+
+    def __init__(self, response, httpx):
+        self._response = response
+        self._httpx = httpx
+        self.status = response.status_code
+        self.reason = response.reason_phrase
+        self.version = _HTTP_VERSIONS.get(response.http_version, 11)
+        # Set-Cookie para o cookie jar da sessão (extract_cookies_to_jar lê `.msg`)
+        msg = email.message.Message()
+        for name, value in response.headers.multi_items():
+            msg[name] = value
+        self._original_response = SimpleNamespace(msg=msg)
+
+    def stream(self, chunk_size: int | None = None, decode_content: bool = True):
+        """Blocos já decodificados (gzip/deflate/br/zstd) pelo httpx."""
+        try:
+            yield from self._response.iter_bytes(chunk_size)
+        except self._httpx.TimeoutException as e:
+            raise requests.exceptions.ReadTimeout(e)
+        except self._httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(e)
+
+    def tell(self) -> int:
+        """Bytes do corpo recebidos no fio (antes da descompressão)."""
+        return self._response.num_bytes_downloaded
+
+    def close(self) -> None:
+        # No HTTP/2 fechar antes do fim só cancela o stream (RST_STREAM); a conexão segue
+        self._response.close()
+
+
+class Http2Adapter(BaseAdapter):
+    """
+    Transport adapter do requests que envia pelo httpx com HTTP/2.
+
+    Montado numa requests.Session (HttpClient(http2=...)), mantém o contrato
+    do resto do código: fetch_with_retry, AsyncFetcher, cache e leitura em
+    streaming seguem iguais, mas as requisições de um host são multiplexadas
+    numa única conexão em vez de uma conexão por requisição em voo.
+
+    - mode 'alpn': HTTP/2 negociado no TLS (https); servidores só HTTP/1.1
+      continuam funcionando. 'h2c': HTTP/2 sem TLS com conhecimento prévio
+      (servidores locais, como o de benchmarks/h2server.py).
+    - Accept-Encoding anuncia o que o httpx decodifica: gzip e deflate, br com
+      brotli instalado e zstd com zstandard.
+    - Redirects e cookies continuam com a Session; verify/cert/proxies por
+      requisição não se aplicam (o cliente httpx é configurado uma vez).
+    """
+
+    def __init__(self, mode: str = "alpn", max_connections: int = 10):
+        if mode not in HTTP2_MODES:
+            raise ValueError(f"Modo HTTP/2 inválido: {mode!r} (use {' ou '.join(HTTP2_MODES)})")
+        super().__init__()
+        self._httpx = _import_httpx()
+        self.mode = mode
+        self._client = self._httpx.Client(
+            http1=mode == "alpn",
+            http2=True,
+            limits=self._httpx.Limits(
+                max_connections=max_connections, max_keepalive_connections=max_connections
+            ),
+        )
+        self.accept_encoding = self._client.headers["Accept-Encoding"]
+        self._lock = threading.Lock()
+        self._stats = {"opened": 0, "requests": 0}
+        self._clock = threading.local()
+
+    def _trace(self, event: str, info: dict) -> None:
+        """Trace do httpcore: conta conexões novas e mede o tempo de conexão."""
+        if event.endswith(("connect_tcp.started", "start_tls.started")):
+            self._clock.started = time.perf_counter()
+        elif event.endswith(("connect_tcp.complete", "start_tls.complete")):
+            elapsed = time.perf_counter() - getattr(self._clock, "started", time.perf_counter())
+            _connect_clock.seconds = getattr(_connect_clock, "seconds", 0.0) + elapsed
+            if event.endswith("connect_tcp.complete"):
+                with self._lock:
+                    self._stats["opened"] += 1
+
+    def _timeout(self, timeout):
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return self._httpx.Timeout(read, connect=connect)
+        return self._httpx.Timeout(timeout)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        httpx = self._httpx
+        headers = [
+            (name, value)
+            for name, value in request.headers.items()
+            if name.lower() not in _HOP_BY_HOP
+        ]
+        outgoing = self._client.build_request(
+            request.method,
+            request.url,
+            headers=headers,
+            content=request.body,
+            timeout=self._timeout(timeout),
+            extensions={"trace": self._trace},
+        )
+        for name in _HOP_BY_HOP:
+            outgoing.headers.pop(name, None)
+        outgoing.headers["Accept-Encoding"] = self.accept_encoding
+        try:
+            response = self._client.send(outgoing, stream=True)
+        except httpx.ConnectTimeout as e:
+            raise requests.exceptions.ConnectTimeout(e, request=request)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.ReadTimeout(e, request=request)
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(e, request=request)
+        with self._lock:
+            self._stats["requests"] += 1
+        return self._build_response(request, response)
+
+    def _build_response(self, request, response) -> requests.Response:
+        r = requests.Response()
+        r.status_code = response.status_code
+        r.headers = CaseInsensitiveDict(response.headers.items())
+        r.encoding = get_encoding_from_headers(r.headers)
+        r.raw = _HttpxRaw(response, self._httpx)
+        r.reason = response.reason_phrase
+        r.url = request.url
+        r.request = request
+        r.connection = self
+        extract_cookies_to_jar(r.cookies, request, r.raw)
+        return r
+
+    def connection_stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def close(self) -> None:
+        self._client.close()
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""Módulo de itens: o Item extraído e o container colunar ItemBatch."""
+
+import math
+from array import array
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Any
+
+_NAN = float("nan")
+
+
+@dataclass(slots=True)
+class Item:
+    """
+    Item extraído (produto genérico para vitrine).
+    Usa __slots__ (sem __dict__ por instância); `raw` só é preenchido sob
+    demanda (keep_raw=True), para não duplicar os campos em memória.
+    """
+
+    nome: str
+    preco: float | None
+    categoria: str
+    descricao: str
+    disponibilidade: str
+    rating: str | None
+    link: str
+    raw: dict[str, Any] | None = None
+    # Preenchidos pela página de detalhe (ver enricher.py)
+    upc: str = ""
+    estoque: int | None = None
+
+
+# Campos exportados, na ordem das colunas (`raw` fica de fora)
+FIELDNAMES = [
+    "nome",
+    "preco",
+    "categoria",
+    "descricao",
+    "disponibilidade",
+    "rating",
+    "link",
+    "upc",
+    "estoque",
+]
+
+# Campos que só a página de detalhe traz (--enrich): fora das exportações sem ela
+DETAIL_FIELDS = ("upc", "estoque")
+LISTING_FIELDNAMES = [name for name in FIELDNAMES if name not in DETAIL_FIELDS]
+
+# Lê os campos do Item (slots) como tupla, na ordem de FIELDNAMES, sem criar dict
+item_values = attrgetter(*FIELDNAMES)
+
+
+class ItemBatch:
+    """
+    Container colunar para grandes volumes de itens: uma lista/array por
+    campo em vez de um objeto por item (preço em array de double, rating e
+    estoque em arrays de inteiros). Iterar devolve Items sob demanda, então
+    funciona direto com os writers de exporter.py.
+    """
+
+    _TEXT_FIELDS = ("nome", "categoria", "descricao", "disponibilidade", "link", "upc")
+
+    def __init__(self, items=None):
+        self._text: dict[str, list[str]] = {name: [] for name in self._TEXT_FIELDS}
+        self._preco = array("d")  # NaN = sem preço
+        self._rating = array("b")  # 0 = sem rating
+        self._estoque = array("l")  # -1 = sem estoque
+        if items is not None:
+            self.extend(items)
+
+    def append(self, item: Item) -> None:
+        for name in self._TEXT_FIELDS:
+            self._text[name].append(getattr(item, name))
+        self._preco.append(_NAN if item.preco is None else item.preco)
+        self._rating.append(int(item.rating) if item.rating else 0)
+        self._estoque.append(-1 if item.estoque is None else item.estoque)
+
+    def extend(self, items) -> None:
+        for item in items:
+            self.append(item)
+
+    def __len__(self) -> int:
+        return len(self._preco)
+
+    def __getitem__(self, i: int) -> Item:
+        preco = self._preco[i]
+        rating = self._rating[i]
+        estoque = self._estoque[i]
+        text = self._text
+        return Item(
+            nome=text["nome"][i],
+            preco=None if math.isnan(preco) else preco,
+            categoria=text["categoria"][i],
+            descricao=text["descricao"][i],
+            disponibilidade=text["disponibilidade"][i],
+            rating=str(rating) if rating else None,
+            link=text["link"][i],
+            upc=text["upc"][i],
+            estoque=None if estoque < 0 else estoque,
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def column(self, name: str):
+        """Acesso direto à coluna (lista ou array), sem materializar Items."""
+        if name in self._text:
+            return self._text[name]
+        return {"preco": self._preco, "rating": self._rating, "estoque": self._estoque}[name]
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""Módulo de métricas: tempo por estágio, latência por domínio e contagem por status."""
+
+import json
+import threading
+import time
+from array import array
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+METRICS_FILE = "metrics.json"
+
+# Fases de uma requisição: conexão (DNS + TCP + TLS, só em conexão nova),
+# espera pelo primeiro byte e leitura do corpo
+REQUEST_PHASES = ("connect", "wait", "transfer")
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def percentile(sorted_values, q: float) -> float | None:
+    """Percentil por nearest-rank sobre valores já ordenados."""
+    if not sorted_values:
+        return None
+    rank = max(int(q * len(sorted_values) + 0.999999) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class _DomainStats:
+    __slots__ = ("latencies", "statuses", "codes")
+
+    def __init__(self):
+        self.latencies = array("d")
+        self.statuses: Counter = Counter()
+        self.codes: Counter = Counter()
+
+
+class RunMetrics:
+    """
+    Acumula as métricas de uma execução. Thread-safe: é compartilhado entre
+    o crawl, o AsyncFetcher e o enriquecimento.
+
+    - Estágios: segundos e número de chamadas (fetch, parse, extract,
+      pagination, enrich, export, rate_limit_wait, retry_backoff, ...).
+    - Requisições: cada tentativa com status, código HTTP, latência total e
+      as fases connect/wait/transfer.
+    - Tráfego: bytes do corpo no fio (comprimidos) e decodificados, por
+      Content-Encoding e versão do HTTP.
+    - Contadores livres (páginas, itens, retries).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self._stages: dict[str, list] = {}
+        self._phases = dict.fromkeys(REQUEST_PHASES, 0.0)
+        self._domains: dict[str, _DomainStats] = {}
+        self._statuses: Counter = Counter()
+        self._transfer = {"wire": 0, "decoded": 0}
+        self._encodings: Counter = Counter()
+        self._versions: Counter = Counter()
+        self.counters: Counter = Counter()
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = [0.0, 0]
+            entry[0] += seconds
+            entry[1] += 1
+
+    @contextmanager
+    def timer(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start)
+
+    def count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[key] += n
+
+    def observe_request(
+        self,
+        url: str,
+        status: str,
+        seconds: float,
+        code: int | None = None,
+        connect: float = 0.0,
+        ttfb: float | None = None,
+    ) -> None:
+        """Registra uma tentativa. ttfb: até os headers (Response.elapsed)."""
+        host = urlparse(url).netloc
+        with self._lock:
+            stats = self._domains.get(host)
+            if stats is None:
+                stats = self._domains[host] = _DomainStats()
+            stats.latencies.append(seconds)
+            stats.statuses[status] += 1
+            if code is not None:
+                stats.codes[code] += 1
+            self._statuses[status] += 1
+            if ttfb is not None:
+                self._phases["connect"] += connect
+                self._phases["wait"] += max(ttfb - connect, 0.0)
+                self._phases["transfer"] += max(seconds - ttfb, 0.0)
+
+    def observe_transfer(
+        self, wire: int, decoded: int, encoding: str = "identity", http_version: str | None = None
+    ) -> None:
+        """Registra o corpo de uma resposta: bytes no fio e após a descompressão."""
+        with self._lock:
+            self._transfer["wire"] += wire
+            self._transfer["decoded"] += decoded
+            self._encodings[encoding] += 1
+            if http_version:
+                self._versions[http_version] += 1
+
+    @property
+    def status_counts(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._statuses)
+
+    def snapshot(self) -> dict:
+        """Estado atual em estruturas JSON-serializáveis."""
+        with self._lock:
+            domains = {}
+            for host, stats in self._domains.items():
+                ordered = sorted(stats.latencies)
+                latency = {f"p{int(q * 100)}": percentile(ordered, q) for q in QUANTILES}
+                latency["max"] = ordered[-1] if ordered else None
+                latency["mean"] = sum(ordered) / len(ordered) if ordered else None
+                domains[host] = {
+                    "requests": len(ordered),
+                    "latency_s": latency,
+                    "by_status": dict(stats.statuses),
+                    "by_code": {str(c): n for c, n in sorted(stats.codes.items())},
+                }
+            now = time.time()
+            return {
+                "started_at": self.started_at,
+                "elapsed_s": now - self.started_at,
+                "counters": dict(self.counters),
+                "stages": {
+                    name: {"seconds": secs, "calls": calls}
+                    for name, (secs, calls) in sorted(self._stages.items())
+                },
+                "requests": {
+                    "total": sum(self._statuses.values()),
+                    "by_status": dict(self._statuses),
+                    "phases_s": dict(self._phases),
+                },
+                "transfer": {
+                    "wire_bytes": self._transfer["wire"],
+                    "decoded_bytes": self._transfer["decoded"],
+                    "compression_ratio": (
+                        self._transfer["decoded"] / self._transfer["wire"]
+                        if self._transfer["wire"]
+                        else None
+                    ),
+                    "by_encoding": dict(self._encodings),
+                    "by_http_version": dict(self._versions),
+                },
+                "domains": domains,
+            }
+
+    def write_json(self, path: Path, **extra) -> Path:
+        """Grava snapshot() (+ seções extras, ex.: conexões, cache) em JSON."""
+        data = self.snapshot()
+        data.update(extra)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        return path
+
+    def to_prometheus(self) -> str:
+        """Snapshot no formato texto do Prometheus (exposition format 0.0.4)."""
+        snap = self.snapshot()
+        lines = [
+            "# HELP scraper_stage_seconds_total Tempo acumulado por estágio.",
+            "# TYPE scraper_stage_seconds_total counter",
+        ]
+        for name, s in snap["stages"].items():
+            lines.append(f'scraper_stage_seconds_total{{stage="{name}"}} {s["seconds"]:.6f}')
+        lines += [
+            "# HELP scraper_stage_calls_total Execuções por estágio.",
+            "# TYPE scraper_stage_calls_total counter",
+        ]
+        for name, s in snap["stages"].items():
+            lines.append(f'scraper_stage_calls_total{{stage="{name}"}} {s["calls"]}')
+        lines += [
+            "# HELP scraper_request_phase_seconds_total Tempo das requisições por fase.",
+            "# TYPE scraper_request_phase_seconds_total counter",
+        ]
+        for phase, secs in snap["requests"]["phases_s"].items():
+            lines.append(f'scraper_request_phase_seconds_total{{phase="{phase}"}} {secs:.6f}')
+        lines += [
+            "# HELP scraper_requests_total Tentativas por domínio e status.",
+            "# TYPE scraper_requests_total counter",
+        ]
+        for host, d in snap["domains"].items():
+            for status, n in d["by_status"].items():
+                lines.append(f'scraper_requests_total{{domain="{host}",status="{status}"}} {n}')
+        lines += [
+            "# HELP scraper_request_duration_seconds Latência das tentativas por domínio.",
+            "# TYPE scraper_request_duration_seconds summary",
+        ]
+        for host, d in snap["domains"].items():
+            latency = d["latency_s"]
+            for q in QUANTILES:
+                value = latency[f"p{int(q * 100)}"]
+                lines.append(
+                    f'scraper_request_duration_seconds{{domain="{host}",quantile="{q}"}} {value:.6f}'
+                )
+            lines.append(
+                f'scraper_request_duration_seconds_sum{{domain="{host}"}} '
+                f'{latency["mean"] * d["requests"]:.6f}'
+            )
+            lines.append(f'scraper_request_duration_seconds_count{{domain="{host}"}} {d["requests"]}')
+        lines += [
+            "# HELP scraper_transfer_bytes_total Bytes dos corpos no fio e decodificados.",
+            "# TYPE scraper_transfer_bytes_total counter",
+            f'scraper_transfer_bytes_total{{kind="wire"}} {snap["transfer"]["wire_bytes"]}',
+            f'scraper_transfer_bytes_total{{kind="decoded"}} {snap["transfer"]["decoded_bytes"]}',
+            "# HELP scraper_responses_total Respostas por Content-Encoding e versão do HTTP.",
+            "# TYPE scraper_responses_total counter",
+        ]
+        for encoding, n in sorted(snap["transfer"]["by_encoding"].items()):
+            lines.append(f'scraper_responses_total{{encoding="{encoding}"}} {n}')
+        for version, n in sorted(snap["transfer"]["by_http_version"].items()):
+            lines.append(f'scraper_responses_total{{http_version="{version}"}} {n}')
+        lines += [
+            "# HELP scraper_events_total Contadores da execução (páginas, itens, retries).",
+            "# TYPE scraper_events_total counter",
+        ]
+        for key, n in sorted(snap["counters"].items()):
+            lines.append(f'scraper_events_total{{event="{key}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+
+def timed(metrics: RunMetrics | None, stage: str):
+    """metrics.timer(stage), ou um contexto vazio quando não há métricas."""
+    return metrics.timer(stage) if metrics is not None else nullcontext()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = self.server.metrics.to_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve_metrics(metrics: RunMetrics, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Expõe GET /metrics (formato Prometheus) numa thread daemon.
+    Chame shutdown() e server_close() no servidor retornado ao terminar.
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    server.metrics = metrics
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -1,17 +1,39 @@
 # -*- coding: utf-8 -*-
 """Módulo de paginação: detecta próxima página, evita loop infinito."""
 
-from urllib.parse import urljoin, urlparse
+import re
+import time
+from collections import deque
+from concurrent.futures import Future
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse
 
 from bs4 import BeautifulSoup
 
+from .dedup import UrlSeenSet
+from .frontier import MAX_ATTEMPTS
+from .metrics import timed
+from .parser import as_soup
+from .streaming import StreamedPage
 
-def get_next_page_url(html: str, current_url: str, base_url: str | None = None) -> str | None:
+# "Page 1 of 50" / "Página 1 de 50"
+PAGE_COUNT_RE = re.compile(r"(?:page|p[aá]gina)\s+(\d+)\s+(?:of|de)\s+(\d+)", re.IGNORECASE)
+# Número da página no caminho: page-2.html, page/2, pagina_2
+PATH_PAGE_RE = re.compile(r"((?:page|p[aá]gina)[-_/]?)(\d+)", re.IGNORECASE)
+PAGE_QUERY_KEYS = ("page", "pagina", "p")
+
+# Quantas páginas descobertas são buscadas por lote no fan-out
+DISCOVERY_BATCH = 50
+
+
+def get_next_page_url(
+    html: str | BeautifulSoup, current_url: str, base_url: str | None = None
+) -> str | None:
     """
     Detecta URL do botão "Próxima página" ou link "next".
+    Aceita HTML bruto ou o documento já parseado por parse_html.
     Retorna None se não houver próxima página.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    soup = as_soup(html)
     base = base_url or current_url
 
     # Seletores comuns para "próxima página" (Books to Scrape usa li.next a)
@@ -38,6 +60,58 @@ def get_next_page_url(html: str, current_url: str, base_url: str | None = None)
     return urljoin(base, href)
 
 
+def _page_url_template(url: str, page: int):
+    """Retorna função n -> URL da página n, se o número `page` estiver na URL."""
+    parsed = urlparse(url)
+    query = parse_qsl(parsed.query, keep_blank_values=True)
+    for i, (key, value) in enumerate(query):
+        if key.lower() in PAGE_QUERY_KEYS and value == str(page):
+
+            def build_query(n: int, i=i, key=key) -> str:
+                new_query = list(query)
+                new_query[i] = (key, str(n))
+                return parsed._replace(query=urlencode(new_query)).geturl()
+
+            return build_query
+
+    matches = [m for m in PATH_PAGE_RE.finditer(parsed.path) if int(m.group(2)) == page]
+    if matches:
+        m = matches[-1]
+
+        def build_path(n: int) -> str:
+            path = parsed.path[: m.start(2)] + str(n) + parsed.path[m.end(2) :]
+            return parsed._replace(path=path).geturl()
+
+        return build_path
+    return None
+
+
+def discover_page_urls(
+    html: str | BeautifulSoup, current_url: str, next_url: str | None = None
+) -> list[str]:
+    """
+    Descobre as páginas restantes de uma listagem numerada ("Page 1 of 50" +
+    número da página na URL) para buscá-las todas de uma vez.
+    Se `next_url` for informado, o padrão só é aceito quando ele gera
+    exatamente o link "próxima". Retorna [] quando não há padrão confiável.
+    """
+    soup = as_soup(html)
+    node = soup.find(string=PAGE_COUNT_RE)
+    if node is None:
+        return []
+    match = PAGE_COUNT_RE.search(node)
+    page, total = int(match.group(1)), int(match.group(2))
+    if total <= page:
+        return []
+
+    build = _page_url_template(current_url, page)
+    if build is None:
+        return []
+    if next_url and urljoin(current_url, build(page + 1)) != next_url:
+        return []
+    return [build(n) for n in range(page + 1, total + 1)]
+
+
 def is_same_page(url1: str, url2: str) -> bool:
     """Evita loop: verifica se duas URLs apontam para a mesma página."""
     p1 = urlparse(url1)
@@ -45,27 +119,226 @@ def is_same_page(url1: str, url2: str) -> bool:
     return p1.path.rstrip("/") == p2.path.rstrip("/")
 
 
-def paginate(
+class FetchError(Exception):
+    """Falha de fetch que encerrou o crawl (levantada só com raise_on_error)."""
+
+    def __init__(self, url: str, status: str):
+        super().__init__(f"página {url} não obtida (status={status})")
+        self.url = url
+        self.status = status
+
+
+def _extract_page(extract_fn, parse_fn, html: str, url: str, discover: bool = False):
+    """
+    Trabalho de uma página no ParsePool: um único parse serve à extração, ao
+    link "próxima" e (com `discover`) à descoberta de páginas numeradas.
+    Retorna (items, next_url, page_urls); page_urls é None sem `discover`.
+    """
+    doc = parse_fn(html) if parse_fn else html
+    next_url = get_next_page_url(doc, url, url)
+    if next_url and is_same_page(url, next_url):
+        next_url = None
+    page_urls = discover_page_urls(doc, url, next_url) if discover else None
+    return extract_fn(doc, url), next_url, page_urls
+
+
+def _resolve(page):
+    """(next_url, page_urls) de process(); com o pool, espera o worker só aqui."""
+    if isinstance(page, Future):
+        _items, next_url, page_urls = page.result()
+        return next_url, page_urls
+    return page
+
+
+def _crawl(
     start_url: str,
     fetch_fn,
     extract_fn,
     max_pages: int | None = None,
-    seen_urls: set | None = None,
+    seen_urls: UrlSeenSet | set | None = None,
     logger=None,
+    parse_fn=None,
+    checkpoint=None,
+    parse_pool=None,
+    fetch_many_fn=None,
+    enrich_fn=None,
+    metrics=None,
+    fingerprints=None,
+    raise_on_error: bool = False,
 ):
     """
-    Itera páginas, chama fetch_fn(url) -> html e extract_fn(html) -> items.
-    Retorna lista de (url, html, items) por página.
+    Gerador base da paginação: produz (url, html, items) a cada página.
+    Com `checkpoint` (CrawlCheckpoint), cada página concluída é registrada
+    junto com a próxima URL pendente antes de ser entregue ao consumidor.
+    Com `parse_pool` (ParsePool), parse, extração e link "próxima" rodam num
+    único parse em outro processo (_extract_page) enquanto as páginas
+    descobertas são buscadas; a saída mantém a ordem. Seguindo só o link
+    "próxima", a busca da página seguinte espera o worker dela.
+    Com `fetch_many_fn(urls) -> [(html, status)]` (ex.: AsyncFetcher.fetch_all),
+    as páginas numeradas descobertas na primeira página são buscadas em
+    paralelo; sem padrão reconhecível, segue o link "próxima" normalmente.
+    Com `enrich_fn(items) -> items` (ex.: DetailEnricher.enrich), os itens são
+    completados no processo principal antes do checkpoint e da entrega.
+    Com `metrics` (RunMetrics), mede fetch, parse, extract, pagination,
+    enrich e checkpoint e conta páginas e itens.
+    Com `fingerprints` (FingerprintStore), página com o mesmo fingerprint da
+    execução anterior não é parseada, extraída nem enriquecida: sai sem itens
+    e segue pela próxima URL guardada; as demais registram o delta.
+    Se fetch_fn devolver StreamedPage (fetch com streaming.StreamReader), os
+    itens e a próxima URL já vêm extraídos: a página pula parse e extração
+    (e o fingerprint, que precisa do HTML).
+    Falha de fetch encerra o crawl; com `raise_on_error`, depois de entregar
+    as páginas já obtidas, levanta FetchError (ex.: para o CrawlScheduler
+    contar a seed como falha em vez de concluída).
     """
-    seen = seen_urls or set()
-    results: list[tuple[str, str, list]] = []
+    seen = seen_urls if seen_urls is not None else UrlSeenSet()
     current_url = start_url
     page_count = 0
+    emitted = 0
+    discovered = fetch_many_fn is None
+    failure: tuple[str, str] | None = None  # (url, status) da primeira falha do crawl
+    # Páginas aguardando a extração no pool: (url, html, future, fingerprint);
+    # o future resolve em (items, next_url, page_urls)
+    pending: deque = deque()
+
+    def finish(url: str, html: str, items: list | None, next_url: str | None, fingerprint=None):
+        """items None: página inalterada (fingerprint igual ao da execução anterior)."""
+        nonlocal emitted
+        emitted += 1
+        if items is None:
+            items = []
+            if logger:
+                logger.info("Página %d inalterada: %s", emitted, url)
+            if metrics is not None:
+                metrics.count("pages_unchanged")
+        else:
+            if enrich_fn is not None:
+                with timed(metrics, "enrich"):
+                    items = enrich_fn(items)
+            if fingerprint is not None:
+                with timed(metrics, "fingerprint"):
+                    fingerprints.record(url, fingerprint, next_url, items)
+            if logger:
+                logger.info("Página %d processada: %s (%d itens)", emitted, url, len(items))
+        if checkpoint is not None:
+            with timed(metrics, "checkpoint"):
+                checkpoint.record_page(url, items, next_url)
+        if metrics is not None:
+            metrics.count("pages")
+            metrics.count("items", len(items))
+        return url, html, items
+
+    def drain(block: bool = False):
+        """Entrega, na ordem, as páginas do pool já extraídas (todas, com `block`)."""
+        while pending and (block or pending[0][2].done() or len(pending) > parse_pool.max_pending):
+            done_url, page_html, fut, fp = pending.popleft()
+            items, nxt, _page_urls = fut.result()
+            yield finish(done_url, page_html, items, nxt, fp)
+
+    def ready(url: str, html, items: list | None, next_url: str | None, page_urls):
+        """Página sem extração pendente: entrega já ou entra na fila do pool (ordem)."""
+        if parse_pool is None:
+            yield finish(url, html, items, next_url)
+        else:
+            future = Future()
+            future.set_result((items, next_url, page_urls))
+            pending.append((url, html, future, None))
+            yield from drain()
+        return next_url, page_urls
+
+    def process(url: str, html, discover: bool = False):
+        """
+        Extrai a página (inline ou no pool); retorna (next_url, page_urls),
+        ou, com o pool, o Future do worker (ver _resolve). page_urls só é
+        calculado com `discover`.
+        """
+        nonlocal page_count
+        page_count += 1
+        if isinstance(html, StreamedPage):
+            next_url = html.next_url
+            if next_url and is_same_page(url, next_url):
+                next_url = None
+            # A marcação da paginação basta para a descoberta de páginas
+            page_urls = discover_page_urls(html.pager_html, url, next_url) if discover else None
+            return (yield from ready(url, html, html.items, next_url, page_urls))
+        fingerprint = None
+        if fingerprints is not None:
+            with timed(metrics, "fingerprint"):
+                fingerprint = fingerprints.fingerprint(html)
+                unchanged, next_url = fingerprints.check(url, fingerprint)
+            if unchanged:
+                # Página inalterada não é parseada: a descoberta lê o HTML
+                page_urls = discover_page_urls(html, url, next_url) if discover else None
+                return (yield from ready(url, html, None, next_url, page_urls))
+
+        if parse_pool is not None:
+            future = parse_pool.submit(_extract_page, extract_fn, parse_fn, html, url, discover)
+            pending.append((url, html, future, fingerprint))
+            yield from drain()
+            return future
+
+        if parse_fn:
+            with timed(metrics, "parse"):
+                doc = parse_fn(html)
+        else:
+            doc = html
+        with timed(metrics, "pagination"):
+            next_url = get_next_page_url(doc, url, url)
+            if next_url and is_same_page(url, next_url):
+                next_url = None
+            page_urls = discover_page_urls(doc, url, next_url) if discover else None
+        with timed(metrics, "extract"):
+            items = extract_fn(doc, url)
+        yield finish(url, html, items, next_url, fingerprint)
+        return next_url, page_urls
+
+    def fan_out(urls: list[str]):
+        """
+        Busca as páginas descobertas em lotes paralelos; retorna a next_url da
+        última página. Uma falha não descarta o resto do lote: as páginas
+        obtidas são processadas e a falha fica registrada. Só um lote inteiro
+        com falha (host fora do ar, circuito aberto) encerra a busca.
+        """
+        nonlocal failure
+        last = None
+        last_failed = False
+        for i in range(0, len(urls), DISCOVERY_BATCH):
+            batch = [u for u in urls[i : i + DISCOVERY_BATCH] if u not in seen]
+            if max_pages is not None:
+                batch = batch[: max(max_pages - page_count, 0)]
+            if not batch:
+                break
+            seen.update(batch)
+            with timed(metrics, "fetch"):
+                results = fetch_many_fn(batch)
+            failed = 0
+            for url, (html, status) in zip(batch, results):
+                last_failed = not html or status != "ok"
+                if last_failed:
+                    if logger:
+                        logger.warning("Falha ao obter página: %s (status=%s)", url, status)
+                    if fingerprints is not None:
+                        fingerprints.mark_incomplete()
+                    if failure is None:
+                        failure = (url, status)
+                    failed += 1
+                    continue
+                last = yield from process(url, html)
+            if failed == len(batch):
+                if logger:
+                    logger.warning("Lote inteiro falhou; interrompendo a busca paralela")
+                return None
+        if last is None or last_failed:
+            # Sem a última página não há como seguir a paginação além dela
+            return None
+        return _resolve(last)[0]
 
     while current_url:
         if max_pages is not None and page_count >= max_pages:
             if logger:
                 logger.info("Limite de %d páginas atingido", max_pages)
+            if fingerprints is not None:
+                fingerprints.mark_incomplete()
             break
 
         if current_url in seen:
@@ -74,22 +347,228 @@ def paginate(
             break
         seen.add(current_url)
 
-        html, status = fetch_fn(current_url)
+        with timed(metrics, "fetch"):
+            html, status = fetch_fn(current_url)
         if not html or status != "ok":
             if logger:
                 logger.warning("Falha ao obter página: %s (status=%s)", current_url, status)
+            if fingerprints is not None:
+                fingerprints.mark_incomplete()
+            failure = (current_url, status)
             break
 
-        items = extract_fn(html, current_url)
-        results.append((current_url, html, items))
-        page_count += 1
+        page = yield from process(current_url, html, discover=not discovered)
+        next_url, page_urls = _resolve(page)
 
-        if logger:
-            logger.info("Página %d processada: %s (%d itens)", page_count, current_url, len(items))
+        if not discovered:
+            discovered = True
+            urls = [u for u in page_urls or () if not is_same_page(current_url, u)]
+            if urls:
+                if logger:
+                    logger.info("Descobertas %d páginas numeradas; buscando em paralelo", len(urls))
+                next_url = yield from fan_out(urls)
 
-        next_url = get_next_page_url(html, current_url, current_url)
-        if not next_url or is_same_page(current_url, next_url):
+        if not next_url:
             break
         current_url = next_url
 
-    return results
+    yield from drain(block=True)
+    if failure is not None and raise_on_error:
+        raise FetchError(*failure)
+
+
+def iter_pages(
+    start_url: str,
+    fetch_fn,
+    extract_fn,
+    max_pages: int | None = None,
+    seen_urls: UrlSeenSet | set | None = None,
+    logger=None,
+    parse_fn=None,
+    checkpoint=None,
+    parse_pool=None,
+    fetch_many_fn=None,
+    enrich_fn=None,
+    metrics=None,
+    fingerprints=None,
+    raise_on_error: bool = False,
+):
+    """
+    Versão streaming de paginate: gera (url, items) assim que cada página é
+    processada. O HTML não é retido, então a memória fica constante mesmo em
+    crawls de milhares de páginas e os itens podem ser exportados na hora.
+    """
+    for url, _html, items in _crawl(
+        start_url,
+        fetch_fn,
+        extract_fn,
+        max_pages=max_pages,
+        seen_urls=seen_urls,
+        logger=logger,
+        parse_fn=parse_fn,
+        checkpoint=checkpoint,
+        parse_pool=parse_pool,
+        fetch_many_fn=fetch_many_fn,
+        enrich_fn=enrich_fn,
+        metrics=metrics,
+        fingerprints=fingerprints,
+        raise_on_error=raise_on_error,
+    ):
+        yield url, items
+
+
+def paginate(
+    start_url: str,
+    fetch_fn,
+    extract_fn,
+    max_pages: int | None = None,
+    seen_urls: UrlSeenSet | set | None = None,
+    logger=None,
+    parse_fn=None,
+    checkpoint=None,
+    parse_pool=None,
+    fetch_many_fn=None,
+    enrich_fn=None,
+    metrics=None,
+    fingerprints=None,
+    raise_on_error: bool = False,
+):
+    """
+    Itera páginas, chama fetch_fn(url) -> html e extract_fn(html) -> items.
+    Com parse_fn(html) -> doc, cada página é parseada uma única vez e o mesmo
+    documento vai para extract_fn(doc, url) e para a detecção da próxima página.
+    Retorna lista de (url, html, items) por página.
+    Para crawls grandes prefira iter_pages, que não acumula o HTML.
+    Com `raise_on_error`, falha de fetch levanta FetchError (ver _crawl).
+    """
+    return list(
+        _crawl(
+            start_url,
+            fetch_fn,
+            extract_fn,
+            max_pages=max_pages,
+            seen_urls=seen_urls,
+            logger=logger,
+            parse_fn=parse_fn,
+            checkpoint=checkpoint,
+            parse_pool=parse_pool,
+            fetch_many_fn=fetch_many_fn,
+            enrich_fn=enrich_fn,
+            metrics=metrics,
+            fingerprints=fingerprints,
+            raise_on_error=raise_on_error,
+        )
+    )
+
+
+def _ack(frontier, url: str, worker_id: str, logger, metrics) -> None:
+    if frontier.ack(url, worker_id):
+        return
+    # Lease vencido: a página já voltou à fila (ou está com outro worker)
+    if logger:
+        logger.warning("Lease vencido antes do ack, a página será refeita: %s", url)
+    if metrics is not None:
+        metrics.count("frontier_stale_ack")
+
+
+def _fail(frontier, url: str, worker_id: str, status: str, max_attempts: int, logger, metrics):
+    """Fetch falhou: a URL volta à fila ou, esgotadas as tentativas, fica em FAILED."""
+    outcome = frontier.fail(url, worker_id, max_attempts)
+    if outcome == "failed":
+        if logger:
+            logger.error(
+                "Página desistida após %d tentativas: %s (status=%s)", max_attempts, url, status
+            )
+        if metrics is not None:
+            metrics.count("frontier_failed")
+    elif outcome == "retry":
+        if logger:
+            logger.warning("Falha ao obter página, volta à fila: %s (status=%s)", url, status)
+        if metrics is not None:
+            metrics.count("frontier_retry")
+    elif logger:
+        logger.warning("Lease vencido antes da falha ser registrada: %s", url)
+
+
+def iter_frontier(
+    frontier,
+    worker_id: str,
+    fetch_fn,
+    extract_fn,
+    max_pages: int | None = None,
+    logger=None,
+    parse_fn=None,
+    lease: float = 300,
+    idle_wait: float = 0.5,
+    enrich_fn=None,
+    metrics=None,
+    max_attempts: int = MAX_ATTEMPTS,
+):
+    """
+    Loop de worker sobre um Frontier compartilhado: reivindica uma URL,
+    extrai os itens, enfileira a próxima página (e, na primeira vez que a
+    cadeia é vista, todas as páginas numeradas descobertas) e gera
+    (url, items). O ack vem depois que o consumidor recebeu os itens; se o
+    worker morrer antes, o lease vence e outra instância refaz a página.
+    Página que falha volta à fila até `max_attempts` falhas e então fica em
+    FAILED (métrica frontier_failed); com o circuit breaker do host aberto
+    ('circuit_open') ela é devolvida sem contar tentativa e o worker espera
+    `idle_wait`, em vez de esvaziar a fila compartilhada.
+    Termina quando a fila está vazia e nenhum worker tem páginas em andamento.
+    """
+    pages = 0
+    while max_pages is None or pages < max_pages:
+        claimed = frontier.claim(worker_id, 1, lease)
+        if not claimed:
+            if frontier.is_finished():
+                break
+            # Outros workers ainda podem enfileirar páginas
+            time.sleep(idle_wait)
+            continue
+        url = claimed[0]
+
+        with timed(metrics, "fetch"):
+            html, status = fetch_fn(url)
+        if status == "circuit_open":
+            frontier.release(url, worker_id)
+            time.sleep(idle_wait)
+            continue
+        pages += 1
+        if not html or status != "ok":
+            _fail(frontier, url, worker_id, status, max_attempts, logger, metrics)
+            continue
+
+        streamed = isinstance(html, StreamedPage)
+        if streamed:
+            doc = html.pager_html
+        elif parse_fn:
+            with timed(metrics, "parse"):
+                doc = parse_fn(html)
+        else:
+            doc = html
+        with timed(metrics, "pagination"):
+            next_url = html.next_url if streamed else get_next_page_url(doc, url, url)
+            if next_url and is_same_page(url, next_url):
+                next_url = None
+            new_urls = []
+            if next_url:
+                # Próxima já conhecida: a cadeia foi descoberta antes, não repete
+                if not frontier.seen(next_url):
+                    new_urls = discover_page_urls(doc, url, next_url) or [next_url]
+            if new_urls:
+                frontier.add(new_urls)
+        if streamed:
+            items = html.items
+        else:
+            with timed(metrics, "extract"):
+                items = extract_fn(doc, url)
+        if enrich_fn is not None:
+            with timed(metrics, "enrich"):
+                items = enrich_fn(items)
+        if logger:
+            logger.info("Página processada (%s): %s (%d itens)", worker_id, url, len(items))
+        if metrics is not None:
+            metrics.count("pages")
+            metrics.count("items", len(items))
+        yield url, items
+        _ack(frontier, url, worker_id, logger, metrics)
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""Módulo de pipeline: extração paralela em pool de processos."""
+
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+
+
+class ParsePool:
+    """
+    Pool de processos para a etapa de extração (BeautifulSoup fora do GIL).
+
+    O HTML é enviado a um worker, que o parseia uma vez e devolve os Items e
+    o link da próxima página; quem consome (paginate/iter_pages) mantém a
+    ordem das páginas. `max_pending` limita
+    quantas páginas ficam em voo, o que mantém a memória sob controle.
+    A função submetida precisa ser picklable (função de módulo ou partial).
+    """
+
+    def __init__(self, workers: int | None = None, max_pending: int | None = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 2
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def submit(self, fn, *args) -> Future:
+        return self._executor.submit(fn, *args)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
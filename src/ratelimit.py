@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""Módulo de rate limiting: token bucket por domínio, adaptativo a 429/Retry-After."""
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Converte header Retry-After (segundos ou data HTTP) em segundos de espera."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class TokenBucket:
+    """
+    Token bucket com reserva: cada chamada a reserve() consome um token e
+    retorna quanto tempo esperar até ele estar disponível. Tokens negativos
+    representam reservas já agendadas, o que mantém a taxa exata mesmo com
+    várias threads/corrotinas disputando o mesmo domínio.
+
+    Uma pausa (paused_until) desloca a agenda: sem tokens acumulados, a
+    primeira reserva sai no fim da pausa e as seguintes a cada 1/rate, em
+    vez de todas juntas.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def reserve(self, now: float) -> float:
+        if self.paused_until > self.updated:
+            # Pausa nova: a agenda recomeça no fim dela, sem rajada acumulada
+            # (reservas já agendadas que saem antes do fim da pausa não contam)
+            backlog_end = self.updated - min(self.tokens, 0.0) / self.rate
+            if backlog_end <= self.paused_until:
+                self.tokens = 1.0
+                self.updated = self.paused_until
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return self.updated - now + wait
+
+
+class RateLimiter:
+    """
+    Limita requisições por domínio a `rate` req/s com rajada de até `burst`.
+
+    Thread-safe e utilizável tanto no caminho síncrono (acquire) quanto no
+    assíncrono (acquire_async). A taxa é adaptativa: on_throttle() (429 ou
+    Retry-After) reduz a taxa do domínio pela metade e pausa até o prazo
+    pedido pelo servidor; on_success() recupera gradualmente até `rate`.
+    """
+
+    def __init__(self, rate: float = 1.0, burst: int = 1, min_rate: float | None = None):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate deve ser > 0 e burst >= 1")
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate if min_rate is not None else rate / 16
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+    def reserve(self, url: str) -> float:
+        """Reserva um slot para a URL e retorna os segundos de espera."""
+        with self._lock:
+            return self._bucket(url).reserve(time.monotonic())
+
+    def acquire(self, url: str) -> None:
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, url: str) -> None:
+        delay = self.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def on_success(self, url: str) -> None:
+        """Aumento aditivo da taxa do domínio, até o limite configurado."""
+        with self._lock:
+            bucket = self._bucket(url)
+            if bucket.rate < self.rate:
+                bucket.rate = min(self.rate, bucket.rate + self.rate / 10)
+
+    def on_throttle(self, url: str, retry_after: float | None = None) -> None:
+        """Servidor pediu calma: reduz a taxa à metade e respeita Retry-After."""
+        with self._lock:
+            bucket = self._bucket(url)
+            bucket.rate = max(self.min_rate, bucket.rate / 2)
+            if retry_after:
+                bucket.paused_until = max(bucket.paused_until, time.monotonic() + retry_after)
+
+    def current_rate(self, url: str) -> float:
+        with self._lock:
+            return self._bucket(url).rate
+
+
+# Limiter compartilhado quando o chamador não fornece um (≈ 1 req/s por domínio)
+default_rate_limiter = RateLimiter()
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""Módulo de resiliência: classificação de erros para retry, orçamento de retries e circuit breaker por host."""
+
+import threading
+import time
+from urllib.parse import urlparse
+
+# Status de transporte que justificam nova tentativa com backoff
+RETRY_STATUSES = ("timeout", "connection_error", "http_error")
+
+# 4xx que valem nova tentativa: timeout do servidor e throttling; os demais
+# (404, 403, 410...) não mudam com outra tentativa
+RETRY_4XX = (408, 429)
+
+# 5xx que indicam falta de suporte, não falha passageira
+NO_RETRY_5XX = (501, 505)
+
+
+def is_retryable(status: str, code: int | None = None) -> bool:
+    """
+    Decide se a tentativa deve ser repetida: timeout e erro de conexão sim;
+    erro HTTP só para 5xx (exceto 501/505), 408 e 429.
+    """
+    if status not in RETRY_STATUSES:
+        return False
+    if status != "http_error" or code is None:
+        return True
+    if code >= 500:
+        return code not in NO_RETRY_5XX
+    return code in RETRY_4XX
+
+
+def is_host_failure(status: str, code: int | None = None) -> bool:
+    """Falha que indica host doente (conta no circuit breaker): timeout, conexão e 5xx."""
+    if status in ("timeout", "connection_error"):
+        return True
+    return status == "http_error" and code is not None and code >= 500
+
+
+class RetryBudget:
+    """
+    Orçamento de retries por host: cada primeira tentativa deposita `ratio`
+    tokens (até `max_tokens`) e cada retry consome 1. Com o host falhando em
+    massa, os retries ficam limitados a ~`ratio` do tráfego em vez de
+    multiplicar as requisições por max_retries. `min_tokens` é o saldo
+    inicial, para os primeiros erros ainda terem retry.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_tokens: float = 10, max_tokens: float = 100):
+        if ratio < 0 or min_tokens < 0 or max_tokens < min_tokens:
+            raise ValueError("ratio >= 0 e 0 <= min_tokens <= max_tokens")
+        self.ratio = ratio
+        self.min_tokens = min_tokens
+        self.max_tokens = max_tokens
+        self._tokens: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.denied = 0
+
+    def on_request(self, url: str) -> None:
+        host = urlparse(url).netloc
+        with self._lock:
+            tokens = self._tokens.get(host, self.min_tokens)
+            self._tokens[host] = min(self.max_tokens, tokens + self.ratio)
+
+    def try_spend(self, url: str) -> bool:
+        """Consome 1 token para um retry; False se o orçamento do host acabou."""
+        host = urlparse(url).netloc
+        with self._lock:
+            tokens = self._tokens.get(host, self.min_tokens)
+            if tokens < 1:
+                self.denied += 1
+                return False
+            self._tokens[host] = tokens - 1
+            return True
+
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class _HostCircuit:
+    __slots__ = ("state", "failures", "opened_at", "probe_at")
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_at = 0.0
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por host (closed -> open -> half-open).
+
+    - closed: requisições normais; `failure_threshold` falhas de host
+      seguidas (timeout, conexão, 5xx) abrem o circuito.
+    - open: allow() recusa na hora (sem rede, sem backoff) por
+      `reset_timeout` segundos.
+    - half-open: passado o prazo, uma única requisição de sonda passa;
+      sucesso fecha o circuito, falha reabre por mais `reset_timeout`.
+      Sonda sem resposta em `reset_timeout` libera outra.
+    Respostas 4xx não contam: o host está respondendo.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        if failure_threshold < 1 or reset_timeout <= 0:
+            raise ValueError("failure_threshold deve ser >= 1 e reset_timeout > 0")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._hosts: dict[str, _HostCircuit] = {}
+        self._lock = threading.Lock()
+        self.stats = {"opened": 0, "rejected": 0, "probes": 0}
+
+    def _circuit(self, url: str) -> _HostCircuit:
+        host = urlparse(url).netloc
+        circuit = self._hosts.get(host)
+        if circuit is None:
+            circuit = self._hosts[host] = _HostCircuit()
+        return circuit
+
+    def allow(self, url: str) -> bool:
+        """True se a requisição pode ir à rede agora."""
+        now = time.monotonic()
+        with self._lock:
+            circuit = self._circuit(url)
+            if circuit.state == CLOSED:
+                return True
+            if circuit.state == OPEN and now - circuit.opened_at >= self.reset_timeout:
+                circuit.state = HALF_OPEN
+                circuit.probe_at = 0.0
+            if circuit.state == HALF_OPEN and now - circuit.probe_at >= self.reset_timeout:
+                circuit.probe_at = now
+                self.stats["probes"] += 1
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    def record_success(self, url: str) -> None:
+        with self._lock:
+            circuit = self._circuit(url)
+            circuit.state = CLOSED
+            circuit.failures = 0
+
+    def record_failure(self, url: str) -> bool:
+        """Registra falha de host; True se esta falha abriu o circuito."""
+        with self._lock:
+            circuit = self._circuit(url)
+            circuit.failures += 1
+            if circuit.state == HALF_OPEN or (
+                circuit.state == CLOSED and circuit.failures >= self.failure_threshold
+            ):
+                circuit.state = OPEN
+                circuit.opened_at = time.monotonic()
+                self.stats["opened"] += 1
+                return True
+            return False
+
+    def state(self, url: str) -> str:
+        with self._lock:
+            return self._circuit(url).state
+
+    def open_hosts(self) -> list[str]:
+        with self._lock:
+            return [host for host, c in self._hosts.items() if c.state != CLOSED]
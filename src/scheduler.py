@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""Módulo de agendamento multi-seed: filas por domínio, rodízio justo e limite global."""
+
+import queue
+import threading
+from collections import deque
+from urllib.parse import urlparse
+
+
+def read_seed_file(path) -> list[str]:
+    """Lê URLs (uma por linha); ignora linhas vazias e comentários com #."""
+    seeds = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            url = line.split("#", 1)[0].strip()
+            if url:
+                seeds.append(url)
+    return seeds
+
+
+class CrawlScheduler:
+    """
+    Executa vários crawls (um por seed) no mesmo processo.
+
+    As seeds ficam em filas por domínio, atendidas em rodízio: cada worker
+    pega a próxima seed do próximo domínio que ainda tem vaga, então um
+    domínio com 40 listagens não monopoliza os workers enquanto outros
+    esperam. No máximo `concurrency` seeds rodam ao mesmo tempo no total e
+    `per_domain` por domínio (o ritmo de requisições continua com o
+    RateLimiter de cada domínio).
+
+    `crawl_fn(seed) -> iterável de (url, items)` roda em threads; os itens
+    chegam ao chamador (thread principal) por run(), prontos para um único
+    conjunto de writers. Adicione todas as seeds antes de chamar run().
+    Uma seed só conta como concluída se crawl_fn termina sem exceção: para
+    falhas de fetch contarem como falha, use iter_pages(raise_on_error=True).
+    """
+
+    def __init__(self, crawl_fn, concurrency: int = 4, per_domain: int = 1, logger=None):
+        if concurrency < 1 or per_domain < 1:
+            raise ValueError("concurrency e per_domain devem ser >= 1")
+        self.crawl_fn = crawl_fn
+        self.concurrency = concurrency
+        self.per_domain = per_domain
+        self.logger = logger
+        self.stats = {"seeds": 0, "done": 0, "failed": 0, "pages": 0}
+        self._queues: dict[str, deque] = {}
+        self._rotation: deque[str] = deque()
+        self._active: dict[str, int] = {}
+        self._seeds: set[str] = set()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+
+    def add(self, url: str) -> bool:
+        """Enfileira uma seed no seu domínio; False se já estava agendada."""
+        with self._cond:
+            if url in self._seeds:
+                return False
+            self._seeds.add(url)
+            host = urlparse(url).netloc
+            if host not in self._queues:
+                self._queues[host] = deque()
+                self._rotation.append(host)
+                self._active[host] = 0
+            self._queues[host].append(url)
+            self.stats["seeds"] += 1
+            self._cond.notify()
+            return True
+
+    def add_many(self, urls) -> int:
+        return sum(self.add(url) for url in urls)
+
+    def _claim(self) -> tuple[str, str] | None:
+        """Próxima (domínio, seed) em rodízio; None quando não há mais seeds."""
+        with self._cond:
+            while not self._stop.is_set():
+                if not any(self._queues.values()):
+                    return None
+                for _ in range(len(self._rotation)):
+                    host = self._rotation[0]
+                    self._rotation.rotate(-1)
+                    if self._queues[host] and self._active[host] < self.per_domain:
+                        self._active[host] += 1
+                        return host, self._queues[host].popleft()
+                # Todos os domínios com seeds pendentes estão no limite
+                self._cond.wait()
+            return None
+
+    def _release(self, host: str) -> None:
+        with self._cond:
+            self._active[host] -= 1
+            self._cond.notify_all()
+
+    def _put(self, out: queue.Queue, message) -> bool:
+        """put com saída antecipada se o consumidor desistiu (stop)."""
+        while not self._stop.is_set():
+            try:
+                out.put(message, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _worker(self, out: queue.Queue) -> None:
+        try:
+            while True:
+                claimed = self._claim()
+                if claimed is None:
+                    return
+                host, seed = claimed
+                try:
+                    for url, items in self.crawl_fn(seed):
+                        if not self._put(out, ("page", seed, url, items)):
+                            return
+                except Exception as e:
+                    self._put(out, ("error", seed, e))
+                else:
+                    self._put(out, ("seed_done", seed))
+                finally:
+                    self._release(host)
+        finally:
+            out.put(("worker_done",))
+
+    def run(self):
+        """Gera (seed, url, items) conforme as páginas de todas as seeds ficam prontas."""
+        out: queue.Queue = queue.Queue(maxsize=self.concurrency * 2)
+        workers = [
+            threading.Thread(target=self._worker, args=(out,), daemon=True)
+            for _ in range(self.concurrency)
+        ]
+        for t in workers:
+            t.start()
+        running = len(workers)
+        try:
+            while running:
+                message = out.get()
+                kind = message[0]
+                if kind == "page":
+                    _, seed, url, items = message
+                    self.stats["pages"] += 1
+                    yield seed, url, items
+                elif kind == "seed_done":
+                    self.stats["done"] += 1
+                    if self.logger:
+                        self.logger.info("Seed concluída: %s", message[1])
+                elif kind == "error":
+                    self.stats["failed"] += 1
+                    if self.logger:
+                        self.logger.error("Falha no crawl da seed %s: %s", message[1], message[2])
+                else:
+                    running -= 1
+        finally:
+            # Consumidor saiu antes do fim (break/exceção): libera os workers
+            self._stop.set()
+            with self._cond:
+                self._cond.notify_all()
+            while running:
+                try:
+                    if out.get(timeout=0.2)[0] == "worker_done":
+                        running -= 1
+                except queue.Empty:
+                    if not any(t.is_alive() for t in workers):
+                        break
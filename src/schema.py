@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""Módulo de schemas de site: extratores declarativos compilados uma única vez."""
+
+import json
+from dataclasses import MISSING
+from dataclasses import fields as dataclass_fields
+from pathlib import Path
+from urllib.parse import urljoin
+
+import soupsieve as sv
+from bs4 import BeautifulSoup
+
+from .document import as_soup
+from .item import Item
+from .utils import normalize_text, parse_price, parse_rating
+
+
+def _truncate(value, _base_url: str, size: str = "100"):
+    n = int(size)
+    return value[:n] + "..." if len(value) > n else value
+
+
+# Pós-processadores disponíveis nos schemas: nome -> f(valor, base_url, *args)
+POSTPROCESSORS = {
+    "normalize_text": lambda v, _base: normalize_text(v),
+    "parse_price": lambda v, _base: parse_price(v),
+    "parse_rating": lambda v, _base: parse_rating(v),
+    "urljoin": lambda v, base: urljoin(base, v) if v else "",
+    "truncate": _truncate,
+    "int": lambda v, _base: int(v) if v not in (None, "") else None,
+}
+
+# Schema do Books to Scrape, equivalente a extract_items_books_toscrape
+BOOKS_TOSCRAPE = {
+    "name": "books_toscrape",
+    "container": ["article.product_pod", "ol.row li.col-xs-6"],
+    "fields": {
+        "nome": {
+            "selectors": ["h3 a", "a[title]"],
+            "attr": ["title", "text"],
+            "post": ["normalize_text"],
+        },
+        "link": {"selectors": ["h3 a", "a[title]"], "attr": "href", "post": ["urljoin"]},
+        "preco": {"selectors": [".price_color", "p.price_color"], "post": ["parse_price"]},
+        "rating": {"selectors": ["p.star-rating"], "attr": "class", "post": ["parse_rating"]},
+        "disponibilidade": {
+            "selectors": [".instock.availability", "p.instock_availability", ".availability"],
+            "post": ["normalize_text"],
+        },
+        "categoria": {"value": "Livros"},
+        "descricao": {"from": "nome", "post": ["truncate:100"]},
+    },
+}
+
+SCHEMAS: dict[str, dict] = {"books_toscrape": BOOKS_TOSCRAPE}
+
+_ITEM_FIELDS = {f.name: f for f in dataclass_fields(Item) if f.name != "raw"}
+# Valor quando nenhum seletor casa: None para numéricos, "" para texto
+_NULLABLE = {"preco", "rating", "estoque"}
+
+
+class _AdaptiveSelectors:
+    """
+    Lista ordenada de seletores pré-compilados (soupsieve). Quando um fallback
+    casa, ele passa para o início: nos próximos produtos/páginas o seletor
+    que funciona neste site é avaliado primeiro.
+    """
+
+    def __init__(self, selectors: list[str]):
+        self._compiled = tuple((s, sv.compile(s)) for s in selectors)
+
+    def _promote(self, compiled: tuple, i: int) -> None:
+        # Tupla nova trocada de uma vez: quem está iterando segue com o seu
+        # snapshot. Entre threads, a última promoção vence, o que basta para
+        # uma heurística de ordem
+        if i:
+            self._compiled = (compiled[i],) + compiled[:i] + compiled[i + 1 :]
+
+    def select_one(self, node):
+        compiled = self._compiled
+        for i, (_sel, pattern) in enumerate(compiled):
+            el = pattern.select_one(node)
+            if el is not None:
+                self._promote(compiled, i)
+                return el
+        return None
+
+    def select(self, node) -> list:
+        compiled = self._compiled
+        for i, (_sel, pattern) in enumerate(compiled):
+            found = pattern.select(node)
+            if found:
+                self._promote(compiled, i)
+                return found
+        return []
+
+    @property
+    def order(self) -> list[str]:
+        return [sel for sel, _ in self._compiled]
+
+
+class _Field:
+    def __init__(self, name: str, spec: dict):
+        self.name = name
+        self.const = spec.get("value")
+        self.source = spec.get("from")
+        self.selectors = _AdaptiveSelectors(spec["selectors"]) if spec.get("selectors") else None
+        attrs = spec.get("attr", "text")
+        self.attrs = [attrs] if isinstance(attrs, str) else list(attrs)
+        self.default = spec.get("default", None if name in _NULLABLE else "")
+        self.post = []
+        for entry in spec.get("post", []):
+            fn_name, *args = entry.split(":")
+            if fn_name not in POSTPROCESSORS:
+                raise ValueError(f"Pós-processador desconhecido no campo {name}: {fn_name}")
+            self.post.append((POSTPROCESSORS[fn_name], args))
+        if self.selectors is None and self.const is None and self.source is None:
+            raise ValueError(f"Campo {name} precisa de 'selectors', 'value' ou 'from'")
+
+    def _read(self, el):
+        for attr in self.attrs:
+            value = el.get_text() if attr == "text" else el.get(attr)
+            if value:
+                return value
+        return None
+
+    def extract(self, node, base_url: str, values: dict):
+        if self.const is not None:
+            return self.const
+        if self.source is not None:
+            value = values.get(self.source)
+        else:
+            el = self.selectors.select_one(node)
+            value = self._read(el) if el is not None else None
+        if value is None:
+            return self.default
+        for fn, args in self.post:
+            value = fn(value, base_url, *args)
+        return value
+
+
+class CompiledExtractor:
+    """
+    Extrator gerado a partir de um schema; reutilizável entre páginas.
+    Picklable: no ParsePool segue só o schema e a chave de conteúdo, e cada
+    worker compila uma vez (ver _restore_extractor).
+    """
+
+    def __init__(self, schema: dict):
+        self.schema = schema
+        self.key = _schema_key(schema)
+        self.name = schema.get("name", "custom")
+        container = schema["container"]
+        if isinstance(container, str):
+            container = [container]
+        self.container = _AdaptiveSelectors(container)
+        unknown = set(schema["fields"]) - set(_ITEM_FIELDS)
+        if unknown:
+            raise ValueError(f"Campos desconhecidos no schema {self.name}: {sorted(unknown)}")
+        # Campos derivados ('from') por último, depois de suas fontes
+        specs = sorted(schema["fields"].items(), key=lambda kv: "from" in kv[1])
+        self.fields = [_Field(name, spec) for name, spec in specs]
+        self.defaults = {
+            name: None if name in _NULLABLE else ""
+            for name, f in _ITEM_FIELDS.items()
+            if name not in schema["fields"]
+            and f.default is MISSING
+            and f.default_factory is MISSING
+        }
+
+    def __call__(
+        self, html: str | BeautifulSoup, base_url: str, keep_raw: bool = False
+    ) -> list[Item]:
+        soup = as_soup(html)
+        items: list[Item] = []
+        for node in self.container.select(soup):
+            values: dict = {}
+            for field in self.fields:
+                values[field.name] = field.extract(node, base_url, values)
+            raw = dict(values) if keep_raw else None
+            items.append(Item(**self.defaults, **values, raw=raw))
+        return items
+
+    def __reduce__(self):
+        return _restore_extractor, (self.key, self.schema)
+
+
+def compile_schema(schema: dict) -> CompiledExtractor:
+    """Valida e compila o schema (seletores CSS pré-compilados)."""
+    return CompiledExtractor(schema)
+
+
+def load_schema(path: Path) -> dict:
+    """Lê um schema JSON (mesmo formato de BOOKS_TOSCRAPE)."""
+    with open(path, encoding="utf-8") as f:
+        schema = json.load(f)
+    schema.setdefault("name", Path(path).stem)
+    compile_schema(schema)  # falha cedo se o schema for inválido
+    return schema
+
+
+def _schema_key(schema: dict) -> str:
+    return json.dumps(schema, sort_keys=True)
+
+
+# Extratores compilados pelo conteúdo do schema (um cache por processo,
+# inclusive nos workers): schemas diferentes com o mesmo nome não se misturam
+_COMPILED: dict[str, CompiledExtractor] = {}
+# Atalho por id(): evita serializar o schema a cada chamada. Guarda o próprio
+# dict (o id não é reaproveitado enquanto ele vive) e é limitado, já que no
+# pool cada tarefa pode trazer uma cópia nova do schema
+_BY_ID: dict[int, tuple[dict, CompiledExtractor]] = {}
+_BY_ID_MAX = 64
+
+
+def _restore_extractor(key: str, schema: dict) -> CompiledExtractor:
+    extractor = _COMPILED.get(key)
+    if extractor is None:
+        extractor = _COMPILED[key] = compile_schema(schema)
+    return extractor
+
+
+def get_extractor(schema: dict) -> CompiledExtractor:
+    """
+    Extrator compilado do schema, do cache. O schema não deve ser alterado
+    depois do primeiro uso (o atalho por id() não perceberia a mudança).
+    """
+    entry = _BY_ID.get(id(schema))
+    if entry is not None and entry[0] is schema:
+        return entry[1]
+    extractor = _restore_extractor(_schema_key(schema), schema)
+    if len(_BY_ID) >= _BY_ID_MAX:
+        _BY_ID.clear()
+    _BY_ID[id(schema)] = (schema, extractor)
+    return extractor
+
+
+def extract_with_schema(
+    html: str | BeautifulSoup, base_url: str, schema: dict, keep_raw: bool = False
+) -> list[Item]:
+    """
+    Extrai itens com um schema declarativo. Para muitas páginas (e no
+    ParsePool), prefira compilar uma vez com get_extractor e passar o
+    CompiledExtractor, que é picklable.
+    """
+    return get_extractor(schema)(html, base_url, keep_raw=keep_raw)
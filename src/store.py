@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo de armazenamento: base SQLite local com o estado atual de cada item
+(chave: link) e histórico de preço/disponibilidade. Consultas pela linha
+de comando: src/store_cli.py.
+"""
+
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from .exporter import ItemWriter
+from .item import FIELDNAMES, Item, item_values
+
+STORE_FILE = "items.sqlite3"
+
+# Campos cuja mudança gera uma linha no histórico
+HISTORY_FIELDS = ("preco", "disponibilidade")
+
+# Links por consulta IN (...) na leitura do estado anterior
+_LOOKUP_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    link TEXT PRIMARY KEY,
+    nome TEXT NOT NULL,
+    preco REAL,
+    categoria TEXT,
+    descricao TEXT,
+    disponibilidade TEXT,
+    rating TEXT,
+    upc TEXT,
+    estoque INTEGER,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_categoria ON items (categoria, last_seen, link);
+CREATE INDEX IF NOT EXISTS items_last_seen ON items (last_seen, link);
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    link TEXT NOT NULL,
+    preco REAL,
+    disponibilidade TEXT,
+    preco_anterior REAL,
+    observed_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_link ON history (link, observed_at);
+CREATE INDEX IF NOT EXISTS history_observed_at ON history (observed_at);
+"""
+
+_UPSERT = """
+INSERT INTO items (nome, preco, categoria, descricao, disponibilidade, rating, link,
+                   upc, estoque, first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (link) DO UPDATE SET
+    nome = excluded.nome,
+    preco = excluded.preco,
+    categoria = excluded.categoria,
+    descricao = excluded.descricao,
+    disponibilidade = excluded.disponibilidade,
+    rating = excluded.rating,
+    upc = COALESCE(NULLIF(excluded.upc, ''), items.upc),
+    estoque = COALESCE(excluded.estoque, items.estoque),
+    last_seen = excluded.last_seen
+"""
+
+_LINK = FIELDNAMES.index("link")
+_HISTORY_IDX = tuple(FIELDNAMES.index(f) for f in HISTORY_FIELDS)  # preco primeiro
+
+
+def now_utc() -> str:
+    """Timestamp no formato do datetime() do SQLite (UTC), comparável como texto."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def parse_since(value: str) -> str:
+    """'30m', '24h', '7d' (relativo a agora) ou data/hora ISO -> timestamp UTC do banco."""
+    m = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([mhd])", value.strip())
+    if m:
+        unit = {"m": "minutes", "h": "hours", "d": "days"}[m.group(2)]
+        moment = datetime.now(timezone.utc) - timedelta(**{unit: float(m.group(1))})
+    else:
+        moment = datetime.fromisoformat(value.strip())
+        if moment.tzinfo is None:
+            moment = moment.astimezone()
+        moment = moment.astimezone(timezone.utc)
+    return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+
+class ItemStore:
+    """
+    Base SQLite (WAL) com o estado atual de cada item e o histórico.
+
+    - upsert_many(items): um lote por transação; insere ou atualiza pelo
+      link e só grava histórico quando o item é novo ou o preço/a
+      disponibilidade mudou. UPC e estoque vazios (sem --enrich) não apagam
+      os valores já conhecidos.
+    - touch(links): só renova o last_seen (itens de página inalterada no
+      --delta, que não são extraídos de novo).
+    - latest / price_changes / history / counts: consultas indexadas por
+      link, categoria e data.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _previous(self, links: list[str]) -> dict[str, tuple]:
+        previous = {}
+        for i in range(0, len(links), _LOOKUP_CHUNK):
+            chunk = links[i : i + _LOOKUP_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            for row in self._conn.execute(
+                f"SELECT link, {', '.join(HISTORY_FIELDS)} FROM items WHERE link IN ({marks})",
+                chunk,
+            ):
+                previous[row[0]] = tuple(row[1:])
+        return previous
+
+    def upsert_many(self, items, observed_at: str | None = None) -> dict[str, int]:
+        """
+        Grava um lote; retorna {'new', 'updated', 'unchanged', 'history'}.
+        'updated': itens já na base cujo preço/disponibilidade mudou.
+        """
+        observed_at = observed_at or now_utc()
+        # Último valor de cada link no lote (o mesmo item pode vir repetido)
+        rows = {}
+        for item in items:
+            values = item_values(item)
+            if values[_LINK]:
+                rows[values[_LINK]] = values
+        if not rows:
+            return {"new": 0, "updated": 0, "unchanged": 0, "history": 0}
+        with self._lock, self._conn:
+            previous = self._previous(list(rows))
+            history = []
+            for link, values in rows.items():
+                tracked = tuple(values[i] for i in _HISTORY_IDX)
+                before = previous.get(link)
+                if before != tracked:
+                    # Preço anterior na própria linha: price_changes não precisa de subconsulta
+                    history.append((link, *tracked, before[0] if before else None, observed_at))
+            self._conn.executemany(
+                _UPSERT, [(*values, observed_at, observed_at) for values in rows.values()]
+            )
+            self._conn.executemany(
+                f"INSERT INTO history (link, {', '.join(HISTORY_FIELDS)}, preco_anterior, observed_at) "
+                f"VALUES (?, {', '.join('?' * len(HISTORY_FIELDS))}, ?, ?)",
+                history,
+            )
+        new = len(rows) - len(previous)
+        updated = len(history) - new
+        return {
+            "new": new,
+            "updated": updated,
+            "unchanged": len(previous) - updated,
+            "history": len(history),
+        }
+
+    def touch(self, links, observed_at: str | None = None) -> int:
+        """Marca os links como vistos em `observed_at`; retorna quantos existiam na base."""
+        observed_at = observed_at or now_utc()
+        links = list(dict.fromkeys(link for link in links if link))
+        touched = 0
+        with self._lock, self._conn:
+            for i in range(0, len(links), _LOOKUP_CHUNK):
+                chunk = links[i : i + _LOOKUP_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                touched += self._conn.execute(
+                    f"UPDATE items SET last_seen = ? WHERE link IN ({marks})",
+                    [observed_at, *chunk],
+                ).rowcount
+        return touched
+
+    def latest(
+        self, categoria: str | None = None, since: str | None = None, limit: int | None = None
+    ) -> list[dict]:
+        """Estado atual dos itens (vistos desde `since`, se informado), mais recentes primeiro."""
+        where, params = [], []
+        if categoria:
+            where.append("categoria = ?")
+            params.append(categoria)
+        if since:
+            where.append("last_seen >= ?")
+            params.append(since)
+        sql = "SELECT * FROM items"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY last_seen DESC, link DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def price_changes(
+        self, since: str, categoria: str | None = None, limit: int | None = None
+    ) -> list[dict]:
+        """
+        Itens cujo preço mudou desde `since`: preço anterior (último antes de
+        `since`), preço atual e variação; maiores variações primeiro.
+        """
+        params = [since]
+        # Primeira mudança de cada link na janela: o preco_anterior dela é o
+        # preço antes de `since` (MIN(id) escolhe a linha das colunas simples).
+        # INDEXED BY: pelo GROUP BY o planner preferiria varrer history_link inteiro
+        sql = """
+            WITH first AS (
+                SELECT link, MIN(id), preco_anterior FROM history
+                INDEXED BY history_observed_at
+                WHERE observed_at >= ? GROUP BY link
+            )
+            SELECT i.link, i.nome, i.categoria, f.preco_anterior, i.preco AS preco_atual,
+                   i.preco - f.preco_anterior AS variacao
+            FROM first f JOIN items i ON i.link = f.link
+            WHERE f.preco_anterior IS NOT NULL AND i.preco IS NOT f.preco_anterior
+        """
+        if categoria:
+            sql += " AND i.categoria = ?"
+            params.append(categoria)
+        sql += " ORDER BY abs(variacao) DESC, i.link"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def history(self, link: str) -> list[dict]:
+        """Mudanças de preço/disponibilidade de um item, da mais antiga à mais recente."""
+        return [
+            dict(row)
+            for row in self._conn.execute(
+                "SELECT observed_at, preco, disponibilidade FROM history "
+                "WHERE link = ? ORDER BY observed_at, id",
+                (link,),
+            )
+        ]
+
+    def counts(self) -> dict:
+        row = self._conn.execute(
+            "SELECT (SELECT COUNT(*) FROM items), (SELECT COUNT(*) FROM history), "
+            "(SELECT MAX(last_seen) FROM items)"
+        ).fetchone()
+        return {"items": row[0], "history": row[1], "last_seen": row[2]}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class StoreWriter(ItemWriter):
+    """
+    ItemWriter que grava no ItemStore em lotes de `flush_every` itens
+    (um upsert por transação). Todos os itens de uma execução recebem o
+    mesmo timestamp, o do início da gravação; touch(links) aplica esse
+    timestamp a itens vistos sem extração (FingerprintStore.on_unchanged).
+    """
+
+    default_flush_every = 500
+
+    @classmethod
+    def in_dir(cls, output_dir: Path, flush_every: int | None = None) -> "StoreWriter":
+        """Base fixa em output_dir/items.sqlite3 (acumula entre execuções)."""
+        return cls(Path(output_dir) / STORE_FILE, flush_every=flush_every)
+
+    def _open(self) -> None:
+        self.store = ItemStore(self.path)
+        self.observed_at = now_utc()
+        self.stats = {"new": 0, "updated": 0, "unchanged": 0, "history": 0}
+        self._batch: list[Item] = []
+        self._stats_lock = threading.Lock()
+
+    def _write(self, item: Item) -> None:
+        self._batch.append(item)
+
+    def touch(self, links) -> None:
+        touched = self.store.touch(links, observed_at=self.observed_at)
+        with self._stats_lock:
+            self.stats["unchanged"] += touched
+
+    def _flush(self) -> None:
+        if self._batch:
+            result = self.store.upsert_many(self._batch, observed_at=self.observed_at)
+            with self._stats_lock:
+                for key, n in result.items():
+                    self.stats[key] += n
+            self._batch = []
+
+    def _close(self) -> None:
+        self._flush()
+        self.store.close()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Consultas na base de itens (--store) pela linha de comando.
+
+Uso:
+  python -m src.store_cli output/items.sqlite3 latest --categoria Poetry --limit 20
+  python -m src.store_cli output/items.sqlite3 changes --since 1d
+  python -m src.store_cli output/items.sqlite3 history https://books.toscrape.com/...
+  python -m src.store_cli output/items.sqlite3 stats
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from .store import STORE_FILE, ItemStore, parse_since
+
+
+def _print_rows(rows: list[dict], as_json: bool) -> None:
+    if as_json:
+        for row in rows:
+            print(json.dumps(row, ensure_ascii=False))
+        return
+    if not rows:
+        return
+    columns = list(rows[0])
+    print("\t".join(columns))
+    for row in rows:
+        print("\t".join("" if row[c] is None else str(row[c]) for c in columns))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.store_cli", description="Consultas na base de itens (--store)"
+    )
+    parser.add_argument("db", type=Path, help=f"Arquivo da base (ex.: output/{STORE_FILE})")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON Lines (default: TSV)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    latest = commands.add_parser("latest", help="Estado atual dos itens")
+    latest.add_argument("--categoria", default=None)
+    latest.add_argument("--since", default=None, help="Só itens vistos desde (ex.: 1d, 2024-05-01)")
+    latest.add_argument("--limit", type=int, default=None)
+
+    changes = commands.add_parser("changes", help="Mudanças de preço desde uma data")
+    changes.add_argument("--since", default="1d", help="30m, 24h, 7d ou data ISO (default: 1d)")
+    changes.add_argument("--categoria", default=None)
+    changes.add_argument("--limit", type=int, default=None)
+
+    history = commands.add_parser("history", help="Histórico de preço/disponibilidade de um item")
+    history.add_argument("link")
+
+    commands.add_parser("stats", help="Totais da base")
+
+    args = parser.parse_args(argv)
+    if not args.db.exists():
+        print(f"Base não encontrada: {args.db}", file=sys.stderr)
+        return 1
+    with ItemStore(args.db) as store:
+        if args.command == "latest":
+            since = parse_since(args.since) if args.since else None
+            rows = store.latest(args.categoria, since=since, limit=args.limit)
+        elif args.command == "changes":
+            rows = store.price_changes(parse_since(args.since), args.categoria, args.limit)
+        elif args.command == "history":
+            rows = store.history(args.link)
+        else:
+            rows = [store.counts()]
+    _print_rows(rows, args.json)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""Módulo de download em streaming: extrai itens e próxima página enquanto o corpo chega."""
+
+import codecs
+import time
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+import requests
+
+from .metrics import RunMetrics
+from .parser import Item
+from .utils import CAPTCHA_SCAN_LIMIT, might_be_captcha, normalize_text, parse_price, parse_rating
+
+# Teto do corpo (já descomprimido, o que também barra gzip bomb)
+MAX_BODY_BYTES = 5 * 1024 * 1024
+CHUNK_SIZE = 16 * 1024
+# Na parada antecipada, um resto de corpo até este tamanho é lido e descartado
+# para a conexão voltar ao pool; acima disso sai mais barato fechá-la
+DRAIN_LIMIT = 64 * 1024
+
+
+def _classes(attrs: list[tuple[str, str | None]]) -> list[str]:
+    for name, value in attrs:
+        if name == "class" and value:
+            return value.split()
+    return []
+
+
+class BooksStreamExtractor(HTMLParser):
+    """
+    Extrator por eventos da listagem do Books to Scrape, com os mesmos campos
+    de extract_items_books_toscrape. Cada article.product_pod vira Item assim
+    que o seu </article> chega (on_item é chamado na hora) e a próxima página
+    vem de li.next a (ou de rel="next").
+
+    `finished` fica True quando a lista de produtos (ol.row) e a paginação
+    (ul.pager) já fecharam: o resto do documento (rodapé, scripts) não muda o
+    resultado e não precisa ser baixado.
+    """
+
+    def __init__(self, base_url: str, on_item=None):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.on_item = on_item
+        self.items: list[Item] = []
+        self.list_done = False
+        self.pager_done = False
+        self._next_href: str | None = None
+        self._rel_next: str | None = None
+        self._pod: dict | None = None
+        self._field: str | None = None  # campo cujo texto está sendo lido
+        self._field_tag = ""
+        self._text: list[str] = []
+        self._in_h3 = False
+        self._in_next = False
+        self._list_depth = 0
+        self._pager_depth = 0
+        self._pager: list[str] = []
+
+    @property
+    def finished(self) -> bool:
+        return self.list_done and self.pager_done
+
+    @property
+    def next_url(self) -> str | None:
+        href = self._next_href or self._rel_next
+        return urljoin(self.base_url, href) if href else None
+
+    @property
+    def pager_html(self) -> str:
+        """Marcação da paginação (basta para discover_page_urls)."""
+        return "".join(self._pager)
+
+    def handle_starttag(self, tag, attrs):
+        if self._pager_depth:
+            self._pager.append(self.get_starttag_text())
+        classes = _classes(attrs)
+        if tag == "ol":
+            if self._list_depth or "row" in classes:
+                self._list_depth += 1
+        elif tag == "ul":
+            if self._pager_depth or "pager" in classes:
+                if not self._pager_depth:
+                    self._pager.append(self.get_starttag_text())
+                self._pager_depth += 1
+        elif tag == "li" and "next" in classes:
+            self._in_next = True
+        elif tag == "article" and "product_pod" in classes:
+            self._pod = {}
+            return
+
+        if tag == "a":
+            a = dict(attrs)
+            if self._in_next and a.get("href") and self._next_href is None:
+                self._next_href = a["href"]
+            if self._pod is not None and "nome" not in self._pod and (self._in_h3 or a.get("title")):
+                self._pod["link"] = a.get("href") or ""
+                title = a.get("title")
+                if title:
+                    self._pod["nome"] = normalize_text(title)
+                else:
+                    self._capture("nome", tag)
+        if self._rel_next is None and ("rel", "next") in attrs:
+            self._rel_next = dict(attrs).get("href")
+
+        if self._pod is None:
+            return
+        if tag == "h3":
+            self._in_h3 = True
+        elif "price_color" in classes and "preco" not in self._pod:
+            self._capture("preco", tag)
+        elif "star-rating" in classes and "rating" not in self._pod:
+            self._pod["rating"] = parse_rating(classes)
+        elif ("availability" in classes or "instock_availability" in classes) and (
+            "disponibilidade" not in self._pod
+        ):
+            self._capture("disponibilidade", tag)
+
+    def handle_endtag(self, tag):
+        if self._pager_depth:
+            self._pager.append(f"</{tag}>")
+        if self._field is not None and tag == self._field_tag:
+            self._end_capture()
+        if tag == "h3":
+            self._in_h3 = False
+        elif tag == "li":
+            self._in_next = False
+        elif tag == "ol" and self._list_depth:
+            self._list_depth -= 1
+            self.list_done = self._list_depth == 0
+        elif tag == "ul" and self._pager_depth:
+            self._pager_depth -= 1
+            self.pager_done = self._pager_depth == 0
+        elif tag == "article" and self._pod is not None:
+            self._emit(self._pod)
+            self._pod = None
+
+    def handle_data(self, data):
+        if self._field is not None:
+            self._text.append(data)
+        elif self._pager_depth:
+            self._pager.append(data)
+
+    def _capture(self, field: str, tag: str) -> None:
+        self._field, self._field_tag, self._text = field, tag, []
+
+    def _end_capture(self) -> None:
+        text = "".join(self._text)
+        if self._pager_depth:
+            self._pager.append(text)
+        value = parse_price(text) if self._field == "preco" else normalize_text(text)
+        if self._pod is not None:
+            self._pod[self._field] = value
+        self._field, self._field_tag, self._text = None, "", []
+
+    def _emit(self, pod: dict) -> None:
+        nome = pod.get("nome", "")
+        link = pod.get("link", "")
+        item = Item(
+            nome=nome,
+            preco=pod.get("preco"),
+            categoria="Livros",
+            descricao=nome[:100] + "..." if len(nome) > 100 else nome,
+            disponibilidade=pod.get("disponibilidade", ""),
+            rating=pod.get("rating"),
+            link=urljoin(self.base_url, link) if link else "",
+        )
+        self.items.append(item)
+        if self.on_item is not None:
+            self.on_item(item)
+
+
+@dataclass(slots=True)
+class StreamedPage:
+    """
+    Página lida em streaming: vai no lugar do HTML no contrato (html, status)
+    e o crawl usa os itens e a próxima URL já extraídos, sem parse.
+    """
+
+    url: str
+    items: list[Item]
+    next_url: str | None
+    pager_html: str
+    bytes_read: int
+    stopped_early: bool
+    first_item_s: float | None = None
+
+
+class StreamReader:
+    """
+    Lê o corpo da Response em blocos e alimenta um extrator por eventos;
+    use como fetch_with_retry(..., reader=StreamReader()) ou
+    AsyncFetcher(reader=...). Retorna (StreamedPage, 'ok').
+
+    - O CAPTCHA é checado nos primeiros CAPTCHA_SCAN_LIMIT caracteres,
+      sem esperar o resto do documento.
+    - Quando o extrator termina (lista e paginação fechadas), a leitura
+      para: resto curto (até `drain_limit`) é descartado para manter a
+      conexão no pool; resto longo fecha a conexão.
+    - Corpo acima de `max_bytes` (descomprimido) é abandonado com status
+      'too_large', que não tem retry.
+    Com `metrics`, conta bytes lidos e economizados, paradas antecipadas e o
+    tempo até o primeiro item (estágio stream_first_item).
+    """
+
+    def __init__(
+        self,
+        extractor=BooksStreamExtractor,
+        max_bytes: int = MAX_BODY_BYTES,
+        chunk_size: int = CHUNK_SIZE,
+        drain_limit: int = DRAIN_LIMIT,
+        logger=None,
+        metrics: RunMetrics | None = None,
+    ):
+        if max_bytes < 1 or chunk_size < 1:
+            raise ValueError("max_bytes e chunk_size devem ser >= 1")
+        self.extractor = extractor
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.drain_limit = drain_limit
+        self.logger = logger
+        self.metrics = metrics
+
+    def __call__(self, response: requests.Response, url: str) -> tuple[StreamedPage | None, str]:
+        start = time.perf_counter()
+        extractor = self.extractor(url)
+        # Mesma escolha de encoding de Response.text, sem o chardet (que lê o corpo todo)
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+        chunks = response.iter_content(self.chunk_size)
+        head: list[str] | None = []  # início do documento, para a checagem de CAPTCHA
+        head_len = 0
+        read = 0
+        first_item = None
+        status = "ok"
+        stopped = False
+        try:
+            for chunk in chunks:
+                read += len(chunk)
+                if read > self.max_bytes:
+                    status = "too_large"
+                    break
+                text = decoder.decode(chunk)
+                if head is not None:
+                    head.append(text)
+                    head_len += len(text)
+                    if head_len >= CAPTCHA_SCAN_LIMIT:
+                        if might_be_captcha("".join(head)):
+                            status = "captcha"
+                            break
+                        head = None
+                extractor.feed(text)
+                if first_item is None and extractor.items:
+                    first_item = time.perf_counter() - start
+                if extractor.finished:
+                    stopped = True
+                    break
+            else:
+                extractor.feed(decoder.decode(b"", final=True))
+                extractor.close()
+            if status == "ok" and head is not None and might_be_captcha("".join(head)):
+                status = "captcha"
+        finally:
+            skipped = self._release(response, chunks, stopped or status != "ok")
+
+        if status == "too_large":
+            if self.logger:
+                self.logger.warning(
+                    "Corpo acima de %d bytes, página abandonada: %s", self.max_bytes, url
+                )
+            return None, status
+        if status == "captcha":
+            return None, status
+        if self.metrics is not None:
+            self.metrics.count("stream_bytes", read)
+            if stopped:
+                self.metrics.count("stream_early_stop")
+                if skipped:
+                    self.metrics.count("stream_bytes_skipped", skipped)
+            if first_item is not None:
+                self.metrics.add_time("stream_first_item", first_item)
+        if stopped and self.logger:
+            self.logger.debug("Leitura encerrada após %d bytes: %s", read, url)
+        page = StreamedPage(
+            url=url,
+            items=extractor.items,
+            next_url=extractor.next_url,
+            pager_html=extractor.pager_html,
+            bytes_read=read,
+            stopped_early=stopped,
+            first_item_s=first_item,
+        )
+        return page, "ok"
+
+    def _release(self, response: requests.Response, chunks, interrupted: bool) -> int | None:
+        """
+        Libera a conexão; retorna os bytes do corpo (no fio) que não foram
+        baixados, se Content-Length for conhecido.
+        """
+        skipped = None
+        if interrupted:
+            length = response.headers.get("Content-Length")
+            remaining = None
+            if length and length.isdigit():
+                remaining = max(int(length) - response.raw.tell(), 0)
+            if remaining is None or remaining <= self.drain_limit:
+                # Lê o resto (limitado) para a conexão poder ser reaproveitada
+                drained = 0
+                try:
+                    for chunk in chunks:
+                        drained += len(chunk)
+                        if drained > self.drain_limit:
+                            break
+                except requests.RequestException:
+                    pass
+            else:
+                skipped = remaining
+        # Corpo lido até o fim: devolve a conexão ao pool; senão, fecha
+        response.close()
+        return skipped
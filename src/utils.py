@@ -5,6 +5,8 @@ import logging
 import re
 from pathlib import Path
 
+from urllib3.util.request import ACCEPT_ENCODING
+
 # User-Agents realistas para rotação
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -15,11 +17,13 @@ USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Edge/120.0.0.0",
 ]
 
-# Headers base para requisições (sem br - requests não decodifica Brotli nativamente)
+# Headers base para requisições. Accept-Encoding anuncia só o que o urllib3
+# decodifica: gzip e deflate sempre, br com brotli instalado e zstd com o
+# decodificador zstd (o Http2Adapter troca pelo que o httpx decodifica)
 DEFAULT_HEADERS = {
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
     "Accept-Language": "pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7",
-    "Accept-Encoding": "gzip, deflate",
+    "Accept-Encoding": ACCEPT_ENCODING.replace(",", ", "),
     "DNT": "1",
     "Connection": "keep-alive",
     "Upgrade-Insecure-Requests": "1",
@@ -35,6 +39,19 @@ CAPTCHA_PATTERNS = [
     r"unusual traffic",
 ]
 
+# CAPTCHA_PATTERNS fatorados numa única regex (uma passada sobre o texto já em
+# minúsculas; mais rápida que re.IGNORECASE, que desativa a busca por literais)
+CAPTCHA_RE = re.compile(
+    r"c(?:aptcha|loudflare.*challenge)|please verify you are human|unusual traffic"
+)
+
+# Páginas de desafio são pequenas e trazem os marcadores no início do documento
+CAPTCHA_SCAN_LIMIT = 16 * 1024
+
+_PRICE_CHARS_RE = re.compile(r"[\d,.]+")
+
+RATING_WORDS = {"one": "1", "two": "2", "three": "3", "four": "4", "five": "5"}
+
 
 def setup_logging(
     log_file: Path | None = None,
@@ -67,9 +84,8 @@ def normalize_text(text: str | None) -> str:
     """Remove espaços múltiplos, strip e caracteres especiais problemáticos."""
     if text is None or not isinstance(text, str):
         return ""
-    t = text.strip()
-    t = re.sub(r"\s+", " ", t)
-    return t
+    # str.split() usa a mesma definição de espaço que \s e já descarta as pontas
+    return " ".join(text.split())
 
 
 def parse_price(text: str | None) -> float | None:
@@ -77,7 +93,7 @@ def parse_price(text: str | None) -> float | None:
     if text is None or not isinstance(text, str):
         return None
     # Remove símbolos de moeda e espaços, mantém apenas números e ponto/vírgula
-    cleaned = re.sub(r"[^\d,.]", "", text.strip())
+    cleaned = "".join(_PRICE_CHARS_RE.findall(text))
     cleaned = cleaned.replace(",", ".")
     try:
         return float(cleaned) if cleaned else None
@@ -90,18 +106,16 @@ def parse_rating(classes: list[str] | str) -> str | None:
     if isinstance(classes, str):
         classes = classes.split()
     for c in classes:
-        lower = c.lower()
-        if lower in ("one", "two", "three", "four", "five"):
-            return {"one": "1", "two": "2", "three": "3", "four": "4", "five": "5"}.get(
-                lower
-            )
+        rating = RATING_WORDS.get(c.lower())
+        if rating:
+            return rating
     return None
 
 
 def might_be_captcha(html: str) -> bool:
-    """Verifica se a página pode conter desafio CAPTCHA."""
-    html_lower = html.lower()
-    for pattern in CAPTCHA_PATTERNS:
-        if re.search(pattern, html_lower):
-            return True
-    return False
+    """
+    Verifica se a página pode conter desafio CAPTCHA.
+    Examina só os primeiros CAPTCHA_SCAN_LIMIT caracteres (head/title e
+    início do body), onde as páginas de desafio trazem seus marcadores.
+    """
+    return CAPTCHA_RE.search(html[:CAPTCHA_SCAN_LIMIT].lower()) is not None
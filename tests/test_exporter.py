@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Testes dos writers colunares (Parquet / Arrow)."""
+
+import pytest
+
+from src.exporter import ArrowWriter, ParquetWriter
+from src.item import LISTING_FIELDNAMES
+from src.parser import Item
+
+pa = pytest.importorskip("pyarrow")
+
+
+def _item(i: int, categoria: str, disponibilidade: str) -> Item:
+    return Item(
+        nome=f"Livro {i}",
+        preco=10.0 + i,
+        categoria=categoria,
+        descricao=f"Livro {i}",
+        disponibilidade=disponibilidade,
+        rating="3",
+        link=f"https://exemplo.com/livro-{i}",
+    )
+
+
+# Categorias diferentes (e em ordem diferente) a cada batch de 2 itens
+ITEMS = [
+    _item(0, "Livros", "In stock"),
+    _item(1, "Poesia", "In stock"),
+    _item(2, "Poesia", "Out of stock"),
+    _item(3, "Ficção", "In stock"),
+    _item(4, "Livros", ""),
+]
+
+
+def _read(writer_cls, path):
+    if writer_cls is ArrowWriter:
+        return pa.ipc.open_file(str(path)).read_all()
+    import pyarrow.parquet as pq
+
+    return pq.read_table(path)
+
+
+@pytest.mark.parametrize("writer_cls", [ArrowWriter, ParquetWriter])
+def test_batches_com_dicionarios_diferentes(tmp_path, writer_cls):
+    path = tmp_path / f"itens.{writer_cls.extension}"
+    with writer_cls(path, flush_every=2) as writer:
+        writer.write_many(ITEMS)
+
+    table = _read(writer_cls, path)
+    assert table.num_rows == len(ITEMS)
+    assert pa.types.is_dictionary(table.schema.field("categoria").type)
+    assert table.column("categoria").to_pylist() == [item.categoria for item in ITEMS]
+    assert table.column("disponibilidade").to_pylist() == [item.disponibilidade for item in ITEMS]
+    assert table.column("link").to_pylist() == [item.link for item in ITEMS]
+
+
+@pytest.mark.parametrize("writer_cls", [ArrowWriter, ParquetWriter])
+def test_colunas_escolhidas(tmp_path, writer_cls):
+    path = tmp_path / f"itens.{writer_cls.extension}"
+    with writer_cls(path, fields=LISTING_FIELDNAMES) as writer:
+        writer.write_many(ITEMS)
+
+    table = _read(writer_cls, path)
+    assert table.column_names == LISTING_FIELDNAMES
+    assert table.column("rating").to_pylist() == [3] * len(ITEMS)
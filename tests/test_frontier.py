@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Testes de lease/ack dos frontiers (memória, SQLite e Redis via fakeredis)."""
+
+import pytest
+
+from src.frontier import MemoryFrontier, RedisFrontier, SqliteFrontier
+
+URL = "https://exemplo.com/catalogue/page-1.html"
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def frontier(request, tmp_path):
+    if request.param == "memory":
+        f = MemoryFrontier()
+    elif request.param == "sqlite":
+        f = SqliteFrontier(tmp_path / "frontier.db")
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        f = RedisFrontier(client=fakeredis.FakeRedis(decode_responses=True))
+    yield f
+    f.close()
+
+
+def test_ack_tardio_nao_conclui_url_devolvida_a_fila(frontier):
+    frontier.add([URL])
+    assert frontier.claim("w1", 1, lease=-1) == [URL]  # lease já vencido
+    assert frontier.claim("w2", 0) == []  # o claim devolve o lease vencido à fila
+
+    assert frontier.ack(URL, "w1") is False
+    assert frontier.counts() == {"queued": 1, "leased": 0, "done": 0, "failed": 0}
+    assert frontier.claim("w2", 1) == [URL]
+    assert frontier.ack(URL, "w2") is True
+    assert frontier.claim("w2", 1) == []
+    assert frontier.counts() == {"queued": 0, "leased": 0, "done": 1, "failed": 0}
+    assert frontier.is_finished()
+
+
+def test_ack_e_release_so_do_dono_do_lease(frontier):
+    frontier.add([URL])
+    assert frontier.claim("w1", 1, lease=-1) == [URL]
+    assert frontier.claim("w2", 1) == [URL]  # lease vencido de w1 vai para w2
+
+    assert frontier.release(URL, "w1") is False
+    assert frontier.ack(URL, "w1") is False
+    assert frontier.counts() == {"queued": 0, "leased": 1, "done": 0, "failed": 0}
+    assert frontier.release(URL, "w2") is True
+    assert frontier.counts() == {"queued": 1, "leased": 0, "done": 0, "failed": 0}
+    assert frontier.claim("w1", 1) == [URL]
+    assert frontier.ack(URL, "w1") is True
+    assert frontier.counts() == {"queued": 0, "leased": 0, "done": 1, "failed": 0}
+
+
+def test_falha_volta_a_fila_ate_esgotar_tentativas(frontier):
+    frontier.add([URL])
+    for _ in range(2):
+        assert frontier.claim("w1", 1) == [URL]
+        assert frontier.fail(URL, "w1", max_attempts=3) == "retry"
+    assert frontier.counts() == {"queued": 1, "leased": 0, "done": 0, "failed": 0}
+
+    assert frontier.claim("w2", 1) == [URL]
+    assert frontier.fail(URL, "w1", max_attempts=3) is None  # lease é de w2
+    assert frontier.fail(URL, "w2", max_attempts=3) == "failed"
+    assert frontier.claim("w2", 1) == []
+    assert frontier.counts() == {"queued": 0, "leased": 0, "done": 0, "failed": 1}
+    assert frontier.is_finished()